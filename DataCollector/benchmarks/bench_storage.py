@@ -0,0 +1,126 @@
+"""
+Session storage benchmark.
+
+Writes the same session through each file storage the way StorageManager
+does (a few new records every flush) and reports the total write time and
+file size, then the bulk rows per second of each storage for one large
+write. JSONStorage rewrites the whole file on every flush, so its total
+grows with the square of the session length.
+
+With pyarrow installed, also compares loading a few channels of many
+training sessions from indented JSON files and from Parquet files.
+
+Run from the project root:
+    python -m DataCollector.benchmarks.bench_storage
+"""
+import json
+import random
+import sys
+import os
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, '..', '..', '..')))
+
+from DataCommunicator.benchmarks.bench_serializer import make_session
+from DataCollector.source.storage.csv_storage import CSVStorage
+from DataCollector.source.storage.json_storage import JSONStorage
+from DataCollector.source.storage.jsonl_storage import FSYNC_NEVER, JSONLinesStorage
+from DataCollector.source.storage.parquet_storage import ParquetStorage, load_sessions, pa
+
+SESSION = 900  # 30 min at 2 s
+PER_FLUSH = 3  # records collected in one 5 s StorageManager interval
+BULK = 43200  # a full-day campaign in one write
+STORAGES = {
+    'json': lambda d: JSONStorage(d),
+    'jsonl': lambda d: JSONLinesStorage(d, fsync=FSYNC_NEVER),
+    'csv': lambda d: CSVStorage(d),
+}
+if pa is not None:
+    STORAGES['parquet'] = lambda d: ParquetStorage(d)
+
+LOAD_SESSIONS = 200  # training sessions of 30 min each
+LOAD_RECORDS = 900
+LOAD_CHANNELS = ['GroveGasSensor.NO2', 'GroveGasSensor.Ethanol', 'GroveGasSensor.VOC', 'GroveGasSensor.CO']
+
+
+def run(make, records, per_flush) -> tuple[float, int]:
+    with tempfile.TemporaryDirectory() as directory:
+        storage = make(directory)
+        storage.set_filename('bench')
+        t0 = time.perf_counter()
+        for i in range(0, len(records), per_flush):
+            storage.write(records[i:i + per_flush])
+        if hasattr(storage, 'close'):
+            storage.close()
+        elapsed = time.perf_counter() - t0
+        return elapsed, os.path.getsize(storage.output_file)
+
+
+def main():
+    records = make_session(SESSION)
+    bulk = make_session(BULK)
+    # the storages report every write; keep the table readable
+    stdout, sys.stdout = sys.stdout, open(os.devnull, 'w')
+    try:
+        session = {name: run(make, records, PER_FLUSH) for name, make in STORAGES.items()}
+        rates = {name: BULK / run(make, bulk, BULK)[0] for name, make in STORAGES.items()}
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    print(f"session of {SESSION} records, {PER_FLUSH} per flush; bulk write of {BULK} records")
+    print(f"{'storage':>8} {'session s':>10} {'bytes':>10} {'bulk rows/s':>12}")
+    for name, (elapsed, size) in session.items():
+        print(f"{name:>8} {elapsed:>10.3f} {size:>10} {rates[name]:>12.0f}")
+    if pa is not None:
+        bench_load()
+
+
+def bench_load():
+    with tempfile.TemporaryDirectory() as directory:
+        json_files, parquet_files = [], []
+        stdout, sys.stdout = sys.stdout, open(os.devnull, 'w')
+        try:
+            for i in range(LOAD_SESSIONS):
+                records = make_session(LOAD_RECORDS)
+                path = os.path.join(directory, f'scent{i % 5}_{i}.json')
+                with open(path, 'w') as f:
+                    json.dump(records, f, indent=4)
+                json_files.append(path)
+                storage = ParquetStorage(directory)
+                storage.open_session(f'scent{i % 5}', f'scent{i % 5}_{i}')
+                storage.write(records)
+                storage.close()
+                parquet_files.append(storage.output_file)
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+
+        channels = [c.split('.') for c in LOAD_CHANNELS]
+
+        def from_json():
+            rows = []
+            for path in json_files:
+                with open(path) as f:
+                    for record in json.load(f):
+                        rows.append([record[sensor][channel] for sensor, channel in channels])
+            return np.array(rows, dtype=float)
+
+        def from_parquet():
+            table = load_sessions(parquet_files, LOAD_CHANNELS)
+            return np.column_stack([table.column(c).to_numpy() for c in LOAD_CHANNELS])
+
+        assert np.array_equal(from_json(), from_parquet())
+        print(f"\n{len(LOAD_CHANNELS)} channels of {LOAD_SESSIONS} sessions x {LOAD_RECORDS} records")
+        for name, load in (('json', from_json), ('parquet', from_parquet)):
+            t0 = time.perf_counter()
+            load()
+            print(f"{name:>8} {time.perf_counter() - t0:>10.3f} s")
+
+
+if __name__ == '__main__':
+    random.seed(1)
+    main()
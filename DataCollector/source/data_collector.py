@@ -8,17 +8,30 @@ sys.path.insert(0, os.path.abspath(os.path.join(__file__, '..', '..', '..')))
 
 from DataCollector.source.storage.comm_storage import CommStorage
 
-from DataCommunicator.source.WebSocketConnection import WebSocketConnection
+from DataCommunicator.source.ConnectionMultiplexer import ConnectionMultiplexer
 from DataCommunicator.source.BaseDataClient   import BaseDataClient
+from DataCommunicator.source.FrameSchema      import FrameDecoder, is_packed, is_schema
+from DataCommunicator.source.Metrics          import registry, serve_metrics
 
-from DataCollector.source.storage.json_storage import JSONStorage
+from DataCollector.source.storage.jsonl_storage import JSONLinesStorage
 from DataCollector.source.storage_manager import StorageManager
 
+# a recording wants every frame, not only the reader's change-driven ones;
+# the request is renewed well before its ttl runs out, and sent again as soon
+# as the reader shows up (it may have started after us, or restarted)
+READER = 'sensor'
+STREAM_REQUEST = {'command': 'stream', 'enabled': True, 'ttl': 90}
+STREAM_RENEW_INTERVAL = 30
+
+RECEIVED = registry.counter('collector_frames_received_total', 'Sensor frames added to the recording')
+BUFFERED = registry.gauge('collector_buffered_frames', 'Frames held in memory for the storages')
+
 class SensorDataCollector:
     def __init__(self, scent_name: str = None):
         self.sensor_data_list = []
         self.data_lock       = threading.Lock()
         self.stop_event      = threading.Event()
+        self.decoder         = FrameDecoder()  # packed frames from the reader
 
         # determine scent name
         if scent_name:
@@ -28,12 +41,16 @@ class SensorDataCollector:
         else:
             self.scent_name = "test_scent"
 
-        # websocket receiver
+        # one broker connection shared by the receiver and any broker-backed storage
         uri = 'ws://localhost:8765'
-        self.ws_conn = WebSocketConnection(uri)
+        self.connection_mux = ConnectionMultiplexer(uri, 'collector')
+        self.ws_conn = self.connection_mux.channel()
         self.receiver = self._ReceiverClient(self)
+        BUFFERED.set_function(lambda: len(self.sensor_data_list))
 
     def start(self, write_interval: float = 5.0):
+        serve_metrics('collector', self.connection_mux)
+
         # 1) WebSocket receiver in background
         def _run_receiver():
             try:
@@ -44,11 +61,12 @@ class SensorDataCollector:
 
         threading.Thread(target=_run_receiver, daemon=True).start()
 
-        # 2) Only JSONStorage for now
+        # 2) Only JSONLinesStorage for now (JSONStorage rewrites the whole session every flush)
         storages = [
-            JSONStorage(),
-            ##CommStorage(), - ready for use
-            # CSVStorage(...)       # ← can plug in later
+            JSONLinesStorage(),
+            ##CommStorage(connection=self.connection_mux.channel()), - ready for use
+            # CSVStorage(),         # ← one Sensor.Channel column each, for pandas/spreadsheets
+            # ParquetStorage(),     # ← typed columns for training (needs pyarrow)
             # CloudStorage(...)     # ← can plug in later
         ]
         storage_mgr = StorageManager(storages, data_source=self, interval=write_interval, scent_name = self.scent_name)
@@ -62,21 +80,57 @@ class SensorDataCollector:
             print("Stopping data collection…")
             self.stop_event.set()
         finally:
+            # let the manager write the last records and close the storages
+            self.stop_event.set()
+            storage_mgr.join()
             print("Data collection stopped.")
 
     class _ReceiverClient(BaseDataClient):
         def __init__(self, collector):
             super().__init__('collector', collector.ws_conn)
             self.collector = collector
+            self.reader_seen = False
+            self.last_seq = None
 
         async def run(self):
             await self.connection.subscribe('sensor_readings')
-            await asyncio.Future()  # run forever
+            await self.connection.subscribe('sensor_schemas')
+            while True:
+                await self.connection.send(READER, STREAM_REQUEST)
+                await asyncio.sleep(STREAM_RENEW_INTERVAL)
+
+        async def _reader_appeared(self, frm: str, payload: dict) -> None:
+            # the first message from the reader, a schema announcement (a started reader
+            # announces its schema with its first frame) or a frame sequence starting over
+            if frm != READER:
+                return
+            seq = payload.get('meta', {}).get('seq') if isinstance(payload, dict) else None
+            restarted = seq is not None and self.last_seq is not None and seq < self.last_seq
+            if seq is not None:
+                self.last_seq = seq
+            if not self.reader_seen or restarted or is_schema(payload):
+                self.reader_seen = True
+                await self.connection.send(READER, STREAM_REQUEST)
 
         async def on_message(self, frm: str, payload: dict):
-            payload['timestamp'] = datetime.now().isoformat()
+            decoder = self.collector.decoder
+            await self._reader_appeared(frm, payload)
+            if decoder.accept(payload):
+                return
+            if is_packed(payload):
+                # records are stored in the dict form
+                frame = decoder.to_legacy(payload)
+                if frame is None:
+                    request = decoder.schema_request(payload)
+                    if request is not None:
+                        await self.connection.send(frm, request)
+                    return
+                payload = frame
+            # the reader stamps frames at acquisition; receipt time only for older senders
+            payload.setdefault('timestamp', datetime.now().isoformat())
             with self.collector.data_lock:
                 self.collector.sensor_data_list.append(payload)
+            RECEIVED.inc()
             print(f"[Collector] Received from {frm}: {payload}")
 
 
@@ -1,20 +1,52 @@
 import asyncio
 import threading
+import time
 from datetime import datetime
+from functools import partial
 from DataCollector.source.storage.istorage import IStorage
 from DataCommunicator.source.BaseDataClient import BaseDataClient
-from DataCommunicator.source.WebSocketConnection import WebSocketConnection
+from DataCommunicator.source.WebSocketConnection import IDataConnection, WebSocketConnection
 
 class CommStorage(IStorage, BaseDataClient):
-    def __init__(self, ws_uri: str = "ws://localhost:8765"):
-        self.ws_connection = WebSocketConnection(ws_uri)
+    """
+    Ships the session to the 'complete_data' topic as deltas:
+    {'offset': index of the first record in the session, 'records': [...]}.
+    Records stay buffered until the broker acks the batch holding them;
+    batches not acked within ack_timeout are sent again with the same offset,
+    by a timer thread, so a batch is resent even when no more records come.
+    close() sends the rest of the session and waits up to close_timeout for
+    the acks; batches still unacked then are logged.
+    """
+    def __init__(self, ws_uri: str = "ws://localhost:8765", connection: IDataConnection | None = None,
+                 ack_timeout: float = 10.0, close_timeout: float | None = None):
+        # a shared connection (e.g. a ConnectionMultiplexer channel) is connected by its owner
+        self.owns_connection = connection is None
+        self.ws_connection = connection or WebSocketConnection(ws_uri)
         super().__init__('data_collector', self.ws_connection)
-        self.sensor_data_list = []
         self.data_length_to_send = 5
+        self.ack_timeout = ack_timeout
+        self.close_timeout = ack_timeout if close_timeout is None else close_timeout
 
-        self.loop = asyncio.new_event_loop()
-        self.loop_thread = threading.Thread(target=self._start_loop, daemon=True)
-        self.loop_thread.start()
+        # session cursors: records [acked, acked + len(unacked)) are buffered,
+        # [acked, sent) are on the wire waiting for an ack
+        self.received = 0
+        self.acked = 0
+        self.sent = 0
+        self.unacked = []
+        self._in_flight = {}  # batch offset -> (end, sent at)
+        self._confirmed = {}  # acked batches past a gap: offset -> end
+        self._lock = threading.Lock()  # acks arrive on the connection's loop
+        self._acked_cond = threading.Condition(self._lock)
+        self._closed = threading.Event()
+        self._resend_thread = None
+
+        self._connect_future = None
+
+        self.loop = None
+        if self.owns_connection:
+            self.loop = asyncio.new_event_loop()
+            self.loop_thread = threading.Thread(target=self._start_loop, daemon=True)
+            self.loop_thread.start()
 
     def _start_loop(self):
         asyncio.set_event_loop(self.loop)
@@ -26,20 +58,111 @@ class CommStorage(IStorage, BaseDataClient):
         await self.ws_connection.connect()
         print("[CommStorage] WebSocket connected")
 
-    async def send_data(self):
-        await self.connect()
-        await self.ws_connection.send("topic:complete_data", self.sensor_data_list)
-        print("[CommStorage] Data sent via WebSocket")
+    def _ensure_connected(self):
+        """Connect once on the storage loop; reconnects if the attempt failed or the socket dropped."""
+        future = self._connect_future
+        if future is not None and not future.done():
+            return
+        if future is not None:
+            if future.exception() is not None:
+                print(f"[CommStorage] Error connecting: {future.exception()}")
+            elif self.ws_connection.connected:
+                return
+            else:
+                print("[CommStorage] Connection lost, reconnecting")
+        self._connect_future = asyncio.run_coroutine_threadsafe(self.connect(), self.loop)
 
     def write(self, data: list) -> None:
-        self.sensor_data_list = data
-        print(f"[CommStorage] {len(self.sensor_data_list)} elements stored to list")
-        if len(self.sensor_data_list) >= self.data_length_to_send:
-            future = asyncio.run_coroutine_threadsafe(self.send_data(), self.loop)
+        # data holds only the records new since the last write
+        with self._lock:
+            self.unacked.extend(data)
+            self.received += len(data)
+        print(f"[CommStorage] {self.received} elements stored to list")
+        if self.received >= self.data_length_to_send:
+            if self.owns_connection:
+                self._ensure_connected()
+            self._resend_expired()
+            self._send_new()
+
+    def _start_resend_timer(self) -> None:
+        if self._resend_thread is None:
+            self._resend_thread = threading.Thread(target=self._resend_loop, daemon=True,
+                                                   name='comm-storage-resend')
+            self._resend_thread.start()
+
+    def _resend_loop(self) -> None:
+        while not self._closed.wait(max(self.ack_timeout / 2, 0.01)):
+            if self.owns_connection and self._in_flight:
+                self._ensure_connected()
+            self._resend_expired()
+
+    def _send_batch(self, start: int, end: int) -> None:
+        records = self.unacked[start - self.acked:end - self.acked]
+        self._in_flight[start] = (end, time.monotonic())
+        # queued until the connection's writer is running; never blocks the StorageManager.
+        # Keyed by offset, so a resend replaces the callback of the copy before it
+        self.ws_connection.send_nowait("topic:complete_data", {"offset": start, "records": records},
+                                       on_ack=partial(self._on_ack, start), ack_key=(self.name, start))
+
+    def _send_new(self) -> None:
+        with self._lock:
+            end = self.acked + len(self.unacked)
+            if end > self.sent:
+                self._send_batch(self.sent, end)
+                print(f"[CommStorage] {end - self.sent} new elements queued for WebSocket")
+                self.sent = end
+        self._start_resend_timer()
+
+    def _resend_expired(self) -> None:
+        with self._lock:
+            self._resend_expired_locked()
+
+    def _resend_expired_locked(self) -> None:
+        now = time.monotonic()
+        for start, (end, sent_at) in list(self._in_flight.items()):
+            if now - sent_at >= self.ack_timeout:
+                print(f"[CommStorage] No ack for elements {start}-{end}, resending")
+                self._send_batch(start, end)
+
+    def _on_ack(self, start: int) -> None:
+        with self._lock:
+            batch = self._in_flight.pop(start, None)
+            if batch is None:
+                return  # ack for a batch that was already confirmed by an earlier copy
+            self._confirmed[start] = batch[0]
+            # release records once every batch before them is acked too
+            while self.acked in self._confirmed:
+                end = self._confirmed.pop(self.acked)
+                del self.unacked[:end - self.acked]
+                self.acked = end
+            self._acked_cond.notify_all()
+
+    def close(self) -> None:
+        """Send the records still buffered and wait for the broker to ack them."""
+        if self._closed.is_set():
+            return
+        if self.unacked:
+            if self.owns_connection:
+                self._ensure_connected()
+            self._send_new()
+        deadline = time.monotonic() + self.close_timeout
+        with self._acked_cond:
+            while self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._acked_cond.wait(min(remaining, max(self.ack_timeout / 2, 0.01)))
+                self._resend_expired_locked()
+            pending = sorted((start, end) for start, (end, _) in self._in_flight.items())
+        self._closed.set()
+        for start, end in pending:
+            print(f"[CommStorage] Closing without an ack for elements {start}-{end}")
+        if self.owns_connection:
             try:
-                future.result()  # Optional: can omit if you don't want to block
+                asyncio.run_coroutine_threadsafe(self.ws_connection.close(), self.loop).result(timeout=1)
             except Exception as e:
-                print(f"[CommStorage] Error sending data: {e}")
+                print(f"[CommStorage] Error closing connection: {e}")
+            self.loop.call_soon_threadsafe(self.loop.stop)
 
 
     def set_filename(self, scent_name) -> None:
@@ -1,14 +1,137 @@
+import csv
+import io
+import os
+import shutil
+from datetime import datetime
+
 from DataCollector.source.storage.istorage import IStorage
 
+
+def flatten(record: dict, prefix: str = "", out: dict | None = None) -> dict:
+    """
+    One level of columns for a nested record: {"GroveGasSensor": {"NO2": 1}}
+    becomes {"GroveGasSensor.NO2": 1}. Lists (meta.missing) are joined with ";".
+    """
+    if out is None:
+        out = {}
+    for key, value in record.items():
+        name = prefix + key
+        if isinstance(value, dict):
+            flatten(value, name + ".", out)
+        elif isinstance(value, (list, tuple)):
+            out[name] = ";".join(map(str, value))
+        else:
+            out[name] = value
+    return out
+
+
 class CSVStorage(IStorage):
-    def __init__(self, output_file: str):
-        # TODO: implement CSV writing
-        self.output_file = output_file
+    """
+    Appends the session as CSV with one column per "Sensor.Channel" (and
+    per meta/raw field), timestamp first and the others in the order they
+    first appear. Each write() encodes its rows into one buffer and appends
+    it. A channel that appears mid-session is added as a new last column:
+    the header line is rewritten once and earlier rows keep their shorter
+    length, which pandas and spreadsheets read as empty cells.
+    """
+    def __init__(self, output_dir: str = "savedData"):
+        self.output_dir = output_dir
+        self.output_file = None
+        self.columns: list[str] = []
+        self.written = 0  # rows in the file
+        self._index: dict[str, int] = {}
+        self._slots: dict[tuple, list[int]] = {}  # (sensor, channel names) -> column indices
+        self._file = None
+        self._header = 0  # columns in the file's header line
+
+    def set_filename(self, scent_name) -> None:
+        self.close()
+        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.output_file = os.path.join(self.output_dir, f"{scent_name}_{ts}.csv")
+        self.columns = []
+        self._index = {}
+        self._slots = {}
+        self._header = 0
+        self.written = 0
 
     def write(self, data: list) -> None:
-        # TODO: write data to CSV
-        raise NotImplementedError("CSVStorage not yet implemented")
+        if not data:
+            return
+        rows = [self._row(record) for record in data]
+        if self._file is None:
+            self._file = open(self.output_file, "a", newline="", encoding="utf-8")
+            if self._file.tell() == 0:
+                csv.writer(self._file).writerow(self.columns)
+                self._header = len(self.columns)
+        if len(self.columns) > self._header:
+            self._rewrite_header()
 
-    def set_filename(self, scent_name) -> None:
-        # TODO: set filename
-        raise NotImplementedError("CSVStorage not yet implemented")
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        self._file.write(buffer.getvalue())
+        self._file.flush()
+        self.written += len(data)
+        print(f"[CSVStorage] Appended {len(data)} rows to {self.output_file}")
+
+    def _row(self, record: dict) -> list:
+        if not self.columns and "timestamp" in record:
+            # timestamp first, for readers that take the first column as the index
+            self._column("timestamp")
+        row = [None] * len(self.columns)
+        for key, value in record.items():
+            if value is None:
+                continue  # a sensor without values (meta.missing): empty cells, not a column of its own
+            if not isinstance(value, dict):
+                self._put(row, key, ";".join(map(str, value)) if isinstance(value, (list, tuple)) else value)
+                continue
+            # a sensor's channels: the column indices are looked up once per channel layout
+            shape = (key, tuple(value))
+            slots = self._slots.get(shape)
+            if slots is None:
+                if any(isinstance(v, (dict, list, tuple)) for v in value.values()):
+                    for name, v in flatten(value, key + ".").items():
+                        self._put(row, name, v)
+                    continue
+                slots = self._slots[shape] = [self._column(f"{key}.{channel}") for channel in value]
+                if len(row) < len(self.columns):
+                    row.extend([None] * (len(self.columns) - len(row)))
+            for i, v in zip(slots, value.values()):
+                row[i] = v
+        return row
+
+    def _put(self, row: list, name: str, value) -> None:
+        i = self._index.get(name)
+        if i is None:
+            i = self._column(name)
+            row.extend([None] * (len(self.columns) - len(row)))
+        row[i] = value
+
+    def _column(self, name: str) -> int:
+        i = self._index.get(name)
+        if i is None:
+            i = self._index[name] = len(self.columns)
+            self.columns.append(name)
+        return i
+
+    def _rewrite_header(self) -> None:
+        # rare: copy the rows under a new header line, then continue appending.
+        # If the copy fails the header stays short, so the next write() tries again
+        file, self._file = self._file, None
+        file.close()
+        tmp = self.output_file + ".tmp"
+        with open(self.output_file, newline="", encoding="utf-8") as old, \
+                open(tmp, "w", newline="", encoding="utf-8") as new:
+            old.readline()
+            csv.writer(new).writerow(self.columns)
+            shutil.copyfileobj(old, new)
+        os.replace(tmp, self.output_file)
+        self._header = len(self.columns)
+        self._file = open(self.output_file, "a", newline="", encoding="utf-8")
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
@@ -3,6 +3,10 @@ from abc import ABC, abstractmethod
 class IStorage(ABC):
     @abstractmethod
     def write(self, data: list) -> None:
+        """
+        Store the records added since the last write that returned; raise
+        if they were not stored, and the StorageManager passes them again.
+        """
         ...
 
     @abstractmethod
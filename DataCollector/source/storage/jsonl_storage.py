@@ -0,0 +1,85 @@
+import os
+import time
+from datetime import datetime
+
+from DataCollector.source.storage.istorage import IStorage
+from DataCommunicator.source.Serializer import default_serializer
+
+# fsync policies: after every write, never (the OS decides), or a number of
+# seconds between fsyncs
+FSYNC_ALWAYS = "always"
+FSYNC_NEVER = "never"
+
+
+class JSONLinesStorage(IStorage):
+    """
+    Appends the session as JSON Lines, one record per line. write() gets
+    only the records new since the last write, so a flush costs
+    O(new records).
+    The file stays open in append mode; lines are flushed to the OS on
+    every write and fsynced according to fsync. load() reads a session
+    back as the list JSONStorage used to write.
+    """
+    def __init__(self, output_dir: str = "savedData", fsync: str | float = 30.0):
+        if fsync not in (FSYNC_ALWAYS, FSYNC_NEVER) and not isinstance(fsync, (int, float)):
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+        self.output_dir = output_dir
+        self.output_file = None
+        self.fsync = fsync
+        self.serializer = default_serializer()
+        self.written = 0  # records in the file
+        self._file = None
+        self._synced = time.monotonic()
+
+    def set_filename(self, scent_name) -> None:
+        self.close()
+        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.output_file = os.path.join(self.output_dir, f"{scent_name}_{ts}.jsonl")
+        self.written = 0
+
+    def write(self, data: list) -> None:
+        if not data:
+            return
+        if self._file is None:
+            self._file = open(self.output_file, "a", encoding="utf-8")
+        self._file.write("".join(self.serializer.dumps(record) + "\n" for record in data))
+        self._file.flush()
+        self._sync()
+        self.written += len(data)
+        print(f"[JSONLinesStorage] Appended {len(data)} records to {self.output_file}")
+
+    def _sync(self, force: bool = False) -> None:
+        if self.fsync == FSYNC_NEVER and not force:
+            return
+        now = time.monotonic()
+        if force or self.fsync == FSYNC_ALWAYS or now - self._synced >= self.fsync:
+            os.fsync(self._file.fileno())
+            self._synced = now
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+            self._sync(force=True)
+            self._file.close()
+            self._file = None
+
+    @staticmethod
+    def load(path: str) -> list:
+        """
+        The records of a session file as a list of dicts. A last line cut
+        short by a crash or power loss is skipped.
+        """
+        serializer = default_serializer()
+        records = []
+        with open(path, encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    records.append(serializer.loads(line))
+                except ValueError:
+                    if line.endswith("\n"):
+                        raise
+                    print(f"[JSONLinesStorage] Skipping truncated last line {number} of {path}")
+        return records
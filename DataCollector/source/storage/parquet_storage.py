@@ -0,0 +1,232 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: only ParquetStorage and load_sessions need it
+    pa = pq = None
+
+from DataCollector.source.storage.csv_storage import flatten
+from DataCollector.source.storage.istorage import IStorage
+
+ROW_GROUP_SIZE = 900  # records per row group: 30 min at 2 s
+METADATA_PREFIX = "enose."  # footer key-value metadata: enose.scent, enose.session_start, ...
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("ParquetStorage needs pyarrow (pip install pyarrow)")
+
+
+class ParquetStorage(IStorage):
+    """
+    Writes the session as Parquet: one column per "Sensor.Channel" (and
+    meta field) with the columns flattened as in CSVStorage, readings as
+    float64 (null for missing values), timestamp as a timestamp column.
+    Records are buffered and written row_group_size at a time; close()
+    writes the rest and the footer with the scent, the first and last
+    timestamp and the record count.
+
+    A Parquet file is readable only once its footer is written, so the
+    JSON Lines file stays the crash-safe copy of a session; convert()
+    turns existing .json/.jsonl sessions into Parquet. Channels that appear
+    after the first row group start a new part file (<name>.1.parquet, ...),
+    whose schema load_sessions() merges with the others.
+    """
+    def __init__(self, output_dir: str = "savedData", row_group_size: int = ROW_GROUP_SIZE,
+                 compression: str = "zstd"):
+        _require_pyarrow()
+        self.output_dir = output_dir
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.output_file = None
+        self.files: list[str] = []  # this session's part files
+        self.scent_name = None
+        self.written = 0  # records in finished row groups
+        self._base = None
+        self._part = 0
+        self._pending: list[dict] = []  # flattened rows short of a row group
+        self._skip = 0  # records of a failed write() already in the file
+        self._writer = None
+        self._schema = None
+        self._part_records = 0
+        self._first = None
+        self._last = None
+
+    def set_filename(self, scent_name) -> None:
+        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.open_session(scent_name, f"{scent_name}_{ts}")
+
+    def open_session(self, scent_name: str, name: str) -> None:
+        """Start the session file <output_dir>/<name>.parquet."""
+        self.close()
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.scent_name = scent_name
+        self._base = os.path.join(self.output_dir, name)
+        self.output_file = self._base + ".parquet"
+        self.files = [self.output_file]
+        self._part = 0
+        self.written = 0
+
+    def write(self, data: list) -> None:
+        # a row group is committed to _pending/written only once it is in the file, so
+        # a write that raises leaves nothing of data behind for the retry to duplicate
+        pending = self._pending
+        rows = pending + [flatten(record) for record in data[self._skip:]]
+        start = 0
+        try:
+            while len(rows) - start >= self.row_group_size:
+                self._write_group(rows[start:start + self.row_group_size])
+                start += self.row_group_size
+        except Exception:
+            # the retry resends data from the same record: skip the part already written
+            self._pending = pending[start:]
+            self._skip += max(0, start - len(pending))
+            raise
+        self._pending = rows[start:]
+        self._skip = 0
+
+    def close(self) -> None:
+        try:
+            if self._pending:
+                self._write_group(self._pending)
+        finally:
+            # the footer is written even if the last rows fail, so the file stays readable
+            self._pending = []
+            self._skip = 0
+            self._finish()
+
+    def _write_group(self, rows: list[dict]) -> None:
+        schema = self._schema_for(rows)
+        table = pa.Table.from_arrays([self._column(field, rows) for field in schema], schema=schema)
+        if self._writer is not None and schema != self._schema:
+            self._finish()
+            self._part += 1
+            self.output_file = f"{self._base}.{self._part}.parquet"
+            self.files.append(self.output_file)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.output_file, schema, compression=self.compression)
+            self._schema = schema
+        self._writer.write_table(table, row_group_size=len(rows))
+        timestamps = [row["timestamp"] for row in rows if row.get("timestamp")]
+        if timestamps:
+            self._first = self._first or timestamps[0]
+            self._last = timestamps[-1]
+        self._part_records += len(rows)
+        self.written += len(rows)
+        print(f"[ParquetStorage] Wrote a row group of {len(rows)} records to {self.output_file}")
+
+    def _column(self, field, rows: list[dict]) -> "pa.Array":
+        values = [row.get(field.name) for row in rows]
+        try:
+            if field.name == "timestamp":
+                values = [None if v is None else datetime.fromisoformat(v) for v in values]
+            return pa.array(values, type=field.type)
+        except (pa.ArrowException, TypeError, ValueError):
+            # a value of another type than the column's: cast it, null if it does not cast
+            cast = _to_timestamp if field.name == "timestamp" else float if pa.types.is_floating(field.type) else str
+            converted = [None if v is None else _cast(cast, v) for v in values]
+            print(f"[ParquetStorage] Cast {field.name} to {field.type}, "
+                  f"{sum(v is not None for v in values) - sum(v is not None for v in converted)} values as null")
+            return pa.array(converted, type=field.type)
+
+    def _schema_for(self, rows: list[dict]) -> "pa.Schema":
+        # the columns of this part so far, then new ones in the order they appear
+        # (a column only ever None, like a sensor listed in meta.missing, is left out: it reads as null)
+        types = {} if self._schema is None else {field.name: field.type for field in self._schema}
+        for row in rows:
+            for name, value in row.items():
+                if value is None or name in types:
+                    continue
+                if name == "timestamp":
+                    types[name] = pa.timestamp("us")
+                elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                    types[name] = pa.float64()
+                else:
+                    types[name] = pa.string()
+        return pa.schema(list(types.items()))
+
+    def _finish(self) -> None:
+        if self._writer is None:
+            return
+        self._writer.add_key_value_metadata({
+            METADATA_PREFIX + "scent": str(self.scent_name),
+            METADATA_PREFIX + "session_start": self._first or "",
+            METADATA_PREFIX + "session_end": self._last or "",
+            METADATA_PREFIX + "records": str(self._part_records),
+            METADATA_PREFIX + "part": str(self._part),
+        })
+        self._writer.close()
+        self._writer = None
+        self._part_records = 0
+        self._first = self._last = None
+
+
+def _to_timestamp(value) -> datetime:
+    return value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+
+
+def _cast(cast, value):
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def session_metadata(path: str) -> dict:
+    """Scent, session_start/end, records and part from the footer of a session file (reads the footer only)."""
+    _require_pyarrow()
+    return _session_metadata(pq.read_metadata(path))
+
+
+def _session_metadata(file_metadata) -> dict:
+    metadata = file_metadata.metadata or {}
+    return {
+        key.decode()[len(METADATA_PREFIX):]: value.decode()
+        for key, value in metadata.items()
+        if key.decode().startswith(METADATA_PREFIX)
+    }
+
+
+def load_sessions(paths: list, channels: list[str] | None = None) -> "pa.Table":
+    """
+    One table of the given session files, read in parallel. With channels
+    (column names such as "GroveGasSensor.NO2") only those columns and the
+    timestamp are read from disk; a channel a session lacks is null there.
+    A "scent" column from each file's footer is added.
+    """
+    _require_pyarrow()
+
+    def read(path):
+        parquet = pq.ParquetFile(path)
+        names = parquet.schema_arrow.names
+        columns = None if channels is None else [c for c in ["timestamp", *channels] if c in names]
+        table = parquet.read(columns=columns, use_threads=False)
+        scent = _session_metadata(parquet.metadata).get("scent")
+        return table.append_column("scent", pa.array([scent] * table.num_rows, pa.string()))
+
+    with ThreadPoolExecutor() as pool:
+        tables = list(pool.map(read, paths))
+    if not tables:
+        return pa.table({})
+    return pa.concat_tables(tables, promote_options="default")
+
+
+def convert(path: str, output_dir: str | None = None, scent_name: str | None = None, **options) -> list[str]:
+    """Write a .json or .jsonl session as Parquet; returns the files written."""
+    from DataCollector.source.storage.jsonl_storage import JSONLinesStorage
+    if path.endswith(".jsonl"):
+        records = JSONLinesStorage.load(path)
+    else:
+        with open(path) as f:
+            records = json.load(f)
+    name = os.path.splitext(os.path.basename(path))[0]
+    storage = ParquetStorage(output_dir or os.path.dirname(path), **options)
+    # collector files are named <scent>_<date>_<time>
+    storage.open_session(scent_name or name.rsplit("_", 2)[0], name)
+    storage.write(records)
+    storage.close()
+    return storage.files
@@ -1,27 +1,91 @@
 import threading, time
 
+from DataCommunicator.source.Metrics import registry
+
+WRITE_SECONDS = registry.histogram('storage_write_seconds', 'Duration of one storage write', ('storage',))
+WRITE_ERRORS = registry.counter('storage_write_errors_total', 'Storage writes that raised', ('storage',))
+BACKLOG = registry.gauge('storage_backlog_records', 'Records a storage has not written yet', ('storage',))
+
 class StorageManager(threading.Thread):
-    def __init__(self, storages: list, data_source, interval: float = 5.0, scent_name: str = None):
+    """
+    Hands the collected records to the storages incrementally. Each storage
+    has a cursor (session index of the next record it needs); write() gets
+    only the records from its cursor on, and the cursor moves only when
+    write() returns without raising, so a failed write is retried with the
+    same records plus the new ones. Records every storage has written are
+    removed from data_source.sensor_data_list, so memory stays flat over a
+    long session. A storage more than max_backlog records behind loses the
+    oldest ones rather than holding them for ever.
+    """
+    def __init__(self, storages: list, data_source, interval: float = 5.0, scent_name: str = None,
+                 max_backlog: int = 20000):
         super().__init__(daemon=True)
         self.scent_name = scent_name
         self.storages = storages
         self.data_source = data_source
         self.interval = interval
+        self.max_backlog = max_backlog
+        self.released = 0  # session index of sensor_data_list[0]
+        self.cursors = {id(store): 0 for store in storages}
 
     def run(self):
         self.set_all_filenames(self.scent_name)
-        while not self.data_source.stop_event.is_set():
-            time.sleep(self.interval)
-            # take a snapshot under lock
+        # wait() returns as soon as the collector stops
+        while not self.data_source.stop_event.wait(self.interval):
+            self.flush()
+        # records received since the last interval
+        self.flush()
+        self.close_all()
+
+    def flush(self):
+        with self.data_source.data_lock:
+            end = self.released + len(self.data_source.sensor_data_list)
+        for store in self.storages:
+            name = store.__class__.__name__
+            cursor = self._cursor(store, name, end)
+            BACKLOG.labels(name).set(end - cursor)
+            if cursor == end:
+                continue
+            # copy only this storage's new records; appends happen only at the end of the list
             with self.data_source.data_lock:
-                snapshot = list(self.data_source.sensor_data_list)
-            # write to each configured storage
-            for store in self.storages:
+                records = self.data_source.sensor_data_list[cursor - self.released:end - self.released]
+            started = time.perf_counter()
+            try:
+                store.write(records)
+            except Exception as e:
+                WRITE_ERRORS.labels(name).inc()
+                print(f"[StorageManager] Error in {name}: {e}")
+            else:
+                self.cursors[id(store)] = end
+                BACKLOG.labels(name).set(0)
+            WRITE_SECONDS.labels(name).observe(time.perf_counter() - started)
+        self._release(end)
+
+    def _cursor(self, store, name, end):
+        cursor = self.cursors[id(store)]
+        if end - cursor > self.max_backlog:
+            skipped = end - self.max_backlog - cursor
+            print(f"[StorageManager] {name} is {end - cursor} records behind, dropping the oldest {skipped}")
+            cursor = self.cursors[id(store)] = end - self.max_backlog
+        return cursor
+
+    def _release(self, end):
+        # drop the records every storage has written
+        done = min(self.cursors.values(), default=end)
+        if done > self.released:
+            with self.data_source.data_lock:
+                del self.data_source.sensor_data_list[:done - self.released]
+            self.released = done
+
+    def close_all(self):
+        for store in self.storages:
+            close = getattr(store, "close", None)
+            if close is not None:
                 try:
-                    store.write(snapshot)
+                    close()
                 except Exception as e:
-                    print(f"[StorageManager] Error in {store.__class__.__name__}: {e}")
+                    print(f"[StorageManager] Error closing {store.__class__.__name__}: {e}")
 
     def set_all_filenames(self, scent_name):
         for storage in self.storages:
-            storage.set_filename(scent_name)
\ No newline at end of file
+            storage.set_filename(scent_name)
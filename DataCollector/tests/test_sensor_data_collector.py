@@ -7,7 +7,7 @@ import pytest
 from datetime import datetime
 from unittest.mock import patch, MagicMock
 
-from DataCollector.source.data_collector import SensorDataCollector
+from DataCollector.source.data_collector import SensorDataCollector, STREAM_REQUEST
 from DataCollector.source.storage.json_storage import JSONStorage
 from DataCollector.source.storage_manager import StorageManager
 
@@ -86,6 +86,107 @@ def test_storage_manager_writes_from_datasource(temp_output_dir):
     assert {"sensor": "temp", "value": 10} in storage.written[0]
 
 
+def test_storage_manager_stop_writes_last_records_and_closes_without_waiting_out_interval():
+    class DummyCollector:
+        def __init__(self):
+            self.stop_event = threading.Event()
+            self.data_lock = threading.Lock()
+            self.sensor_data_list = []
+
+    class DummyStorage:
+        def __init__(self):
+            self.written = []
+            self.closed = False
+
+        def write(self, data):
+            self.written.extend(data)
+
+        def close(self):
+            self.closed = True
+
+        def set_filename(self, scent_name):
+            pass
+
+    collector = DummyCollector()
+    storage = DummyStorage()
+    manager = StorageManager([storage], data_source=collector, interval=60)
+    manager.start()
+    collector.sensor_data_list.append({"value": 1})
+
+    started = time.monotonic()
+    collector.stop_event.set()
+    manager.join(timeout=5)
+
+    assert not manager.is_alive() and time.monotonic() - started < 5
+    assert storage.written == [{"value": 1}] and storage.closed
+
+
+def test_storage_manager_hands_each_storage_only_new_records():
+    class DummyCollector:
+        def __init__(self):
+            self.stop_event = threading.Event()
+            self.data_lock = threading.Lock()
+            self.sensor_data_list = []
+
+    class FlakyStorage:
+        def __init__(self, fail=0):
+            self.written = []
+            self.fail = fail
+
+        def write(self, data):
+            if self.fail:
+                self.fail -= 1
+                raise OSError("disk full")
+            self.written.append(list(data))
+
+        def set_filename(self, scent_name):
+            pass
+
+    collector = DummyCollector()
+    steady, flaky = FlakyStorage(), FlakyStorage(fail=1)
+    manager = StorageManager([steady, flaky], data_source=collector, interval=0)
+    records = [{"value": i} for i in range(5)]
+
+    collector.sensor_data_list.extend(records[:2])
+    manager.flush()
+    assert steady.written == [records[:2]] and flaky.written == []
+    # the failed storage still needs them, so they stay in memory
+    assert collector.sensor_data_list == records[:2]
+
+    collector.sensor_data_list.extend(records[2:4])
+    manager.flush()
+    assert steady.written == [records[:2], records[2:4]]
+    assert flaky.written == [records[:4]]
+    assert collector.sensor_data_list == [] and manager.released == 4
+
+    collector.sensor_data_list.append(records[4])
+    manager.flush()
+    manager.flush()
+    assert steady.written[-1] == flaky.written[-1] == [records[4]]
+    assert len(steady.written) == 3 and collector.sensor_data_list == []
+
+
+def test_storage_manager_drops_backlog_of_a_failing_storage(capsys):
+    class DummyCollector:
+        stop_event = threading.Event()
+        data_lock = threading.Lock()
+        sensor_data_list = [{"value": i} for i in range(10)]
+
+    class BrokenStorage:
+        def write(self, data):
+            raise OSError("unplugged")
+
+        def set_filename(self, scent_name):
+            pass
+
+    collector = DummyCollector()
+    manager = StorageManager([BrokenStorage()], data_source=collector, max_backlog=4)
+    manager.flush()
+
+    assert collector.sensor_data_list == [{"value": i} for i in range(6, 10)]
+    assert "dropping the oldest 6" in capsys.readouterr().out
+
+
 def test_receiver_client_appends_data():
     collector = SensorDataCollector(scent_name="test")
     receiver = collector._ReceiverClient(collector)
@@ -99,6 +200,30 @@ def test_receiver_client_appends_data():
         assert "timestamp" in collector.sensor_data_list[0]
 
 
+def test_receiver_client_requests_stream_when_the_reader_appears():
+    collector = SensorDataCollector(scent_name="test")
+    receiver = collector._ReceiverClient(collector)
+    sent = []
+
+    async def send(to, payload):
+        sent.append((to, payload))
+
+    receiver.connection.send = send
+
+    async def receive():
+        # the reader started after us: its first frame triggers the request
+        await receiver.on_message("sensor", {"value": 1, "meta": {"seq": 5}})
+        await receiver.on_message("sensor", {"value": 2, "meta": {"seq": 6}})
+        # restarted: the sequence starts over
+        await receiver.on_message("sensor", {"value": 3, "meta": {"seq": 0}})
+        await receiver.on_message("other", {"value": 4})
+
+    asyncio_run(receive())
+
+    assert sent == [("sensor", STREAM_REQUEST), ("sensor", STREAM_REQUEST)]
+    assert len(collector.sensor_data_list) == 4
+
+
 def test_start_handles_keyboard_interrupt(monkeypatch, tmp_path, capfd):
     # Use a dummy receiver with no-op start()
     class DummyReceiver:
@@ -123,7 +248,8 @@ def test_start_handles_keyboard_interrupt(monkeypatch, tmp_path, capfd):
 
         def run(self):
             self.calls.append("run")
-            time.sleep(0.1)
+            # like the real manager: wait on the stop event, not on the patched sleep
+            self.collector.stop_event.wait(self.interval)
             self.collector.stop_event.set()
 
     monkeypatch.setattr("DataCollector.source.data_collector.StorageManager", DummyStorageManager)
@@ -146,3 +272,313 @@ def asyncio_run(coro):
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
         return loop.run_until_complete(coro)
+
+
+def test_comm_storage_write_queues_without_blocking():
+    import asyncio
+    from DataCollector.source.storage.comm_storage import CommStorage
+
+    storage = CommStorage("ws://unused")
+    connects = []
+    queued = []
+
+    async def fake_connect():
+        connects.append(True)
+        # a listener that stays up, so the connection reports itself connected
+        storage.ws_connection._tasks = [asyncio.get_running_loop().create_future()]
+
+    storage.ws_connection.connect = fake_connect
+    storage.ws_connection.send_nowait = lambda to, payload, on_ack=None, ack_key=None: queued.append((to, payload, on_ack))
+
+    records = [{"value": i} for i in range(8)]
+    storage.write(records[:3])
+    assert queued == []
+
+    storage.write(records[3:5])
+    storage._connect_future.result(timeout=1)
+    storage.write([])
+    storage.write(records[5:])
+
+    assert len(connects) == 1
+    # only records added since the last write go out, tagged with their session offset
+    assert [payload for _, payload, _ in queued] == [
+        {"offset": 0, "records": records[:5]},
+        {"offset": 5, "records": records[5:]},
+    ]
+    assert storage.unacked == records
+
+
+def test_comm_storage_releases_acked_records_and_resends_the_rest():
+    from DataCollector.source.storage.comm_storage import CommStorage
+
+    storage = CommStorage(connection=MagicMock(), ack_timeout=60)
+    queued = []
+    storage.ws_connection.send_nowait = lambda to, payload, on_ack=None, ack_key=None: queued.append((payload, on_ack))
+
+    records = [{"value": i} for i in range(9)]
+    storage.write(records[:5])
+    storage.write(records[5:7])
+    storage.write(records[7:])
+
+    # acks out of order: nothing is released until the first batch is confirmed
+    queued[1][1]()
+    assert storage.acked == 0 and storage.unacked == records
+    queued[0][1]()
+    assert storage.acked == 7 and storage.unacked == records[7:]
+
+    # the last batch was never acked: it is resent with the same offset
+    storage.ack_timeout = 0
+    storage.write([])
+    assert queued[-1][0] == {"offset": 7, "records": records[7:]}
+    queued[-1][1]()
+    queued[2][1]()  # late ack for the first copy is ignored
+    assert storage.acked == 9 and storage.unacked == []
+
+
+def test_comm_storage_resends_on_a_timer():
+    from DataCollector.source.storage.comm_storage import CommStorage
+
+    storage = CommStorage(connection=MagicMock(), ack_timeout=0.05)
+    queued = []
+    storage.ws_connection.send_nowait = lambda to, payload, on_ack=None, ack_key=None: queued.append((payload, on_ack))
+
+    records = [{"value": i} for i in range(5)]
+    storage.write(records)
+    # no further write(): the timer resends the unacked batch
+    deadline = time.monotonic() + 1
+    while len(queued) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(queued) >= 2
+    assert queued[-1][0] == {"offset": 0, "records": records}
+    storage.close()
+
+
+def test_comm_storage_close_sends_the_rest_and_waits_for_acks():
+    from DataCollector.source.storage.comm_storage import CommStorage
+
+    storage = CommStorage(connection=MagicMock(), ack_timeout=60, close_timeout=1)
+    queued = []
+
+    def send_nowait(to, payload, on_ack=None, ack_key=None):
+        queued.append(payload)
+        threading.Timer(0.05, on_ack).start()  # the broker acks a moment later
+
+    storage.ws_connection.send_nowait = send_nowait
+    records = [{"value": i} for i in range(3)]
+    storage.write(records)  # below data_length_to_send: nothing sent yet
+    assert queued == []
+
+    storage.close()
+
+    assert queued == [{"offset": 0, "records": records}]
+    assert storage.acked == 3 and storage.unacked == []
+
+
+def test_comm_storage_close_logs_unacked_batches(capsys):
+    from DataCollector.source.storage.comm_storage import CommStorage
+
+    storage = CommStorage(connection=MagicMock(), ack_timeout=60, close_timeout=0.05)
+    storage.ws_connection.send_nowait = lambda to, payload, on_ack=None, ack_key=None: None
+    storage.write([{"value": i} for i in range(5)])
+
+    storage.close()
+
+    assert "without an ack for elements 0-5" in capsys.readouterr().out
+    assert storage._closed.is_set()
+
+
+def test_comm_storage_shares_collector_connection():
+    from DataCollector.source.storage.comm_storage import CommStorage
+
+    collector = SensorDataCollector(scent_name="test")
+    storage = CommStorage(connection=collector.connection_mux.channel())
+
+    assert storage.loop is None
+    assert set(collector.connection_mux.channels) == {"collector", "data_collector"}
+
+    storage.write([{"value": i} for i in range(5)])
+    msg, payload = collector.connection_mux._outbox[0]
+    assert msg["from"] == "data_collector"
+    assert msg["topic"] == "complete_data"
+    assert "ack" in msg
+    assert payload["offset"] == 0 and len(payload["records"]) == 5
+
+
+def test_jsonl_storage_appends_only_new_records(temp_output_dir):
+    from DataCollector.source.storage.jsonl_storage import JSONLinesStorage
+
+    storage = JSONLinesStorage(output_dir=str(temp_output_dir), fsync="always")
+    storage.set_filename("peach")
+    records = [{"BME680Sensor": {"Temperature": 20.0 + i}, "timestamp": f"t{i}"} for i in range(5)]
+
+    storage.write(records[:2])
+    size = os.path.getsize(storage.output_file)
+    storage.write([])
+    assert os.path.getsize(storage.output_file) == size
+    storage.write(records[2:])
+    storage.close()
+
+    assert storage.output_file.endswith(".jsonl")
+    with open(storage.output_file) as f:
+        assert len(f.readlines()) == 5
+    assert JSONLinesStorage.load(storage.output_file) == records
+
+
+def test_jsonl_storage_load_skips_truncated_last_line(temp_output_dir):
+    from DataCollector.source.storage.jsonl_storage import JSONLinesStorage
+
+    path = temp_output_dir / "cut.jsonl"
+    path.write_text('{"value": 1}\n{"value": 2}\n{"val')
+
+    assert JSONLinesStorage.load(str(path)) == [{"value": 1}, {"value": 2}]
+    with pytest.raises(ValueError):
+        JSONLinesStorage(fsync="sometimes")
+
+
+def test_csv_storage_flattens_channels_and_writes_header_once(temp_output_dir):
+    import csv
+    from DataCollector.source.storage.csv_storage import CSVStorage
+
+    storage = CSVStorage(output_dir=str(temp_output_dir))
+    storage.set_filename("peach")
+    records = [
+        {"BME680Sensor": {"Temperature": 20.5 + i, "Humidity": 40}, "GroveGasSensor": {"NO2": 300 + i},
+         "timestamp": f"t{i}", "meta": {"seq": i}}
+        for i in range(3)
+    ]
+    storage.write(records[:2])
+    storage.write(records[2:])
+    storage.close()
+
+    with open(storage.output_file, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["timestamp", "BME680Sensor.Temperature", "BME680Sensor.Humidity", "GroveGasSensor.NO2",
+                       "meta.seq"]
+    assert rows[1:] == [[f"t{i}", str(20.5 + i), "40", str(300 + i), str(i)] for i in range(3)]
+
+
+def test_csv_storage_adds_columns_for_channels_seen_mid_session(temp_output_dir):
+    import csv
+    from DataCollector.source.storage.csv_storage import CSVStorage
+
+    storage = CSVStorage(output_dir=str(temp_output_dir))
+    storage.set_filename("peach")
+    storage.write([{"SGP30Sensor": {"CO2": 400}, "timestamp": "t0"}])
+    storage.write([{"SGP30Sensor": {"CO2": 410, "TVOC": 3}, "BME680Sensor": None, "timestamp": "t1",
+                    "meta": {"missing": ["BME680Sensor"]}}])
+    storage.write([{"SGP30Sensor": {"CO2": 420}, "timestamp": "t2"}])
+    storage.close()
+
+    with open(storage.output_file, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == ["timestamp", "SGP30Sensor.CO2", "SGP30Sensor.TVOC", "meta.missing"]
+    assert [row["SGP30Sensor.CO2"] for row in rows] == ["400", "410", "420"]
+    assert [row["SGP30Sensor.TVOC"] for row in rows] == [None, "3", ""]
+    assert rows[1]["meta.missing"] == "BME680Sensor"
+
+
+def test_parquet_storage_writes_row_groups_with_session_footer(temp_output_dir):
+    pq = pytest.importorskip("pyarrow.parquet")
+    from DataCollector.source.storage.parquet_storage import ParquetStorage, load_sessions, session_metadata
+
+    storage = ParquetStorage(output_dir=str(temp_output_dir), row_group_size=2)
+    storage.set_filename("peach")
+    records = [
+        {"BME680Sensor": {"Temperature": 20.0 + i, "GasResistance": 120000}, "SGP30Sensor": {"CO2": 400 + i},
+         "timestamp": f"2025-04-25T17:50:{10 + i:02d}", "meta": {"seq": i}}
+        for i in range(5)
+    ]
+    records[3]["SGP30Sensor"] = None
+    storage.write(records[:3])
+    assert storage.written == 2  # the third record waits for its row group
+    storage.write(records[3:])
+    storage.close()
+
+    parquet = pq.ParquetFile(storage.output_file)
+    assert parquet.metadata.num_row_groups == 3
+    assert str(parquet.schema_arrow.field("BME680Sensor.Temperature").type) == "double"
+    assert str(parquet.schema_arrow.field("timestamp").type) == "timestamp[us]"
+    assert session_metadata(storage.output_file) == {
+        "scent": "peach", "session_start": "2025-04-25T17:50:10", "session_end": "2025-04-25T17:50:14",
+        "records": "5", "part": "0",
+    }
+
+    table = load_sessions([storage.output_file], channels=["SGP30Sensor.CO2", "Grove.NO2"])
+    assert table.column_names == ["timestamp", "SGP30Sensor.CO2", "scent"]
+    assert table.column("SGP30Sensor.CO2").to_pylist() == [400.0, 401.0, 402.0, None, 404.0]
+
+
+def test_parquet_storage_starts_a_part_for_new_channels_and_converts_jsonl(temp_output_dir):
+    pytest.importorskip("pyarrow")
+    from DataCollector.source.storage.jsonl_storage import JSONLinesStorage
+    from DataCollector.source.storage.parquet_storage import convert, load_sessions
+
+    jsonl = JSONLinesStorage(output_dir=str(temp_output_dir))
+    jsonl.set_filename("mint")
+    jsonl.write([{"SGP30Sensor": {"CO2": 400}, "timestamp": "2025-04-25T17:50:10"}])
+    jsonl.write([{"SGP30Sensor": {"CO2": 410, "TVOC": 3}, "timestamp": "2025-04-25T17:50:12"}])
+    jsonl.close()
+
+    files = convert(jsonl.output_file, row_group_size=1)
+    assert [os.path.basename(f) for f in files] == [
+        os.path.basename(jsonl.output_file)[:-len(".jsonl")] + suffix for suffix in (".parquet", ".1.parquet")
+    ]
+    table = load_sessions(files)
+    assert table.column("SGP30Sensor.TVOC").to_pylist() == [None, 3.0]
+    assert table.column("scent").to_pylist() == ["mint", "mint"]
+
+
+def test_parquet_storage_failed_write_is_retried_without_duplicates(temp_output_dir):
+    pytest.importorskip("pyarrow")
+    from DataCollector.source.storage.parquet_storage import ParquetStorage, load_sessions
+
+    storage = ParquetStorage(output_dir=str(temp_output_dir), row_group_size=2)
+    storage.set_filename("lime")
+    records = [{"SGP30Sensor": {"CO2": 400 + i}, "timestamp": f"2025-04-25T17:50:{10 + i:02d}"} for i in range(5)]
+    records[1]["SGP30Sensor"]["CO2"] = "n/a"  # cast to null instead of failing every later group
+
+    storage.write(records[:1])
+    write_group = storage._write_group
+    calls = []
+
+    def fail_second_group(rows):
+        calls.append(len(rows))
+        if len(calls) == 2:
+            raise OSError("disk full")
+        write_group(rows)
+
+    storage._write_group = fail_second_group
+    with pytest.raises(OSError):
+        storage.write(records[1:4])  # the first group is written, the second fails
+    assert storage.written == 2
+    storage.write(records[1:5])  # StorageManager resends from the same cursor
+    storage.close()
+
+    table = load_sessions([storage.output_file])
+    assert storage.written == 5
+    assert table.column("SGP30Sensor.CO2").to_pylist() == [400.0, None, 402.0, 403.0, 404.0]
+
+
+def test_csv_storage_retries_a_failed_header_rewrite(temp_output_dir, monkeypatch):
+    import csv
+    from DataCollector.source.storage.csv_storage import CSVStorage
+
+    storage = CSVStorage(output_dir=str(temp_output_dir))
+    storage.set_filename("fig")
+    storage.write([{"SGP30Sensor": {"CO2": 400}, "timestamp": "t0"}])
+
+    def disk_full(src, dst):
+        raise OSError(28, "No space left on device")
+
+    new_channel = [{"SGP30Sensor": {"CO2": 410, "TVOC": 3}, "timestamp": "t1"}]
+    monkeypatch.setattr("DataCollector.source.storage.csv_storage.os.replace", disk_full)
+    with pytest.raises(OSError):
+        storage.write(new_channel)
+    monkeypatch.undo()
+    storage.write(new_channel)  # StorageManager's retry
+    storage.close()
+
+    with open(storage.output_file, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == ["timestamp", "SGP30Sensor.CO2", "SGP30Sensor.TVOC"]
+    assert [row["SGP30Sensor.TVOC"] for row in rows] == [None, "3"]
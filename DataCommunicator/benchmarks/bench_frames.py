@@ -0,0 +1,80 @@
+"""
+Packed frame benchmark.
+
+Compares one sensor frame sent as the legacy dict of dicts with the same
+frame packed against a FrameSchema: wire size of the encoded packet, and
+the consumer cost of turning a loading phase of frames into a feature
+matrix (walking dict keys vs. stacking the NumPy views).
+
+Run from the project root:
+    python -m DataCommunicator.benchmarks.bench_frames
+"""
+import random
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, '..', '..', '..')))
+
+from DataCommunicator.benchmarks.bench_serializer import make_record
+from DataCommunicator.source.FrameSchema import FrameDecoder, FrameEncoder
+from DataCommunicator.source.Serializer import default_serializer
+
+FRAMES = 900  # 30 min at 2 s
+REPEAT = 5
+
+
+def best_of(fn) -> float:
+    best = float('inf')
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    start = datetime.now()
+    frames = [make_record(start + timedelta(seconds=2 * i)) for i in range(FRAMES)]
+    serializer = default_serializer()
+    encoder = FrameEncoder()
+    decoder = FrameDecoder()
+
+    packed = []
+    for frame in frames:
+        payload, schema = encoder.pack(frame)
+        if schema is not None:
+            decoder.accept(schema)
+        packed.append(payload)
+
+    def wire(payload):
+        return serializer.dumps({'type': 'publish', 'topic': 'sensor_readings', 'from': 'sensor', 'payload': payload})
+
+    dict_text = [wire(frame) for frame in frames]
+    packed_text = [wire(payload) for payload in packed]
+
+    def dict_matrix():
+        rows = []
+        for text in dict_text:
+            frame = serializer.loads(text)['payload']
+            rows.append([float(v) for k, readings in frame.items() if k != 'timestamp' for v in readings.values()])
+        return np.array(rows)
+
+    def packed_matrix():
+        packets = [serializer.loads(text)['payload'] for text in packed_text]
+        records = decoder.stack(packets)
+        return decoder.schema_of(packets[0]).matrix(records)
+
+    assert np.allclose(dict_matrix(), packed_matrix())
+    print(f"{'format':>8} {'bytes/frame':>12} {'matrix ms':>10}")
+    for name, texts, build in (('dict', dict_text, dict_matrix), ('packed', packed_text, packed_matrix)):
+        size = sum(len(text) for text in texts) / len(texts)
+        print(f"{name:>8} {size:>12.0f} {best_of(build) * 1e3:>10.2f}")
+
+
+if __name__ == '__main__':
+    random.seed(1)
+    main()
@@ -0,0 +1,94 @@
+"""
+Instrumentation overhead benchmark.
+
+Per-call cost of a trivial method (an on_tick-sized body) undecorated,
+with the shared Instrumentation at OFF, at STATS (every call timed and
+every 16th call timed) and at TRACE, next to the previous decorators that
+always formatted their log lines (output to /dev/null).
+
+Run from the project root:
+    python -m DataCommunicator.benchmarks.bench_instrumentation
+"""
+import contextlib
+import functools
+import logging
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, '..', '..', '..')))
+
+from DataCommunicator.source.Instrumentation import OFF, STATS, TRACE, Instrumentation
+
+CALLS = 200_000
+
+logger = logging.getLogger('bench-aop')
+logger.addHandler(logging.NullHandler())
+logger.propagate = False
+logger.setLevel(logging.INFO)
+
+
+def legacy_log_method(func):
+    # the former SensorReader LoggingAspect.log_method
+    def wrapper(*args, **kwargs):
+        print(f"[LOG] Before calling {args[0].__class__.__name__}.{func.__name__}()")
+        try:
+            return func(*args, **kwargs)
+        finally:
+            print(f"[LOG] After calling {args[0].__class__.__name__}.{func.__name__}()")
+    return wrapper
+
+
+def legacy_log_call(func):
+    # the former DisplayController aop_decorators.log_call
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        params = [repr(a) for a in args[1:]] + [f"{k}={v!r}" for k, v in kwargs.items()]
+        logger.info(f"ENTER {func.__qualname__}({', '.join(params)})")
+        result = func(*args, **kwargs)
+        logger.info(f"EXIT  {func.__qualname__} -> {result!r}")
+        return result
+    return wrapper
+
+
+class Tick:
+    def __init__(self):
+        self.n = 0
+
+    def on_tick(self, dt):
+        self.n += 1
+        return self.n
+
+
+def per_call_ns(method, dt=0.1) -> float:
+    return min(timeit.repeat(lambda: method(dt), number=CALLS, repeat=3)) / CALLS * 1e9
+
+
+def main():
+    rows = [('undecorated', Tick().on_tick)]
+
+    for label, level, sample_every in (('off', OFF, 1), ('stats', STATS, 1), ('stats 1/16', STATS, 16)):
+        instr = Instrumentation(level, sample_every)
+        tick = Tick()
+        rows.append((label, instr.instrument(name='tick')(Tick.on_tick).__get__(tick)))
+
+    instr = Instrumentation(TRACE)
+    tick = Tick()
+    rows.append(('trace (no-op hooks)', instr.instrument(
+        name='tick', on_enter=lambda args, kwargs: None, on_exit=lambda args, result, error: None,
+    )(Tick.on_tick).__get__(tick)))
+    rows.append(('legacy log_call', legacy_log_call(Tick.on_tick).__get__(Tick())))
+    rows.append(('legacy log_method', legacy_log_method(Tick.on_tick).__get__(Tick())))
+
+    results = []
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for label, method in rows:
+            results.append((label, per_call_ns(method)))
+    base = results[0][1]
+    print(f"{'hooks':>20} {'ns/call':>9} {'overhead ns':>12}")
+    for label, ns in results:
+        print(f"{label:>20} {ns:>9.0f} {ns - base:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Serializer benchmark with realistic CommStorage session sizes.
+
+Measures the encode time of a full session list with every available
+serializer, and the longest event-loop stall while such a payload is sent
+through WebSocketConnection with and without worker-thread offloading.
+
+Run from the project root:
+    python -m DataCommunicator.benchmarks.bench_serializer
+"""
+import asyncio
+import random
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, '..', '..', '..')))
+
+from DataCommunicator.source.Serializer import JsonSerializer, OrjsonSerializer, orjson
+from DataCommunicator.source.WebSocketConnection import WebSocketConnection
+
+# 2 s sampling: one loading phase, 30 min, 3 h and a full-day campaign
+SESSION_SIZES = [125, 900, 5400, 43200]
+REPEAT = 5
+
+
+def make_record(ts: datetime) -> dict:
+    return {
+        "BME680Sensor": {
+            "Temperature": round(random.uniform(20, 30), 2),
+            "Humidity": round(random.uniform(30, 60), 2),
+            "Pressure": round(random.uniform(990, 1030), 2),
+            "GasResistance": random.randint(50000, 250000),
+        },
+        "SGP30Sensor": {"CO2": random.randint(400, 2000), "TVOC": random.randint(0, 600)},
+        "GroveGasSensor": {
+            "NO2": random.randint(100, 800),
+            "Ethanol": random.randint(100, 800),
+            "VOC": random.randint(100, 800),
+            "CO": random.randint(100, 800),
+            "0x04": random.randint(100, 800),
+            "0x08": random.randint(100, 800),
+        },
+        "timestamp": ts.isoformat(),
+    }
+
+
+def make_session(n: int) -> list:
+    start = datetime.now()
+    return [make_record(start + timedelta(seconds=2 * i)) for i in range(n)]
+
+
+def bench_encode(serializer, payload) -> float:
+    best = float('inf')
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        serializer.dumps({'type': 'publish', 'topic': 'complete_data', 'from': 'bench', 'payload': payload})
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+class NullWS:
+    async def send(self, msg):
+        pass
+
+
+async def max_loop_stall(serializer, payload) -> float:
+    """Longest gap seen by a 1 ms ticker while the payload is sent."""
+    conn = WebSocketConnection('ws://bench', serializer=serializer)
+    conn.name = 'bench'
+    conn.ws = NullWS()
+
+    stall = 0.0
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal stall
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            stall = max(stall, now - last)
+            last = now
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    for _ in range(REPEAT):
+        await conn.send('topic:complete_data', payload)
+    done.set()
+    await tick
+    return stall
+
+
+def main():
+    serializers = [('json', JsonSerializer)]
+    if orjson is not None:
+        serializers.append(('orjson', OrjsonSerializer))
+
+    print(f"{'records':>8} {'serializer':>10} {'encode ms':>10} {'stall ms (loop)':>16} {'stall ms (offload)':>19}")
+    for n in SESSION_SIZES:
+        session = make_session(n)
+        for name, cls in serializers:
+            encode = bench_encode(cls(), session)
+            on_loop = asyncio.run(max_loop_stall(cls(offload_threshold=sys.maxsize), session))
+            offload = asyncio.run(max_loop_stall(cls(offload_threshold=0), session))
+            print(f"{n:>8} {name:>10} {encode * 1e3:>10.2f} {on_loop * 1e3:>16.2f} {offload * 1e3:>19.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,19 @@
+import asyncio
 from abc import ABC, abstractmethod
 
+# Reserved topic the broker delivers to every connected client, subscribed or not
+CONTROL_TOPIC = 'control'
+
+
 class BaseDataClient(ABC):
     """
     Abstract base for any named client.  Holds a IDataConnection,
     must implement run() and on_message().
+    Messages on CONTROL_TOPIC go to on_control() instead of on_message().
     """
+    profiler = None  # DataCommunicator.source.Profiling.Profiler, created on first use
+    _profiling: asyncio.Task | None = None
+
     def __init__(self, name: str, connection):
         self.name = name
         self.connection = connection
@@ -24,3 +33,36 @@ class BaseDataClient(ABC):
     async def on_message(self, frm: str, payload: dict) -> None:
         """Handle an incoming message from another client."""
         ...
+
+    async def on_control(self, frm: str, payload: dict) -> None:
+        """
+        Handle a control message. Commands are addressed with 'target' (a
+        client name, or '*' for all):
+          {'command': 'profile', 'mode': 'cprofile'|'sample'|'tracemalloc', 'duration': s, 'top': n}
+          {'command': 'profile_stop'}
+        The profile result is written to a local file and its summary is
+        sent back to the requester as {'profile': {...}}.
+        Subclasses that add commands should call super().on_control().
+        """
+        if not isinstance(payload, dict) or payload.get('target', '*') not in ('*', self.name):
+            return
+        command = payload.get('command')
+        if command == 'profile':
+            if self._profiling is not None and not self._profiling.done():
+                await self.connection.send(frm, {'profile': {'service': self.name, 'error': 'already profiling'}})
+                return
+            self._profiling = asyncio.create_task(self._profile(frm, payload))
+        elif command == 'profile_stop' and self.profiler is not None:
+            self.profiler.finish()
+
+    async def _profile(self, frm: str, payload: dict) -> None:
+        from DataCommunicator.source.Profiling import Profiler, TOP
+        if self.profiler is None:
+            self.profiler = Profiler(self.name)
+        try:
+            summary = await self.profiler.run(payload.get('mode', 'cprofile'), float(payload.get('duration', 10.0)),
+                                              int(payload.get('top', TOP)))
+        except (ValueError, RuntimeError, OSError) as e:
+            summary = {'service': self.name, 'error': str(e)}
+        print(f"[{self.name}] Profile finished: {summary.get('file', summary.get('error'))}")
+        await self.connection.send(frm, {'profile': summary})
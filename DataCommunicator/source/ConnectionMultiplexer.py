@@ -0,0 +1,130 @@
+import asyncio
+from typing import Callable, Hashable
+
+from DataCommunicator.source.Serializer import ISerializer
+from DataCommunicator.source.BaseDataClient import CONTROL_TOPIC
+from DataCommunicator.source.WebSocketConnection import IDataConnection, WebSocketConnection, _deliver_control
+
+
+class ConnectionMultiplexer(WebSocketConnection):
+    """
+    One physical broker connection shared by several BaseDataClients in the
+    same process. Each client gets its own MultiplexedConnection via
+    channel(); subscriptions are merged (the broker sees each topic once)
+    and incoming packets are routed back by topic or by target name.
+    """
+    def __init__(self, uri: str, name: str, serializer: ISerializer | None = None, max_pending: int = 1024,
+                 tracing: bool = True):
+        super().__init__(uri, serializer, max_pending, tracing)
+        self.name = name
+        self.channels: dict[str, 'MultiplexedConnection'] = {}
+        self._topic_routes: dict[str, set[str]] = {}  # topic -> channel names
+        self._connect_lock: asyncio.Lock | None = None
+
+    def channel(self) -> 'MultiplexedConnection':
+        """A new logical connection to hand to a BaseDataClient."""
+        return MultiplexedConnection(self)
+
+    def _attach(self, channel: 'MultiplexedConnection') -> None:
+        if channel.name in self.channels and self.channels[channel.name] is not channel:
+            raise ValueError(f"Client name already in use on this connection: {channel.name}")
+        self.channels[channel.name] = channel
+        if self.connected:
+            self._enqueue(self._alias(channel.name), None)
+
+    @staticmethod
+    def _alias(name: str) -> dict:
+        # lets other clients address this logical client by name
+        return {'type': 'alias', 'name': name}
+
+    async def connect(self) -> None:
+        # the first client opens the socket, later ones reuse it
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if not self.connected:
+                await super().connect()
+                for name in self.channels:
+                    await self.ws.send(self.serializer.dumps(self._alias(name)))
+                # re-subscribe merged topics after a reconnect
+                for topic in self._topic_routes:
+                    await super().subscribe(topic)
+
+    async def _subscribe(self, channel: 'MultiplexedConnection', topic: str) -> None:
+        subscribers = self._topic_routes.setdefault(topic, set())
+        first = not subscribers
+        subscribers.add(channel.name)
+        # before connect() the merged topics are subscribed once the socket is open
+        if first and self.connected:
+            await super().subscribe(topic)
+
+    async def _unsubscribe(self, channel: 'MultiplexedConnection', topic: str) -> None:
+        subscribers = self._topic_routes.get(topic, set())
+        subscribers.discard(channel.name)
+        if not subscribers and topic in self._topic_routes:
+            del self._topic_routes[topic]
+            if self.connected:
+                await super().unsubscribe(topic)
+
+    async def _dispatch(self, data: dict) -> None:
+        topic = data.get('topic')
+        to = data.get('to')
+        if topic == CONTROL_TOPIC:
+            # every logical client answers control messages
+            for channel in list(self.channels.values()):
+                if channel.client is not None:
+                    await _deliver_control(channel.client, data.get('from'), data.get('payload'))
+            return
+        if topic is not None:
+            names = list(self._topic_routes.get(topic, ()))
+        elif to in self.channels:
+            names = [to]
+        else:
+            # broadcasts and packets addressed to the shared connection itself
+            names = list(self.channels)
+
+        frm = data.get('from')
+        payload = data.get('payload')
+        for name in names:
+            channel = self.channels.get(name)
+            if channel is not None and channel.client is not None:
+                await channel.client.on_message(frm, payload)
+
+
+class MultiplexedConnection(IDataConnection):
+    """Logical IDataConnection backed by a shared ConnectionMultiplexer."""
+
+    def __init__(self, mux: ConnectionMultiplexer):
+        self.mux = mux
+        self.client = None
+        self.name = None
+
+    def set_client(self, client) -> None:
+        if not hasattr(client, 'name'):
+            raise AttributeError("Client must have a 'name' attribute")
+        self.client = client
+        self.name = client.name
+        self.mux._attach(self)
+
+    @property
+    def tracker(self):
+        return self.mux.tracker
+
+    async def connect(self) -> None:
+        await self.mux.connect()
+
+    async def send(self, to: str, payload: dict) -> None:
+        await self.mux._send_packet(self.mux._packet(self.name, to, payload), payload)
+
+    def send_nowait(self, to: str, payload: dict, on_ack: Callable[[], None] | None = None,
+                    ack_key: Hashable | None = None) -> None:
+        self.mux._enqueue(self.mux._request_ack(self.mux._packet(self.name, to, payload), on_ack, ack_key), payload)
+
+    async def broadcast(self, payload: dict) -> None:
+        await self.send('broadcast', payload)
+
+    async def subscribe(self, topic: str) -> None:
+        await self.mux._subscribe(self, topic)
+
+    async def unsubscribe(self, topic: str) -> None:
+        await self.mux._unsubscribe(self, topic)
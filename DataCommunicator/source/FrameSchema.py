@@ -0,0 +1,243 @@
+import base64
+import hashlib
+import json
+
+import numpy as np
+from numpy.lib.recfunctions import structured_to_unstructured
+
+SCHEMA_VERSION = 1  # layout of the schema description itself
+# every value as float64: None travels as NaN, and filtered or interpolated readings are
+# fractional anyway. Integer readings are exact but decode as floats (400 -> 400.0)
+DEFAULT_DTYPE = '<f8'
+
+# frame keys that are not sensor readings; they travel next to the packed values
+FRAME_METADATA = ('timestamp', 'meta', 'raw')
+
+
+class FrameSchema:
+    """
+    Channel layout of a packed sensor frame: one structured NumPy record with
+    a field per "Sensor.Channel", in frame order, with a unit and a
+    little-endian dtype each. The id is a hash of the layout, so the same
+    channels always get the same id and any change gets a new one.
+    """
+    def __init__(self, channels: list[dict], version: int = SCHEMA_VERSION):
+        self.channels = [
+            {'name': c['name'], 'unit': c.get('unit'), 'dtype': np.dtype(c.get('dtype', DEFAULT_DTYPE)).str}
+            for c in channels
+        ]
+        self.version = version
+        self.dtype = np.dtype([(c['name'], c['dtype']) for c in self.channels])
+        canonical = json.dumps({'version': version, 'channels': self.channels}, sort_keys=True)
+        self.id = hashlib.sha1(canonical.encode()).hexdigest()[:16]
+        self._sensors = {}  # sensor -> [(channel, field)], for to_legacy()
+        for c in self.channels:
+            sensor, _, channel = c['name'].partition('.')
+            self._sensors.setdefault(sensor, []).append((channel, c['name']))
+
+    @classmethod
+    def from_frame(cls, frame: dict, units: dict | None = None, dtypes: dict | None = None,
+                   version: int = SCHEMA_VERSION) -> 'FrameSchema':
+        """Schema for the sensor readings in a legacy dict frame; units and dtypes by "Sensor.Channel" or "Sensor"."""
+        units = units or {}
+        dtypes = dtypes or {}
+        channels = []
+        for sensor, readings in frame.items():
+            if sensor in FRAME_METADATA or not isinstance(readings, dict):
+                continue
+            for channel in readings:
+                name = f'{sensor}.{channel}'
+                channels.append({
+                    'name': name,
+                    'unit': units.get(name, units.get(sensor)),
+                    'dtype': dtypes.get(name, dtypes.get(sensor, DEFAULT_DTYPE)),
+                })
+        return cls(channels, version)
+
+    @staticmethod
+    def layout(frame: dict) -> tuple:
+        """Hashable channel layout of a dict frame, to find its schema without building one."""
+        return tuple(
+            (sensor, tuple(readings))
+            for sensor, readings in frame.items()
+            if sensor not in FRAME_METADATA and isinstance(readings, dict)
+        )
+
+    def to_dict(self) -> dict:
+        return {'id': self.id, 'version': self.version, 'channels': self.channels}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'FrameSchema':
+        schema = cls(data['channels'], data.get('version', SCHEMA_VERSION))
+        if data.get('id', schema.id) != schema.id:
+            raise ValueError(f"Schema id {data['id']} does not match its channels")
+        return schema
+
+    def pack(self, frame: dict) -> dict:
+        """
+        Packed payload for a dict frame: the schema id, the values as base64
+        of one record, and the frame metadata unchanged.
+        """
+        record = np.zeros(1, dtype=self.dtype)
+        for c in self.channels:
+            sensor, _, channel = c['name'].partition('.')
+            value = (frame.get(sensor) or {}).get(channel)
+            record[c['name']] = np.nan if value is None else value
+        packed = {'schema': self.id, 'values': base64.b64encode(record.tobytes()).decode('ascii')}
+        for key in FRAME_METADATA:
+            if key in frame:
+                packed[key] = frame[key]
+        return packed
+
+    def view(self, packed: dict) -> np.ndarray:
+        """Read-only structured array over the decoded bytes (no per-value copy)."""
+        return np.frombuffer(base64.b64decode(packed['values']), dtype=self.dtype)
+
+    def stack(self, packets: list[dict]) -> np.ndarray:
+        """One structured array for many packed frames of this schema, over a single joined buffer."""
+        return np.frombuffer(b''.join(base64.b64decode(packed['values']) for packed in packets), dtype=self.dtype)
+
+    def matrix(self, records: np.ndarray) -> np.ndarray:
+        """
+        records as a 2-D (frames x channels) array: a view when every channel
+        has the same dtype, otherwise a float64 copy.
+        """
+        dtypes = {c['dtype'] for c in self.channels}
+        if len(dtypes) == 1:
+            return records.view(dtypes.pop()).reshape(len(records), len(self.channels))
+        return structured_to_unstructured(records, dtype=np.float64)
+
+    def to_legacy(self, packed: dict) -> dict:
+        """The dict of dicts older clients expect; NaN comes back as None, a missing sensor as None."""
+        record = self.view(packed)[0]
+        missing = packed.get('meta', {}).get('missing', ())
+        frame = {}
+        for sensor, fields in self._sensors.items():
+            if sensor in missing:
+                frame[sensor] = None
+                continue
+            frame[sensor] = {}
+            for channel, field in fields:
+                value = record[field].item()
+                frame[sensor][channel] = None if value != value else value
+        for sensor in missing:
+            frame.setdefault(sensor, None)
+        for key in FRAME_METADATA:
+            if key in packed:
+                frame[key] = packed[key]
+        return frame
+
+
+def is_packed(payload) -> bool:
+    return isinstance(payload, dict) and 'schema' in payload and 'values' in payload
+
+
+def is_schema(payload) -> bool:
+    return isinstance(payload, dict) and 'frame_schema' in payload
+
+
+class FrameDecoder:
+    """
+    Consumer side: keeps the schemas announced by readers and turns packed
+    frames into NumPy views or legacy dicts. Frames in the legacy dict form
+    pass through to_legacy() unchanged, so a consumer can handle both.
+    """
+    def __init__(self):
+        self.schemas: dict[str, FrameSchema] = {}
+        self._requested: set[str] = set()  # schema ids asked from the reader
+
+    def register(self, schema: FrameSchema | dict) -> FrameSchema:
+        if isinstance(schema, dict):
+            schema = FrameSchema.from_dict(schema)
+        self.schemas[schema.id] = schema
+        return schema
+
+    def accept(self, payload) -> bool:
+        """Register a schema announcement; False for anything else."""
+        if not is_schema(payload):
+            return False
+        self.register(payload['frame_schema'])
+        return True
+
+    def schema_of(self, packed: dict) -> FrameSchema | None:
+        return self.schemas.get(packed['schema'])
+
+    def schema_request(self, packed: dict) -> dict | None:
+        """
+        {'command': 'schema', 'id': ...} to send to the reader the first time
+        a frame arrives whose schema was announced before this consumer
+        subscribed; None if the schema is known or was already requested.
+        """
+        schema_id = packed['schema']
+        if schema_id in self.schemas or schema_id in self._requested:
+            return None
+        self._requested.add(schema_id)
+        return {'command': 'schema', 'id': schema_id}
+
+    def view(self, packed: dict) -> np.ndarray | None:
+        """Structured array for a packed frame, None until its schema is known."""
+        schema = self.schema_of(packed)
+        return None if schema is None else schema.view(packed)
+
+    def stack(self, packets: list[dict]) -> np.ndarray | None:
+        """Structured array for packed frames that share one schema, None until it is known."""
+        schema = self.schema_of(packets[0])
+        if schema is None:
+            return None
+        if any(packed['schema'] != schema.id for packed in packets):
+            raise ValueError("Packed frames with different schemas cannot be stacked")
+        return schema.stack(packets)
+
+    def to_legacy(self, payload: dict) -> dict | None:
+        if not is_packed(payload):
+            return payload
+        schema = self.schema_of(payload)
+        return None if schema is None else schema.to_legacy(payload)
+
+
+class FrameEncoder:
+    """
+    Reader side: one schema per channel layout, created on the first frame
+    with that layout. pack() returns the payload and, when the layout is new,
+    the schema announcement to publish before it. A sensor that is None in a
+    frame (no values) keeps the channels it last had, filled with NaN, so a
+    failing sensor does not change the layout consumers see.
+    """
+    def __init__(self, units: dict | None = None, dtypes: dict | None = None, version: int = SCHEMA_VERSION):
+        self.units = units
+        self.dtypes = dtypes
+        self.version = version
+        self.schemas: dict[str, FrameSchema] = {}
+        self._by_layout: dict[tuple, FrameSchema] = {}
+        self._channels: dict[str, tuple] = {}  # sensor -> its channels in the last frame with values
+
+    def _layout(self, frame: dict) -> tuple:
+        layout = []
+        for sensor, readings in frame.items():
+            if sensor in FRAME_METADATA:
+                continue
+            if isinstance(readings, dict):
+                self._channels[sensor] = tuple(readings)
+                layout.append((sensor, self._channels[sensor]))
+            elif readings is None and sensor in self._channels:
+                layout.append((sensor, self._channels[sensor]))
+        return tuple(layout)
+
+    def schema_for(self, frame: dict) -> tuple[FrameSchema, bool]:
+        layout = self._layout(frame)
+        schema = self._by_layout.get(layout)
+        if schema is not None:
+            return schema, False
+        filled = {sensor: dict.fromkeys(channels) for sensor, channels in layout}
+        schema = FrameSchema.from_frame(filled, self.units, self.dtypes, self.version)
+        self._by_layout[layout] = self.schemas[schema.id] = schema
+        return schema, True
+
+    def pack(self, frame: dict) -> tuple[dict, dict | None]:
+        schema, new = self.schema_for(frame)
+        return schema.pack(frame), (announcement(schema) if new else None)
+
+
+def announcement(schema: FrameSchema) -> dict:
+    """Payload that registers a schema with FrameDecoder.accept()."""
+    return {'frame_schema': schema.to_dict()}
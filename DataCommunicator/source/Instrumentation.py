@@ -0,0 +1,135 @@
+import functools
+import inspect
+import os
+import time
+
+from DataCommunicator.source.MessageTracing import LatencyHistogram
+
+# Instrumentation levels; a hook does work only if the current level is at least its own
+OFF = 0
+STATS = 1  # call and error counts, sampled latency histograms
+TRACE = 2  # STATS plus the hook's enter/exit callbacks (log lines)
+
+LEVELS = {'off': OFF, 'stats': STATS, 'trace': TRACE}
+
+
+class CallStats:
+    __slots__ = ('calls', 'errors', 'latency')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.latency = LatencyHistogram()
+
+    def snapshot(self) -> dict:
+        return {'calls': self.calls, 'errors': self.errors, 'latency': self.latency.snapshot()}
+
+
+class Instrumentation:
+    """
+    Call counters and latency histograms for decorated functions, shared by
+    all services. A hook below the current level costs one comparison;
+    at STATS every call is counted and every sample_every-th call is timed
+    into a LatencyHistogram; only at TRACE are the enter/exit callbacks run,
+    so no strings are formatted otherwise.
+
+    Counters are updated without a lock: under the GIL a concurrent
+    increment can occasionally be lost, which is fine for statistics.
+    """
+    def __init__(self, level: int | str = STATS, sample_every: int = 1):
+        self.level = OFF
+        self.sample_every = 1
+        self.stats: dict[str, CallStats] = {}
+        self.configure(level, sample_every)
+
+    def configure(self, level: int | str | None = None, sample_every: int | None = None) -> None:
+        if level is not None:
+            self.level = LEVELS[level] if isinstance(level, str) else level
+        if sample_every is not None:
+            if sample_every < 1:
+                raise ValueError("sample_every must be at least 1")
+            self.sample_every = sample_every
+
+    def _stats(self, name: str) -> CallStats:
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats.setdefault(name, CallStats())
+        return stats
+
+    def snapshot(self) -> dict:
+        return {name: stats.snapshot() for name, stats in list(self.stats.items())}
+
+    def reset(self) -> None:
+        self.stats.clear()
+
+    def instrument(self, name: str | None = None, level: int = STATS, on_enter=None, on_exit=None):
+        """
+        Decorator for sync and async functions. name defaults to the
+        function's __qualname__. At TRACE, on_enter(args, kwargs) runs
+        before the call and on_exit(args, result, error) after it (result
+        is None and error the exception if it raised).
+        """
+        def decorate(func):
+            key = name or func.__qualname__
+            stats = self._stats(key)
+
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    if self.level < level:
+                        return await func(*args, **kwargs)
+                    stats.calls += 1
+                    tracing = self.level >= TRACE
+                    timed = tracing or stats.calls % self.sample_every == 0
+                    if tracing and on_enter is not None:
+                        on_enter(args, kwargs)
+                    start = time.perf_counter() if timed else 0.0
+                    result = error = None
+                    try:
+                        result = await func(*args, **kwargs)
+                        return result
+                    except BaseException as e:
+                        error = e
+                        stats.errors += 1
+                        raise
+                    finally:
+                        if timed:
+                            stats.latency.observe(time.perf_counter() - start)
+                        if tracing and on_exit is not None:
+                            on_exit(args, result, error)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def sync_wrapper(*args, **kwargs):
+                if self.level < level:
+                    return func(*args, **kwargs)
+                stats.calls += 1
+                tracing = self.level >= TRACE
+                timed = tracing or stats.calls % self.sample_every == 0
+                if tracing and on_enter is not None:
+                    on_enter(args, kwargs)
+                start = time.perf_counter() if timed else 0.0
+                result = error = None
+                try:
+                    result = func(*args, **kwargs)
+                    return result
+                except BaseException as e:
+                    error = e
+                    stats.errors += 1
+                    raise
+                finally:
+                    if timed:
+                        stats.latency.observe(time.perf_counter() - start)
+                    if tracing and on_exit is not None:
+                        on_exit(args, result, error)
+            return sync_wrapper
+        return decorate
+
+
+# Process-wide instance; INSTRUMENTATION_LEVEL=off|stats|trace and
+# INSTRUMENTATION_SAMPLE_EVERY=n set its defaults.
+instrumentation = Instrumentation(
+    os.environ.get('INSTRUMENTATION_LEVEL', 'stats'),
+    int(os.environ.get('INSTRUMENTATION_SAMPLE_EVERY', '1')),
+)
+instrument = instrumentation.instrument
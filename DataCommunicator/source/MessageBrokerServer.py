@@ -1,23 +1,35 @@
 import asyncio
-import json
 import websockets
 
+from DataCommunicator.source.BaseDataClient import CONTROL_TOPIC
+from DataCommunicator.source.Metrics import registry, serve_metrics
+from DataCommunicator.source.Serializer import ISerializer, default_serializer
+
+PACKETS = registry.counter('broker_packets_total', 'Packets received from clients', ('type',))
+CONNECTIONS = registry.gauge('broker_connections', 'Connected clients')
+SUBSCRIPTIONS = registry.gauge('broker_subscriptions', 'Topic subscriptions of all clients')
+
 class MessageBrokerServer:
     """
     The central broker. Clients register on connect, then send JSON
     messages of the form {'to': str, 'from': str, 'payload': dict}.
+    Publishes to CONTROL_TOPIC reach every connection without a subscription.
     """
-    def __init__(self, host: str = 'localhost', port: int = 8765):
+    def __init__(self, host: str = 'localhost', port: int = 8765, serializer: ISerializer | None = None):
         self.host = host
         self.port = port
+        self.serializer = serializer or default_serializer()
         self.topics: dict[str, set[str]] = {}  # topic -> set of client names
         self.connections: dict[str, websockets.WebSocketServerProtocol] = {}
         self.client_topics: dict[str, set[str]] = {}  # client -> set of topics
+        self.names: dict[str, str] = {}  # registered/alias name -> connection id
+        CONNECTIONS.set_function(lambda: len(self.connections))
+        SUBSCRIPTIONS.set_function(lambda: sum(len(ids) for ids in list(self.topics.values())))
 
     async def handler(self, websocket, path=None):
         try:
             register = await websocket.recv()
-            data = json.loads(register)
+            data = self.serializer.loads(register)
             if data.get('type') != 'register' or 'name' not in data:
                 await websocket.close()
                 return
@@ -28,11 +40,13 @@ class MessageBrokerServer:
             
             self.connections[connection_id] = websocket
             self.client_topics[connection_id] = set()
+            self.names[name] = connection_id
             print(f'[Broker] Registered client: {connection_id}')
 
             async for message in websocket:
-                msg = json.loads(message)
+                msg = self.serializer.loads(message)
                 mtype = msg.get('type')
+                PACKETS.labels(mtype or 'route').inc()
 
                 if mtype == 'subscribe':
                     topic = msg['topic']
@@ -46,20 +60,27 @@ class MessageBrokerServer:
                     self.client_topics[connection_id].discard(topic)
                     print(f'[Broker] {connection_id} unsubscribed from {topic}')
 
+                elif mtype == 'alias':
+                    # a shared (multiplexed) connection announcing one of its logical clients
+                    self.names[msg['name']] = connection_id
+                    print(f'[Broker] {connection_id} is also reachable as {msg["name"]}')
+
                 elif mtype == 'publish':
                     topic = msg['topic']
                     frm = msg['from']
                     payload = msg['payload']
-                    await self.publish(topic, frm, payload)
+                    await self.publish(topic, frm, payload, **self._trace_of(msg))
+                    await self._ack(websocket, msg)
 
                 else:
                     to = msg.get('to')
                     frm = msg.get('from')
                     payload = msg.get('payload')
                     if to == 'broadcast':
-                        await self.broadcast(frm, payload)
+                        await self.broadcast(frm, payload, **self._trace_of(msg))
                     else:
-                        await self.route(frm, to, payload)
+                        await self.route(frm, to, payload, **self._trace_of(msg))
+                    await self._ack(websocket, msg)
 
         except websockets.exceptions.ConnectionClosed:
             pass
@@ -71,12 +92,37 @@ class MessageBrokerServer:
                 for topic in self.client_topics.get(connection_id, set()):
                     self.topics.get(topic, set()).discard(connection_id)
                 self.client_topics.pop(connection_id, None)
+                for alias in [n for n, cid in self.names.items() if cid == connection_id]:
+                    del self.names[alias]
                 self.connections.pop(connection_id, None)
                 print(f'[Broker] Client disconnected: {connection_id}')
 
-    async def publish(self, topic: str, frm: str, payload: dict):
-        msg = json.dumps({'from': frm, 'topic': topic, 'payload': payload})
-        for connection_id in self.topics.get(topic, set()):
+    async def _encode(self, msg: dict, payload) -> str:
+        # large payloads (e.g. complete session lists) are encoded off the loop
+        if self.serializer.should_offload(payload):
+            return await asyncio.to_thread(self.serializer.dumps, msg)
+        return self.serializer.dumps(msg)
+
+    async def _ack(self, websocket, msg: dict) -> None:
+        # the sender asked for confirmation that the broker has taken the packet
+        if 'ack' in msg:
+            await websocket.send(self.serializer.dumps({'type': 'ack', 'id': msg['ack']}))
+
+    @staticmethod
+    def _trace_of(msg: dict) -> dict:
+        # the sender's trace context is forwarded untouched to every receiver
+        return {'trace': msg['trace']} if 'trace' in msg else {}
+
+    @staticmethod
+    def _with_trace(packet: dict, trace: dict | None) -> dict:
+        if trace is not None:
+            packet['trace'] = trace
+        return packet
+
+    async def publish(self, topic: str, frm: str, payload: dict, trace: dict | None = None):
+        msg = await self._encode(self._with_trace({'from': frm, 'topic': topic, 'payload': payload}, trace), payload)
+        receivers = list(self.connections) if topic == CONTROL_TOPIC else self.topics.get(topic, set())
+        for connection_id in receivers:
             ws = self.connections.get(connection_id)
             if ws:
                 try:
@@ -84,15 +130,17 @@ class MessageBrokerServer:
                 except websockets.exceptions.ConnectionClosed:
                     continue
 
-    async def route(self, frm: str, to: str, payload: dict):
-        ws = self.connections.get(to)
+    async def route(self, frm: str, to: str, payload: dict, trace: dict | None = None):
+        # `to` is either a connection id or a registered/alias name
+        ws = self.connections.get(to) or self.connections.get(self.names.get(to))
         if ws:
-            await ws.send(json.dumps({'from': frm, 'payload': payload}))
+            packet = self._with_trace({'from': frm, 'to': to, 'payload': payload}, trace)
+            await ws.send(await self._encode(packet, payload))
         else:
             print(f'[Broker] No such client to route to: {to}')
 
-    async def broadcast(self, frm: str, payload: dict):
-        msg = json.dumps({'from': frm, 'payload': payload})
+    async def broadcast(self, frm: str, payload: dict, trace: dict | None = None):
+        msg = await self._encode(self._with_trace({'from': frm, 'payload': payload}, trace), payload)
         for nm, ws in self.connections.items():
             await ws.send(msg)
 
@@ -106,4 +154,6 @@ class MessageBrokerServer:
         asyncio.run(self._serve())
 
 if __name__ == '__main__':
-    MessageBrokerServer().start()
\ No newline at end of file
+    broker = MessageBrokerServer()
+    serve_metrics('broker')
+    broker.start()
\ No newline at end of file
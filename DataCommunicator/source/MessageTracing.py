@@ -0,0 +1,142 @@
+import bisect
+import itertools
+import socket
+import time
+import uuid
+
+# Upper bounds (seconds) of the end-to-end latency buckets; the last bucket is open.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+HOST = socket.gethostname()
+
+
+class TraceStamper:
+    """
+    Adds a trace context to outgoing packets:
+      sid  - sender session (new per process, so restarts are not gaps)
+      seq  - per (sender, destination) sequence number
+      mono - time.monotonic() at send, comparable on the same host
+      wall - time.time() at send, for cross-host latency
+    """
+    def __init__(self):
+        self.session = uuid.uuid4().hex[:12]
+        self._seqs: dict[tuple, itertools.count] = {}
+
+    def stamp(self, msg: dict, frm: str, dest: str) -> dict:
+        key = (frm, dest)
+        counter = self._seqs.get(key)
+        if counter is None:
+            counter = self._seqs.setdefault(key, itertools.count())
+        # next() on itertools.count is atomic, so send_nowait() callers on other threads are safe
+        msg['trace'] = {
+            'sid': self.session,
+            'host': HOST,
+            'seq': next(counter),
+            'mono': time.monotonic(),
+            'wall': time.time(),
+        }
+        return msg
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram; observe() is a bisect and three additions."""
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-quantile."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else self.max
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else None,
+            'max': self.max,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'buckets': dict(zip([*map(str, LATENCY_BUCKETS), 'inf'], self.counts)),
+        }
+
+
+class SourceStats:
+    __slots__ = ('sid', 'last_seq', 'received', 'gaps', 'out_of_order', 'restarts', 'latency')
+
+    def __init__(self, sid: str):
+        self.sid = sid
+        self.last_seq = None
+        self.received = 0
+        self.gaps = 0
+        self.out_of_order = 0
+        self.restarts = 0
+        self.latency = LatencyHistogram()
+
+
+class MessageTracker:
+    """
+    Receiver side: per source (sender, topic or target) counts received and
+    missing messages and keeps an end-to-end latency histogram.
+    """
+    def __init__(self):
+        self.sources: dict[str, SourceStats] = {}
+
+    def record(self, frm: str, dest: str, trace: dict) -> None:
+        key = f'{frm}->{dest}'
+        stats = self.sources.get(key)
+        sid = trace.get('sid')
+        if stats is None:
+            stats = self.sources[key] = SourceStats(sid)
+        elif stats.sid != sid:
+            # sender restarted: its sequence starts over
+            stats.sid = sid
+            stats.last_seq = None
+            stats.restarts += 1
+
+        seq = trace.get('seq')
+        if seq is not None:
+            last = stats.last_seq
+            if last is None or seq > last:
+                if last is not None:
+                    stats.gaps += seq - last - 1
+                stats.last_seq = seq
+            else:
+                stats.out_of_order += 1
+        stats.received += 1
+
+        if trace.get('host') == HOST and 'mono' in trace:
+            stats.latency.observe(time.monotonic() - trace['mono'])
+        elif 'wall' in trace:
+            stats.latency.observe(max(time.time() - trace['wall'], 0.0))
+
+    def snapshot(self) -> dict:
+        return {
+            key: {
+                'received': s.received,
+                'gaps': s.gaps,
+                'out_of_order': s.out_of_order,
+                'restarts': s.restarts,
+                'last_seq': s.last_seq,
+                'latency': s.latency.snapshot(),
+            }
+            for key, s in list(self.sources.items())
+        }
@@ -0,0 +1,327 @@
+import os
+import threading
+from abc import ABC, abstractmethod
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from DataCommunicator.source.Instrumentation import instrumentation
+from DataCommunicator.source.MessageTracing import LATENCY_BUCKETS, LatencyHistogram
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'  # Prometheus text exposition format
+
+# Default port of each service's /metrics endpoint; METRICS_PORT overrides it, 0 turns it off
+METRICS_PORTS = {
+    'broker': 9100,
+    'sensor': 9101,
+    'collector': 9102,
+    'predictor': 9103,
+    'io': 9104,
+    'display': 9105,
+}
+METRICS_HOST = os.environ.get('METRICS_HOST', '127.0.0.1')
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = '') -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value: float) -> str:
+    if value != value:
+        return 'NaN'
+    if value in (float('inf'), float('-inf')):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class CounterChild:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        if amount < 0:
+            raise ValueError("Counters only go up")
+        self.value += amount
+
+
+class GaugeChild:
+    __slots__ = ('value', '_function')
+
+    def __init__(self):
+        self.value = 0
+        self._function = None
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def set_function(self, function) -> None:
+        """Read the value from function() at scrape time (queue sizes, list lengths)."""
+        self._function = function
+
+    def get(self) -> float:
+        if self._function is None:
+            return self.value
+        return self._function()
+
+
+class HistogramChild:
+    __slots__ = ('histogram',)
+
+    def __init__(self, histogram: LatencyHistogram | None = None):
+        self.histogram = histogram or LatencyHistogram()
+
+    def observe(self, value: float) -> None:
+        self.histogram.observe(value)
+
+
+class Metric(ABC):
+    """
+    One metric family. Without label names it is used directly
+    (counter.inc()); with them, through labels(...) children.
+    Updates take no lock, as in Instrumentation: a concurrent update can
+    occasionally be lost, which is fine for monitoring.
+    """
+    kind = None
+    child = None
+
+    def __init__(self, name: str, help: str, labelnames: tuple | list = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.children: dict[tuple, object] = {}
+        if not self.labelnames:
+            self.children[()] = self.child()
+
+    def labels(self, *values, **named):
+        if named:
+            values = tuple(named[n] for n in self.labelnames)
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}")
+        values = tuple(str(v) for v in values)
+        child = self.children.get(values)
+        if child is None:
+            child = self.children.setdefault(values, self.child())
+        return child
+
+    def _unlabelled(self):
+        if self.labelnames:
+            raise ValueError(f"{self.name} needs labels {self.labelnames}")
+        return self.children[()]
+
+    def render(self) -> list[str]:
+        lines = [f'# HELP {self.name} {_escape(self.help)}', f'# TYPE {self.name} {self.kind}']
+        for values, child in list(self.children.items()):
+            lines.extend(self._samples(_labels(self.labelnames, values), values, child))
+        return lines
+
+    @abstractmethod
+    def _samples(self, labels: str, values: tuple, child) -> list[str]:
+        ...
+
+
+class Counter(Metric):
+    kind = 'counter'
+    child = CounterChild
+
+    def inc(self, amount: float = 1) -> None:
+        self._unlabelled().inc(amount)
+
+    def _samples(self, labels, values, child):
+        return [f'{self.name}{labels} {_number(child.value)}']
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+    child = GaugeChild
+
+    def set(self, value: float) -> None:
+        self._unlabelled().set(value)
+
+    def inc(self, amount: float = 1) -> None:
+        self._unlabelled().inc(amount)
+
+    def dec(self, amount: float = 1) -> None:
+        self._unlabelled().dec(amount)
+
+    def set_function(self, function) -> None:
+        self._unlabelled().set_function(function)
+
+    def _samples(self, labels, values, child):
+        try:
+            value = child.get()
+        except Exception:
+            return []  # the watched object is gone or mid-change; skip this scrape
+        return [f'{self.name}{labels} {_number(value)}']
+
+
+class Histogram(Metric):
+    """Seconds, over the fixed LATENCY_BUCKETS of MessageTracing."""
+    kind = 'histogram'
+    child = HistogramChild
+
+    def observe(self, value: float) -> None:
+        self._unlabelled().observe(value)
+
+    def _samples(self, labels, values, child):
+        h = child.histogram
+        counts, count, total = list(h.counts), h.count, h.total
+        lines = []
+        cumulative = 0
+        for bound, n in zip([*LATENCY_BUCKETS, float('inf')], counts):
+            cumulative += n
+            le = _labels(self.labelnames, values, f'le="{_number(bound)}"')
+            lines.append(f'{self.name}_bucket{le} {cumulative}')
+        lines.append(f'{self.name}_sum{labels} {_number(total)}')
+        lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+class MetricsRegistry:
+    """
+    The metrics a service exposes. counter()/gauge()/histogram() return the
+    existing family for a name, so modules can declare their metrics at
+    import time. Collectors are called on every scrape and return metric
+    families built from state kept elsewhere (instrumentation, trackers).
+    """
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+        self.collectors: list = []
+
+    def _get(self, cls, name: str, help: str, labelnames) -> Metric:
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics.setdefault(name, cls(name, help, labelnames))
+        if type(metric) is not cls or metric.labelnames != tuple(labelnames):
+            raise ValueError(f"Metric {name} already registered as a different {metric.kind}")
+        return metric
+
+    def counter(self, name: str, help: str, labelnames=()) -> Counter:
+        return self._get(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames=()) -> Gauge:
+        return self._get(Gauge, name, help, labelnames)
+
+    def histogram(self, name: str, help: str, labelnames=()) -> Histogram:
+        return self._get(Histogram, name, help, labelnames)
+
+    def add_collector(self, collector) -> None:
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.extend(metric.render())
+        for collector in list(self.collectors):
+            try:
+                families = collector()
+            except Exception as e:
+                print(f"[Metrics] Collector {collector} failed: {e}")
+                continue
+            for metric in families:
+                lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+def instrumentation_metrics(source=instrumentation) -> list[Metric]:
+    """Instrumentation call counters and latencies as metric families."""
+    calls = Counter('instrumented_calls_total', 'Calls of instrumented functions', ('function',))
+    errors = Counter('instrumented_errors_total', 'Instrumented calls that raised', ('function',))
+    seconds = Histogram('instrumented_call_seconds', 'Sampled duration of instrumented calls', ('function',))
+    for name, stats in list(source.stats.items()):
+        calls.labels(name).value = stats.calls
+        errors.labels(name).value = stats.errors
+        seconds.children[(name,)] = HistogramChild(stats.latency)
+    return [calls, errors, seconds]
+
+
+def connection_metrics(connection) -> list[Metric]:
+    """Outgoing queue and received-message statistics of a WebSocketConnection."""
+    outbox = Gauge('connection_outbox_messages', 'Messages queued by send_nowait() and not yet sent', ('client',))
+    acks = Gauge('connection_pending_acks', 'Sent messages waiting for the broker ack', ('client',))
+    received = Counter('messages_received_total', 'Traced messages received', ('source',))
+    gaps = Counter('messages_missing_total', 'Sequence numbers never received', ('source',))
+    latency = Histogram('message_latency_seconds', 'End-to-end latency of received messages', ('source',))
+    client = connection.name or ''
+    outbox.labels(client).set(connection.pending_sends)
+    acks.labels(client).set(connection.pending_acks)
+    for source, stats in list(connection.tracker.sources.items()):
+        received.labels(source).value = stats.received
+        gaps.labels(source).value = stats.gaps
+        latency.children[(source,)] = HistogramChild(stats.latency)
+    return [outbox, acks, received, gaps, latency]
+
+
+# Process-wide registry, exporting the shared instrumentation
+registry = MetricsRegistry()
+registry.add_collector(instrumentation_metrics)
+
+
+class MetricsServer:
+    """
+    Serves registry.render() at /metrics from a ThreadingHTTPServer on a
+    daemon thread: scrapes never run on (or wait for) the service's event
+    loop, they only read counters.
+    """
+    def __init__(self, registry: MetricsRegistry = registry, port: int = 0, host: str = METRICS_HOST):
+        self.registry = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(handler):
+                if handler.path.split('?')[0] not in ('/metrics', '/'):
+                    handler.send_error(404)
+                    return
+                body = self.registry.render().encode()
+                handler.send_response(200)
+                handler.send_header('Content-Type', CONTENT_TYPE)
+                handler.send_header('Content-Length', str(len(body)))
+                handler.end_headers()
+                handler.wfile.write(body)
+
+            def log_message(handler, format, *args):
+                pass  # one line per scrape would flood the service log
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True, name='metrics-http')
+
+    def start(self) -> 'MetricsServer':
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def serve_metrics(service: str, *connections, registry: MetricsRegistry = registry) -> MetricsServer | None:
+    """
+    Start the /metrics endpoint of a service on its METRICS_PORTS port (or
+    METRICS_PORT) and export the given connections. A port that cannot be
+    bound is reported and the service runs without metrics.
+    """
+    for connection in connections:
+        registry.add_collector(lambda connection=connection: connection_metrics(connection))
+    port = int(os.environ.get('METRICS_PORT', METRICS_PORTS.get(service, 0)))
+    if not port:
+        return None
+    try:
+        server = MetricsServer(registry, port).start()
+    except OSError as e:
+        print(f"[{service}] Metrics endpoint not started on port {port}: {e}")
+        return None
+    print(f"[{service}] Metrics on http://{METRICS_HOST}:{server.port}/metrics")
+    return server
@@ -0,0 +1,225 @@
+import asyncio
+import collections
+import cProfile
+import io
+import os
+import pstats
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+CPROFILE = 'cprofile'  # deterministic profile of the event loop thread
+SAMPLE = 'sample'  # periodic stack samples of every thread
+TRACEMALLOC = 'tracemalloc'  # allocations between the start and the end of the session
+MODES = (CPROFILE, SAMPLE, TRACEMALLOC)
+
+MAX_DURATION = 600.0  # s; a forgotten session must not run forever on a device
+SAMPLE_INTERVAL = 0.01  # s between stack samples
+TOP = 15  # entries in the summary sent back
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'profiles'))
+
+
+def _where(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler(threading.Thread):
+    """Counts the stacks of all other threads every interval seconds."""
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        super().__init__(daemon=True, name='stack-sampler')
+        self.interval = interval
+        self.stacks: collections.Counter = collections.Counter()  # (thread, root, ..., leaf) -> samples
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+    def run(self) -> None:
+        names = {}
+        while not self._stop_event.wait(self.interval):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for ident, frame in sys._current_frames().items():
+                if ident == self.ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_where(frame))
+                    frame = frame.f_back
+                self.stacks[(names.get(ident, str(ident)), *reversed(stack))] += 1
+            self.samples += 1
+
+
+class Profiler:
+    """
+    One profiling session at a time for a service: start() begins a mode,
+    stop() ends it, writes the raw result to output_dir and returns a
+    summary small enough to send over the broker.
+
+      cprofile     - cProfile of the calling (event loop) thread, .pstats file
+      sample       - stack samples of all threads, collapsed-stack .folded file
+                     (flamegraph.pl / speedscope input)
+      tracemalloc  - allocation growth between start and stop, .tracemalloc
+                     snapshot (tracemalloc.Snapshot.load)
+    """
+    def __init__(self, service: str, output_dir: str = PROFILE_DIR):
+        self.service = service
+        self.output_dir = output_dir
+        self.mode = None
+        self.started = None
+        self._session = None
+        self._finish: asyncio.Event | None = None
+
+    @property
+    def active(self) -> bool:
+        return self.mode is not None
+
+    def start(self, mode: str) -> None:
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        if self.active:
+            raise RuntimeError(f"{self.mode} profiling already running")
+        if mode == CPROFILE:
+            self._session = cProfile.Profile()
+            self._session.enable()
+        elif mode == SAMPLE:
+            self._session = StackSampler()
+            self._session.start()
+        else:
+            started_here = not tracemalloc.is_tracing()
+            if started_here:
+                tracemalloc.start(16)
+            self._session = (tracemalloc.take_snapshot(), started_here)
+        self.mode = mode
+        self.started = time.monotonic()
+
+    def stop(self, top: int = TOP) -> dict:
+        if not self.active:
+            raise RuntimeError("No profiling running")
+        mode, session = self.mode, self._session
+        duration = time.monotonic() - self.started
+        self.mode = self._session = None
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        path = os.path.join(self.output_dir, f"{self.service}-{mode}-{stamp}")
+        if mode == CPROFILE:
+            session.disable()
+            path += '.pstats'
+            session.dump_stats(path)
+            entries = self._cprofile_top(session, top)
+        elif mode == SAMPLE:
+            session.stop()
+            path += '.folded'
+            with open(path, 'w') as f:
+                for stack, count in session.stacks.most_common():
+                    f.write(f"{';'.join(stack)} {count}\n")
+            entries = self._sample_top(session, top)
+        else:
+            before, started_here = session
+            after = tracemalloc.take_snapshot()
+            if started_here:
+                tracemalloc.stop()
+            path += '.tracemalloc'
+            after.dump(path)
+            entries = [
+                {'location': str(stat.traceback[0]), 'size_diff': stat.size_diff, 'count_diff': stat.count_diff,
+                 'size': stat.size}
+                for stat in after.compare_to(before, 'lineno')[:top]
+            ]
+        return {'service': self.service, 'mode': mode, 'duration': round(duration, 3), 'file': path, 'top': entries}
+
+    @staticmethod
+    def _cprofile_top(profile: cProfile.Profile, top: int) -> list[dict]:
+        stats = pstats.Stats(profile, stream=io.StringIO())
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:top]
+        return [
+            {'function': f"{func} ({os.path.basename(file)}:{line})", 'calls': nc, 'tottime': round(tt, 6),
+             'cumtime': round(ct, 6)}
+            for (file, line, func), (cc, nc, tt, ct, callers) in rows
+        ]
+
+    @staticmethod
+    def _sample_top(sampler: StackSampler, top: int) -> list[dict]:
+        # time per function, inclusive of its callees: count each function once per stack;
+        # share is of all thread samples, so it stays at most 1 with many threads
+        inclusive = collections.Counter()
+        for stack, count in sampler.stacks.items():
+            for where in set(stack[1:]):
+                inclusive[where] += count
+        total = max(sum(sampler.stacks.values()), 1)
+        return [
+            {'function': where, 'samples': count, 'share': round(count / total, 3)}
+            for where, count in inclusive.most_common(top)
+        ]
+
+    async def run(self, mode: str, duration: float, top: int = TOP) -> dict:
+        """Profile for duration seconds (at most MAX_DURATION, or until finish()) and return the summary."""
+        self.start(mode)
+        self._finish = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._finish.wait(), min(duration, MAX_DURATION))
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            self.stop(top)
+            raise
+        return self.stop(top)
+
+    def finish(self) -> None:
+        """End a running run() early; it still writes and returns its result."""
+        if self._finish is not None:
+            self._finish.set()
+
+
+if __name__ == '__main__':
+    # Ask services to profile themselves and print the summaries:
+    #   python -m DataCommunicator.source.Profiling predictor sample 30
+    import argparse
+    import json
+
+    from DataCommunicator.source.BaseDataClient import BaseDataClient, CONTROL_TOPIC
+    from DataCommunicator.source.WebSocketConnection import WebSocketConnection
+
+    class ProfileRequester(BaseDataClient):
+        def __init__(self, uri: str, args):
+            super().__init__('profiler', WebSocketConnection(uri))
+            self.args = args
+            self.results = asyncio.Queue()
+
+        async def run(self):
+            await self.connection.send(f'topic:{CONTROL_TOPIC}', {
+                'command': 'profile', 'target': self.args.target, 'mode': self.args.mode,
+                'duration': self.args.duration, 'top': self.args.top,
+            })
+            deadline = time.monotonic() + min(self.args.duration, MAX_DURATION) + self.args.wait
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    frm, result = await asyncio.wait_for(self.results.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                print(json.dumps(result, indent=2))
+                if self.args.target != '*':
+                    break
+
+        async def on_message(self, frm, payload):
+            if isinstance(payload, dict) and 'profile' in payload:
+                await self.results.put((frm, payload['profile']))
+
+        async def on_control(self, frm, payload):
+            pass  # the requester does not profile itself
+
+    parser = argparse.ArgumentParser(description="Profile services over the broker")
+    parser.add_argument('target', help="client name, or * for every service")
+    parser.add_argument('mode', choices=MODES)
+    parser.add_argument('duration', type=float)
+    parser.add_argument('--top', type=int, default=TOP)
+    parser.add_argument('--wait', type=float, default=10.0, help="s to wait for results after the duration")
+    parser.add_argument('--uri', default='ws://localhost:8765')
+    args = parser.parse_args()
+    asyncio.run(ProfileRequester(args.uri, args).start())
@@ -0,0 +1,83 @@
+import json
+from abc import ABC, abstractmethod
+
+try:
+    import orjson
+except ImportError:  # optional fast encoder
+    orjson = None
+
+# Payloads holding more items than this, counted through nested
+# containers, are encoded in a worker thread instead of on the event loop.
+DEFAULT_OFFLOAD_THRESHOLD = 256
+
+
+class ISerializer(ABC):
+    """Interface for turning broker packets into wire text and back."""
+
+    def __init__(self, offload_threshold: int = DEFAULT_OFFLOAD_THRESHOLD):
+        self.offload_threshold = offload_threshold
+
+    @abstractmethod
+    def dumps(self, obj) -> str:
+        ...
+
+    @abstractmethod
+    def loads(self, data):
+        ...
+
+    def should_offload(self, payload) -> bool:
+        """
+        Cheap size estimate: the number of items in the payload's
+        containers, nested ones included ({'records': [...]} counts its
+        records and their values). Counting stops once the threshold is
+        passed, so the estimate costs at most offload_threshold steps.
+        """
+        count = 0
+        stack = [payload]
+        while stack:
+            obj = stack.pop()
+            if isinstance(obj, dict):
+                obj = obj.values()
+            elif not isinstance(obj, (list, tuple)):
+                continue
+            count += len(obj)
+            if count > self.offload_threshold:
+                return True
+            stack.extend(obj)
+        return False
+
+
+class JsonSerializer(ISerializer):
+    """Standard library json."""
+
+    def dumps(self, obj) -> str:
+        return json.dumps(obj)
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class OrjsonSerializer(ISerializer):
+    """
+    orjson, if installed. Decodes to the same values as JsonSerializer
+    but the text differs: no spaces after separators, NaN and Infinity
+    written as null, and dict keys must be str.
+    """
+
+    def __init__(self, offload_threshold: int = DEFAULT_OFFLOAD_THRESHOLD):
+        if orjson is None:
+            raise ImportError("orjson is not installed")
+        super().__init__(offload_threshold)
+
+    def dumps(self, obj) -> str:
+        return orjson.dumps(obj).decode()
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+def default_serializer(offload_threshold: int = DEFAULT_OFFLOAD_THRESHOLD) -> ISerializer:
+    """Fastest available serializer."""
+    if orjson is not None:
+        return OrjsonSerializer(offload_threshold)
+    return JsonSerializer(offload_threshold)
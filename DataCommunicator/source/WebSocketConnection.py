@@ -1,7 +1,13 @@
 import asyncio
-import json
+import itertools
 import websockets
 from abc import ABC, abstractmethod
+from collections import deque
+from typing import Callable, Hashable
+
+from DataCommunicator.source.BaseDataClient import CONTROL_TOPIC
+from DataCommunicator.source.MessageTracing import MessageTracker, TraceStamper
+from DataCommunicator.source.Serializer import ISerializer, default_serializer
 
 class IDataConnection(ABC):
     """Interface for a bidirectional JSON connection."""
@@ -18,6 +24,19 @@ class IDataConnection(ABC):
         """
         ...
 
+    @abstractmethod
+    def send_nowait(self, to: str, payload: dict, on_ack: Callable[[], None] | None = None,
+                    ack_key: Hashable | None = None) -> None:
+        """
+        Thread-safe, non-blocking variant of send(). Queues the message
+        for the connection's writer and returns immediately. If on_ack is
+        given it is called (on the connection's loop) once the broker has
+        accepted the message; it is forgotten if the message is dropped or
+        the socket closes before that. A message sent again with the same
+        ack_key replaces the earlier one's callback.
+        """
+        ...
+
     @abstractmethod
     async def broadcast(self, payload: dict) -> None:
         """Send to all connected clients (no topic filtering)."""
@@ -38,11 +57,38 @@ class IDataConnection(ABC):
         """Bind the connection to a local BaseDataClient."""
         ...
 
+async def _deliver_control(client, frm: str, payload) -> None:
+    # clients that are not BaseDataClients (test doubles, tools) may not handle control messages
+    on_control = getattr(client, 'on_control', None)
+    if on_control is not None:
+        await on_control(frm, payload)
+
+
 class WebSocketConnection(IDataConnection):
-    def __init__(self, uri: str):
+    def __init__(self, uri: str, serializer: ISerializer | None = None, max_pending: int = 1024,
+                 tracing: bool = True):
         self.uri = uri
         self.ws = None
         self.client = None  # will be set via set_client()
+        self.name = None
+        self.serializer = serializer or default_serializer()
+
+        # outgoing packets get a trace context; incoming ones feed the tracker
+        self.stamper = TraceStamper() if tracing else None
+        self.tracker = MessageTracker()
+
+        # send_nowait() handoff: deque.append/popleft are atomic, so producers
+        # on any thread never take a lock. When full, the oldest message is dropped.
+        self._outbox: deque = deque(maxlen=max_pending)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._writer_idle = False
+        self._tasks: list[asyncio.Task] = []
+
+        # send_nowait(on_ack=...) callbacks waiting for the broker's ack
+        self._ack_ids = itertools.count(1)
+        self._pending_acks: dict[int, tuple[Callable[[], None], Hashable | None]] = {}  # id -> (callback, key)
+        self._ack_keys: dict[Hashable, int] = {}  # ack_key -> id of its latest message
 
     def set_client(self, client) -> None:
         self.client = client
@@ -50,37 +96,165 @@ class WebSocketConnection(IDataConnection):
             raise AttributeError("Client must have a 'name' attribute")
         self.name = client.name
 
+    @property
+    def connected(self) -> bool:
+        """True while the listener is running on an open socket."""
+        return bool(self._tasks) and not self._tasks[0].done()
+
+    @property
+    def pending_sends(self) -> int:
+        """Messages queued by send_nowait() and not yet sent."""
+        return len(self._outbox)
+
+    @property
+    def pending_acks(self) -> int:
+        """Messages waiting for the broker's ack."""
+        return len(self._pending_acks)
+
     async def connect(self) -> None:
         self.ws = await websockets.connect(self.uri)
         # register with broker
-        await self.ws.send(json.dumps({'type': 'register', 'name': self.client.name}))
-        # start listener
-        asyncio.create_task(self._listen())
+        await self.ws.send(self.serializer.dumps({'type': 'register', 'name': self.name}))
+        # start listener and the send_nowait() writer
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._listen()),
+            asyncio.create_task(self._writer()),
+        ]
+
+    async def close(self) -> None:
+        """Stop the listener and writer and close the socket."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self.ws is not None and hasattr(self.ws, 'close'):
+            await self.ws.close()
 
     async def _listen(self) -> None:
-        async for msg in self.ws:
-            data = json.loads(msg)
-            frm = data.get('from')
-            payload = data.get('payload')
-            # delegate to client
-            await self.client.on_message(frm, payload)
+        try:
+            async for msg in self.ws:
+                data = self.serializer.loads(msg)
+                if data.get('type') == 'ack':
+                    self._acked(data.get('id'))
+                    continue
+                trace = data.get('trace')
+                if trace:
+                    self.tracker.record(data.get('from'), data.get('topic') or data.get('to'), trace)
+                await self._dispatch(data)
+        finally:
+            # socket is gone: park queued messages until the next connect()
+            for task in self._tasks[1:]:
+                task.cancel()
+            # acks for messages already on the wire will not come any more
+            queued = {msg.get('ack') for msg, _ in list(self._outbox)}
+            for ack_id in [ack_id for ack_id in self._pending_acks if ack_id not in queued]:
+                self._forget_ack(ack_id)
+
+    def _acked(self, ack_id) -> None:
+        callback = self._forget_ack(ack_id)
+        if callback is not None:
+            try:
+                callback()
+            except Exception as e:
+                print(f"[{self.name}] Ack callback failed: {e}")
+
+    def _request_ack(self, msg: dict, on_ack: Callable[[], None] | None, ack_key: Hashable | None = None) -> dict:
+        if on_ack is not None:
+            # next() on itertools.count is atomic, as in TraceStamper
+            msg['ack'] = next(self._ack_ids)
+            if ack_key is not None:
+                self._forget_ack(self._ack_keys.get(ack_key))
+                self._ack_keys[ack_key] = msg['ack']
+            self._pending_acks[msg['ack']] = (on_ack, ack_key)
+        return msg
+
+    def _forget_ack(self, ack_id) -> Callable[[], None] | None:
+        """Remove a pending ack; returns its callback."""
+        entry = self._pending_acks.pop(ack_id, None)
+        if entry is None:
+            return None
+        callback, ack_key = entry
+        if ack_key is not None and self._ack_keys.get(ack_key) == ack_id:
+            del self._ack_keys[ack_key]
+        return callback
+
+    async def _dispatch(self, data: dict) -> None:
+        """Deliver one decoded broker packet to the local client."""
+        frm = data.get('from')
+        payload = data.get('payload')
+        if data.get('topic') == CONTROL_TOPIC:
+            await _deliver_control(self.client, frm, payload)
+            return
+        # delegate to client
+        await self.client.on_message(frm, payload)
+
+    def _packet(self, frm: str, to: str, payload) -> dict:
+        if isinstance(to, str) and to.startswith('topic:'):
+            msg = {'type': 'publish', 'topic': to[6:], 'from': frm, 'payload': payload}
+            dest = msg['topic']
+        else:
+            msg = {'to': to, 'from': frm, 'payload': payload}
+            dest = to
+        if self.stamper is not None:
+            self.stamper.stamp(msg, frm, dest)
+        return msg
+
+    async def _encode(self, msg: dict, payload) -> str:
+        """Serialize msg, off the event loop if the payload is large."""
+        if self.serializer.should_offload(payload):
+            return await asyncio.to_thread(self.serializer.dumps, msg)
+        return self.serializer.dumps(msg)
+
+    async def _send_packet(self, msg: dict, payload) -> None:
+        await self.ws.send(await self._encode(msg, payload))
+
+    def _enqueue(self, msg: dict, payload) -> None:
+        if len(self._outbox) == self._outbox.maxlen:
+            # full: drop the oldest message ourselves so its ack callback goes with it
+            try:
+                dropped, _ = self._outbox.popleft()
+            except IndexError:
+                pass  # the writer just took it
+            else:
+                self._forget_ack(dropped.get('ack'))
+        self._outbox.append((msg, payload))
+        # only wake the writer when it is parked; a busy writer drains the deque anyway
+        if self._writer_idle and self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _writer(self) -> None:
+        """Single coroutine draining the send_nowait() queue in order."""
+        while True:
+            while self._outbox:
+                msg, payload = self._outbox.popleft()
+                try:
+                    await self._send_packet(msg, payload)
+                except Exception as e:
+                    self._forget_ack(msg.get('ack'))
+                    print(f"[{self.name}] Queued send to {msg.get('topic', msg.get('to'))} failed: {e}")
+            self._wakeup.clear()
+            self._writer_idle = True
+            # re-check after publishing idleness so a concurrent append is never missed
+            if not self._outbox:
+                await self._wakeup.wait()
+            self._writer_idle = False
+
+    def send_nowait(self, to: str, payload: dict, on_ack: Callable[[], None] | None = None,
+                    ack_key: Hashable | None = None) -> None:
+        self._enqueue(self._request_ack(self._packet(self.name, to, payload), on_ack, ack_key), payload)
 
     async def broadcast(self, payload: dict) -> None:
-        packet = {'to': 'broadcast', 'from': self.client.name, 'payload': payload}
-        await self.ws.send(json.dumps(packet))
+        await self._send_packet(self._packet(self.name, 'broadcast', payload), payload)
 
     async def subscribe(self, topic: str):
         msg = {'type': 'subscribe', 'topic': topic, 'name': self.name}
-        await self.ws.send(json.dumps(msg))
+        await self.ws.send(self.serializer.dumps(msg))
 
     async def unsubscribe(self, topic: str):
         msg = {'type': 'unsubscribe', 'topic': topic, 'name': self.name}
-        await self.ws.send(json.dumps(msg))
+        await self.ws.send(self.serializer.dumps(msg))
 
     async def send(self, to: str, payload: dict):
-        if isinstance(to, str) and to.startswith('topic:'):
-            topic = to[6:]
-            msg = {'type': 'publish', 'topic': topic, 'from': self.name, 'payload': payload}
-        else:
-            msg = {'to': to, 'from': self.name, 'payload': payload}
-        await self.ws.send(json.dumps(msg))
\ No newline at end of file
+        await self._send_packet(self._packet(self.name, to, payload), payload)
@@ -55,7 +55,51 @@ async def test_route_existing_client():
     broker.connections['alice'] = ws
 
     await broker.route('bob', 'alice', {'hello': 123})
-    assert ws.sent == [{'from': 'bob', 'payload': {'hello': 123}}]
+    assert ws.sent == [{'from': 'bob', 'to': 'alice', 'payload': {'hello': 123}}]
+
+
+@pytest.mark.asyncio
+async def test_route_by_alias_name():
+    broker = MessageBrokerServer()
+    ws = DummyWebSocket([])
+    broker.connections['collector_1'] = ws
+    broker.names['data_collector'] = 'collector_1'
+
+    await broker.route('bob', 'data_collector', {'x': 1})
+    assert ws.sent == [{'from': 'bob', 'to': 'data_collector', 'payload': {'x': 1}}]
+
+
+@pytest.mark.asyncio
+async def test_handler_alias_registered_and_cleaned_up():
+    ws = DummyWebSocket([{'type': 'register', 'name': 'collector'}])
+    ws.push({'type': 'alias', 'name': 'data_collector'})
+    broker = MessageBrokerServer()
+
+    seen = {}
+    original_route = broker.route
+    async def spy_route(frm, to, p):
+        seen.update(broker.names)
+        await original_route(frm, to, p)
+    broker.route = spy_route
+    ws.push({'to': 'data_collector', 'from': 'me', 'payload': {'y': 2}})
+
+    await broker.handler(ws)
+
+    assert seen['data_collector'].startswith('collector_')
+    assert {'from': 'me', 'to': 'data_collector', 'payload': {'y': 2}} in ws.sent
+    assert broker.names == {}
+
+
+@pytest.mark.asyncio
+async def test_handler_acks_publish_when_requested():
+    ws = DummyWebSocket([{'type': 'register', 'name': 'data_collector'}])
+    ws.push({'type': 'publish', 'topic': 'complete_data', 'from': 'data_collector', 'payload': {}, 'ack': 7})
+    ws.push({'type': 'publish', 'topic': 'complete_data', 'from': 'data_collector', 'payload': {}})
+    broker = MessageBrokerServer()
+
+    await broker.handler(ws)
+
+    assert ws.sent == [{'type': 'ack', 'id': 7}]
 
 
 @pytest.mark.asyncio
@@ -82,6 +126,23 @@ async def test_broadcast_to_all():
     assert ws2.sent == [expected]
 
 
+@pytest.mark.asyncio
+async def test_publish_control_reaches_unsubscribed_clients():
+    broker = MessageBrokerServer()
+    ws1 = DummyWebSocket([])
+    ws2 = DummyWebSocket([])
+    broker.connections['a'] = ws1
+    broker.connections['b'] = ws2
+    broker.topics['sensor_readings'] = {'a'}
+
+    await broker.publish('control', 'profiler', {'command': 'profile'})
+    await broker.publish('sensor_readings', 'sensor', {'v': 1})
+
+    assert ws1.sent == [{'from': 'profiler', 'topic': 'control', 'payload': {'command': 'profile'}},
+                        {'from': 'sensor', 'topic': 'sensor_readings', 'payload': {'v': 1}}]
+    assert ws2.sent == [{'from': 'profiler', 'topic': 'control', 'payload': {'command': 'profile'}}]
+
+
 @pytest.mark.asyncio
 async def test_handler_register_and_cleanup(capfd):
     ws = DummyWebSocket([{'type': 'register', 'name': 'tester'}])
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import pytest
+
+import DataCommunicator.source.WebSocketConnection as ws_module
+from DataCommunicator.source.BaseDataClient import BaseDataClient
+from DataCommunicator.source.ConnectionMultiplexer import ConnectionMultiplexer
+
+
+class FakeWS:
+    """Open socket: yields pushed packets until the test ends."""
+    def __init__(self):
+        self.sent = []
+        self._incoming = asyncio.Queue()
+
+    async def send(self, msg):
+        self.sent.append(json.loads(msg))
+
+    def push(self, packet):
+        self._incoming.put_nowait(json.dumps(packet))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self._incoming.get()
+
+    async def close(self):
+        pass
+
+
+class Client(BaseDataClient):
+    def __init__(self, name, connection):
+        super().__init__(name, connection)
+        self.received = []
+
+    async def run(self):
+        pass
+
+    async def on_message(self, frm, payload):
+        self.received.append((frm, payload))
+
+
+@pytest.fixture
+def fake_ws(monkeypatch):
+    ws = FakeWS()
+    connects = []
+    def connect(uri):
+        connects.append(uri)
+        return asyncio.sleep(0, result=ws)
+    monkeypatch.setattr(ws_module, 'websockets', type('FakeWSMod', (), {'connect': staticmethod(connect)}))
+    ws.connects = connects
+    return ws
+
+
+@pytest.mark.asyncio
+async def test_clients_share_one_socket_and_merge_subscriptions(fake_ws):
+    mux = ConnectionMultiplexer('ws://test', 'collector')
+    a = Client('receiver', mux.channel())
+    b = Client('data_collector', mux.channel())
+
+    await a.connection.connect()
+    await b.connection.connect()
+    await a.connection.subscribe('sensor_readings')
+    await b.connection.subscribe('sensor_readings')
+    await b.connection.subscribe('state')
+
+    assert fake_ws.connects == ['ws://test']
+    assert fake_ws.sent[0] == {'type': 'register', 'name': 'collector'}
+    assert {'type': 'alias', 'name': 'receiver'} in fake_ws.sent
+    subs = [m['topic'] for m in fake_ws.sent if m.get('type') == 'subscribe']
+    assert subs == ['sensor_readings', 'state']
+
+    await a.connection.unsubscribe('sensor_readings')
+    assert not any(m.get('type') == 'unsubscribe' for m in fake_ws.sent)
+    await b.connection.unsubscribe('sensor_readings')
+    assert fake_ws.sent[-1] == {'type': 'unsubscribe', 'topic': 'sensor_readings', 'name': 'collector'}
+    await mux.close()
+
+
+@pytest.mark.asyncio
+async def test_incoming_routed_by_topic_and_target(fake_ws):
+    mux = ConnectionMultiplexer('ws://test', 'collector')
+    a = Client('receiver', mux.channel())
+    b = Client('data_collector', mux.channel())
+    await a.connection.connect()
+    await a.connection.subscribe('sensor_readings')
+    await b.connection.subscribe('state')
+
+    fake_ws.push({'from': 'sensor', 'topic': 'sensor_readings', 'payload': {'v': 1}})
+    fake_ws.push({'from': 'io', 'topic': 'state', 'payload': {'state': 'IdleState'}})
+    fake_ws.push({'from': 'io', 'to': 'data_collector', 'payload': {'cmd': 'flush'}})
+    fake_ws.push({'from': 'io', 'payload': {'all': True}})
+    await asyncio.sleep(0.01)
+
+    assert a.received == [('sensor', {'v': 1}), ('io', {'all': True})]
+    assert b.received == [('io', {'state': 'IdleState'}), ('io', {'cmd': 'flush'}), ('io', {'all': True})]
+    await mux.close()
+
+
+@pytest.mark.asyncio
+async def test_control_messages_reach_every_channel(fake_ws):
+    mux = ConnectionMultiplexer('ws://test', 'collector')
+    a = Client('receiver', mux.channel())
+    b = Client('data_collector', mux.channel())
+    controls = []
+    a.on_control = b.on_control = lambda frm, payload: asyncio.sleep(0, result=controls.append((frm, payload)))
+    await a.connection.connect()
+    await a.connection.subscribe('sensor_readings')
+
+    fake_ws.push({'from': 'profiler', 'topic': 'control', 'payload': {'command': 'profile_stop'}})
+    await asyncio.sleep(0.01)
+
+    assert controls == [('profiler', {'command': 'profile_stop'})] * 2
+    assert a.received == b.received == []
+    await mux.close()
+
+
+@pytest.mark.asyncio
+async def test_channels_send_under_their_own_name(fake_ws):
+    mux = ConnectionMultiplexer('ws://test', 'collector', tracing=False)
+    a = Client('receiver', mux.channel())
+    b = Client('data_collector', mux.channel())
+    await a.connection.connect()
+
+    await a.connection.send('topic:x', {'n': 1})
+    b.connection.send_nowait('topic:complete_data', [1, 2])
+    await asyncio.sleep(0.01)
+
+    assert {'type': 'publish', 'topic': 'x', 'from': 'receiver', 'payload': {'n': 1}} in fake_ws.sent
+    assert {'type': 'publish', 'topic': 'complete_data', 'from': 'data_collector', 'payload': [1, 2]} in fake_ws.sent
+    await mux.close()
+
+
+def test_duplicate_client_name_rejected():
+    mux = ConnectionMultiplexer('ws://test', 'collector')
+    Client('receiver', mux.channel())
+    with pytest.raises(ValueError):
+        Client('receiver', mux.channel())
@@ -0,0 +1,140 @@
+import json
+import math
+
+import numpy as np
+import pytest
+
+from DataCommunicator.source.FrameSchema import (
+    FrameDecoder, FrameEncoder, FrameSchema, announcement, is_packed
+)
+
+FRAME = {
+    'BME680Sensor': {'Temperature': 25.5, 'Humidity': 50.2, 'Pressure': 1013.25, 'GasResistance': 120000},
+    'SGP30Sensor': {'CO2': 400, 'TVOC': 12},
+    'timestamp': '2025-04-25T17:50:11.944292',
+    'meta': {'seq': 7},
+}
+
+
+def test_frame_schema_round_trip_to_legacy():
+    schema = FrameSchema.from_frame(FRAME, units={'BME680Sensor.Temperature': 'degC', 'SGP30Sensor': 'ppm'})
+    packed = schema.pack(FRAME)
+
+    assert is_packed(packed)
+    assert packed['schema'] == schema.id
+    assert schema.to_legacy(packed) == FRAME
+    assert [c['unit'] for c in schema.channels] == ['degC', None, None, None, 'ppm', 'ppm']
+
+
+def test_frame_schema_view_shares_decoded_buffer():
+    schema = FrameSchema.from_frame(FRAME)
+    view = schema.view(schema.pack(FRAME))
+
+    assert view.dtype.names[0] == 'BME680Sensor.Temperature'
+    assert view['SGP30Sensor.CO2'][0] == 400
+    # frombuffer: no copy, so the array does not own its data
+    assert not view.flags.owndata and not view.flags.writeable
+
+
+def test_frame_schema_id_depends_only_on_layout():
+    other = dict(FRAME, SGP30Sensor={'CO2': 1000, 'TVOC': 3})
+    reordered = {'SGP30Sensor': FRAME['SGP30Sensor'], 'BME680Sensor': FRAME['BME680Sensor']}
+
+    assert FrameSchema.from_frame(FRAME).id == FrameSchema.from_frame(other).id
+    assert FrameSchema.from_frame(FRAME).id != FrameSchema.from_frame(reordered).id
+    assert FrameSchema.from_frame(FRAME).id != FrameSchema.from_frame(FRAME, version=2).id
+
+
+def test_frame_schema_missing_values_are_nan():
+    frame = {'SGP30Sensor': {'CO2': None, 'TVOC': 12}, 'meta': {'missing': ['BME680Sensor']}}
+    schema = FrameSchema.from_frame(frame)
+    packed = schema.pack(frame)
+
+    assert math.isnan(schema.view(packed)['SGP30Sensor.CO2'][0])
+    assert schema.to_legacy(packed) == {'SGP30Sensor': {'CO2': None, 'TVOC': 12}, 'BME680Sensor': None,
+                                        'meta': {'missing': ['BME680Sensor']}}
+
+
+def test_frame_schema_from_dict_checks_id():
+    data = FrameSchema.from_frame(FRAME).to_dict()
+    assert FrameSchema.from_dict(json.loads(json.dumps(data))).id == data['id']
+
+    data['channels'] = data['channels'][:2]
+    with pytest.raises(ValueError):
+        FrameSchema.from_dict(data)
+
+
+def test_frame_encoder_announces_each_layout_once():
+    encoder = FrameEncoder()
+    decoder = FrameDecoder()
+
+    packed, schema = encoder.pack(FRAME)
+    again, repeated = encoder.pack(FRAME)
+    assert repeated is None
+    assert decoder.view(packed) is None
+
+    assert decoder.accept(json.loads(json.dumps(schema)))
+    assert not decoder.accept(packed)
+    assert decoder.to_legacy(again) == FRAME
+    np.testing.assert_array_equal(decoder.view(again), decoder.view(packed))
+
+
+def test_frame_decoder_requests_unknown_schema_once():
+    encoder = FrameEncoder()
+    packed, schema = encoder.pack(FRAME)
+    decoder = FrameDecoder()
+
+    assert decoder.to_legacy(packed) is None
+    assert decoder.schema_request(packed) == {'command': 'schema', 'id': packed['schema']}
+    assert decoder.schema_request(packed) is None
+    decoder.accept(announcement(encoder.schemas[packed['schema']]))
+    assert decoder.to_legacy(packed) == FRAME
+
+
+def test_frame_decoder_passes_legacy_frames_through():
+    assert FrameDecoder().to_legacy(FRAME) is FRAME
+
+
+def test_frame_decoder_stacks_frames_into_one_matrix():
+    encoder = FrameEncoder()
+    decoder = FrameDecoder()
+    packets = []
+    for co2 in (400, 410, 420):
+        packed, schema = encoder.pack(dict(FRAME, SGP30Sensor={'CO2': co2, 'TVOC': 1}))
+        if schema is not None:
+            decoder.accept(schema)
+        packets.append(packed)
+
+    records = decoder.stack(packets)
+    matrix = decoder.schema_of(packets[0]).matrix(records)
+
+    assert matrix.shape == (3, 6)
+    assert matrix[:, 4].tolist() == [400, 410, 420]
+    assert matrix.base is not None  # a view of the stacked records
+    other, _ = encoder.pack({'SGP30Sensor': {'CO2': 1}})
+    with pytest.raises(ValueError):
+        decoder.stack(packets + [other])
+
+
+def test_frame_encoder_keeps_layout_when_a_sensor_goes_missing():
+    encoder = FrameEncoder()
+    decoder = FrameDecoder()
+    packed, schema = encoder.pack(FRAME)
+    decoder.accept(schema)
+
+    frame = dict(FRAME, BME680Sensor=None, meta={'seq': 8, 'missing': ['BME680Sensor']})
+    gap, announced = encoder.pack(frame)
+
+    # same schema, the missing sensor's channels are NaN
+    assert announced is None and gap['schema'] == packed['schema']
+    view = decoder.view(gap)
+    assert math.isnan(view['BME680Sensor.Temperature'][0])
+    assert view['SGP30Sensor.CO2'][0] == 400
+    assert decoder.to_legacy(gap) == frame
+
+
+def test_frame_schema_integers_decode_as_floats():
+    schema = FrameSchema.from_frame(FRAME)
+    co2 = schema.to_legacy(schema.pack(FRAME))['SGP30Sensor']['CO2']
+
+    assert co2 == 400 and isinstance(co2, float)
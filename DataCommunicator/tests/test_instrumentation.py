@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from DataCommunicator.source.Instrumentation import OFF, STATS, TRACE, Instrumentation
+
+
+def test_instrumentation_counts_calls_and_latency():
+    instr = Instrumentation(STATS)
+
+    @instr.instrument()
+    def work(x):
+        return x * 2
+
+    assert [work(i) for i in range(5)] == [0, 2, 4, 6, 8]
+    stats = instr.snapshot()['test_instrumentation_counts_calls_and_latency.<locals>.work']
+    assert stats['calls'] == 5
+    assert stats['latency']['count'] == 5
+
+
+def test_instrumentation_samples_latency():
+    instr = Instrumentation(STATS, sample_every=4)
+
+    @instr.instrument(name='work')
+    def work():
+        pass
+
+    for _ in range(10):
+        work()
+
+    assert instr.stats['work'].calls == 10
+    assert instr.stats['work'].latency.count == 2
+
+
+def test_instrumentation_off_records_nothing():
+    instr = Instrumentation(OFF)
+    calls = []
+
+    @instr.instrument(name='work', on_enter=lambda args, kwargs: calls.append(args))
+    def work():
+        return 1
+
+    assert work() == 1
+    assert instr.stats['work'].calls == 0
+    assert calls == []
+
+
+def test_instrumentation_trace_runs_hooks_and_counts_errors():
+    instr = Instrumentation(STATS)
+    events = []
+
+    @instr.instrument(name='work', on_enter=lambda args, kwargs: events.append(('enter', args)),
+                      on_exit=lambda args, result, error: events.append(('exit', result, type(error))))
+    def work(fail):
+        if fail:
+            raise ValueError('boom')
+        return 'ok'
+
+    work(False)  # STATS: no hooks
+    instr.configure('trace')
+    work(False)
+    with pytest.raises(ValueError):
+        work(True)
+
+    assert events == [('enter', (False,)), ('exit', 'ok', type(None)), ('enter', (True,)), ('exit', None, ValueError)]
+    assert instr.stats['work'].calls == 3
+    assert instr.stats['work'].errors == 1
+
+
+def test_instrumentation_async_functions():
+    instr = Instrumentation(TRACE)
+    events = []
+
+    @instr.instrument(name='tick', on_exit=lambda args, result, error: events.append(result))
+    async def tick(n):
+        await asyncio.sleep(0)
+        return n + 1
+
+    assert asyncio.run(tick(1)) == 2
+    assert events == [2]
+    assert instr.stats['tick'].latency.count == 1
+
+
+def test_instrumentation_rejects_bad_sampling():
+    with pytest.raises(ValueError):
+        Instrumentation(STATS, sample_every=0)
@@ -0,0 +1,125 @@
+import asyncio
+import json
+import time
+import pytest
+
+import DataCommunicator.source.WebSocketConnection as ws_module
+from DataCommunicator.source.MessageBrokerServer import MessageBrokerServer
+from DataCommunicator.source.MessageTracing import (
+    HOST, LatencyHistogram, MessageTracker, TraceStamper
+)
+from DataCommunicator.source.WebSocketConnection import WebSocketConnection
+
+
+def test_stamper_sequences_per_sender_and_destination():
+    stamper = TraceStamper()
+    a1 = stamper.stamp({}, 'sensor', 'sensor_readings')['trace']
+    b1 = stamper.stamp({}, 'sensor', 'state')['trace']
+    a2 = stamper.stamp({}, 'sensor', 'sensor_readings')['trace']
+
+    assert (a1['seq'], a2['seq'], b1['seq']) == (0, 1, 0)
+    assert a1['sid'] == stamper.session
+    assert a1['host'] == HOST
+    assert a1['mono'] <= a2['mono']
+
+
+def test_tracker_counts_gaps_reorders_and_restarts():
+    tracker = MessageTracker()
+    now = time.monotonic()
+    for seq in (0, 1, 4, 3):
+        tracker.record('sensor', 'sensor_readings', {'sid': 'a', 'host': HOST, 'seq': seq, 'mono': now})
+    tracker.record('sensor', 'sensor_readings', {'sid': 'b', 'host': HOST, 'seq': 0, 'mono': now})
+
+    stats = tracker.snapshot()['sensor->sensor_readings']
+    assert stats['received'] == 5
+    assert stats['gaps'] == 2
+    assert stats['out_of_order'] == 1
+    assert stats['restarts'] == 1
+    assert stats['last_seq'] == 0
+    assert stats['latency']['count'] == 5
+
+
+def test_tracker_uses_wall_clock_for_other_hosts():
+    tracker = MessageTracker()
+    tracker.record('sensor', 'x', {'sid': 'a', 'host': 'elsewhere', 'seq': 0, 'mono': 0.0, 'wall': time.time() - 0.2})
+    latency = tracker.snapshot()['sensor->x']['latency']
+    assert 0.2 <= latency['max'] < 1.0
+
+
+def test_latency_histogram_quantiles():
+    h = LatencyHistogram()
+    for v in [0.002] * 90 + [0.3] * 10:
+        h.observe(v)
+    snap = h.snapshot()
+    assert snap['count'] == 100
+    assert snap['p50'] == 0.0025
+    assert snap['p99'] == 0.5
+    assert snap['max'] == 0.3
+
+
+class DummyWS:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, msg):
+        self.sent.append(json.loads(msg))
+
+
+@pytest.mark.asyncio
+async def test_broker_forwards_trace_context():
+    broker = MessageBrokerServer()
+    ws = DummyWS()
+    broker.connections['collector_1'] = ws
+    broker.topics['sensor_readings'] = {'collector_1'}
+    trace = {'sid': 's', 'seq': 7, 'mono': 1.0, 'wall': 2.0}
+
+    await broker.publish('sensor_readings', 'sensor', {'v': 1}, trace=trace)
+    await broker.route('sensor', 'collector_1', {'v': 2}, trace=trace)
+
+    assert ws.sent[0]['trace'] == trace
+    assert ws.sent[1]['trace'] == trace
+
+
+class OneShotWS:
+    def __init__(self, packets):
+        self.sent = []
+        self._packets = [json.dumps(p) for p in packets]
+
+    async def send(self, msg):
+        self.sent.append(json.loads(msg))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._packets:
+            raise StopAsyncIteration
+        return self._packets.pop(0)
+
+
+@pytest.mark.asyncio
+async def test_connection_stamps_outgoing_and_tracks_incoming(monkeypatch):
+    sender = TraceStamper()
+    incoming = [
+        sender.stamp({'from': 'sensor', 'topic': 'sensor_readings', 'payload': {'n': n}}, 'sensor', 'sensor_readings')
+        for n in range(3)
+    ]
+    del incoming[1]  # dropped frame
+    fake_ws = OneShotWS(incoming)
+    monkeypatch.setattr(ws_module, 'websockets', type('M', (), {'connect': lambda uri: asyncio.sleep(0, result=fake_ws)}))
+
+    class Client:
+        name = 'predictor'
+        async def on_message(self, frm, payload): pass
+
+    conn = WebSocketConnection('ws://test')
+    conn.set_client(Client())
+    await conn.connect()
+    await conn.send('topic:prediction', {'scent': 'x'})
+    await asyncio.sleep(0.01)
+
+    assert fake_ws.sent[1]['trace']['seq'] == 0
+    stats = conn.tracker.snapshot()['sensor->sensor_readings']
+    assert stats['received'] == 2
+    assert stats['gaps'] == 1
+    await conn.close()
@@ -0,0 +1,100 @@
+import time
+import urllib.request
+
+import pytest
+
+from DataCommunicator.source.Instrumentation import Instrumentation
+from DataCommunicator.source.Metrics import (
+    MetricsRegistry, MetricsServer, connection_metrics, instrumentation_metrics, serve_metrics
+)
+from DataCommunicator.source.WebSocketConnection import WebSocketConnection
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    frames = registry.counter('frames_total', 'Frames', ('sensor',))
+    queue = registry.gauge('queue_depth', 'Queued "frames"')
+    seconds = registry.histogram('read_seconds', 'Reads')
+    frames.labels('BME680Sensor').inc()
+    frames.labels(sensor='BME680Sensor').inc(2)
+    depth = [1, 2, 3]
+    queue.set_function(lambda: len(depth))
+    seconds.observe(0.003)
+    seconds.observe(7.0)
+
+    lines = registry.render().splitlines()
+
+    assert '# TYPE frames_total counter' in lines
+    assert 'frames_total{sensor="BME680Sensor"} 3' in lines
+    assert '# HELP queue_depth Queued \\"frames\\"' in lines
+    assert 'queue_depth 3' in lines
+    assert 'read_seconds_bucket{le="0.001"} 0' in lines
+    assert 'read_seconds_bucket{le="0.005"} 1' in lines
+    assert 'read_seconds_bucket{le="+Inf"} 2' in lines
+    assert 'read_seconds_sum 7.003' in lines
+    assert 'read_seconds_count 2' in lines
+
+
+def test_registry_returns_existing_family_and_rejects_other_types():
+    registry = MetricsRegistry()
+    assert registry.counter('x_total', 'X') is registry.counter('x_total', 'X')
+    with pytest.raises(ValueError):
+        registry.gauge('x_total', 'X')
+    with pytest.raises(ValueError):
+        registry.counter('x_total', 'X').inc(-1)
+    with pytest.raises(ValueError):
+        registry.counter('y_total', 'Y', ('a',)).inc()
+
+
+def test_failing_collector_does_not_break_scrape(capsys):
+    registry = MetricsRegistry()
+    registry.counter('ok_total', 'Ok').inc()
+    registry.add_collector(lambda: 1 / 0)
+
+    assert 'ok_total 1' in registry.render()
+    assert 'Collector' in capsys.readouterr().out
+
+
+def test_instrumentation_and_connection_metrics():
+    inst = Instrumentation('stats')
+
+    @inst.instrument('read')
+    def read():
+        return 1
+
+    read()
+    read()
+    conn = WebSocketConnection('ws://test')
+    conn.name = 'sensor'
+    conn.send_nowait('topic:x', {'n': 1})
+    conn.tracker.record('io', 'state', {'sid': 'a', 'seq': 0, 'wall': time.time()})
+
+    registry = MetricsRegistry()
+    registry.add_collector(lambda: instrumentation_metrics(inst))
+    registry.add_collector(lambda: connection_metrics(conn))
+    lines = registry.render().splitlines()
+
+    assert 'instrumented_calls_total{function="read"} 2' in lines
+    assert 'instrumented_call_seconds_count{function="read"} 2' in lines
+    assert 'connection_outbox_messages{client="sensor"} 1' in lines
+    assert 'messages_received_total{source="io->state"} 1' in lines
+
+
+def test_metrics_server_serves_from_its_own_thread():
+    registry = MetricsRegistry()
+    registry.counter('scrapes_total', 'Scrapes').inc()
+    server = MetricsServer(registry, port=0).start()
+    try:
+        with urllib.request.urlopen(f'http://127.0.0.1:{server.port}/metrics', timeout=2) as response:
+            body = response.read().decode()
+            assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+        assert 'scrapes_total 1' in body
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f'http://127.0.0.1:{server.port}/other', timeout=2)
+    finally:
+        server.stop()
+
+
+def test_serve_metrics_disabled_with_port_zero(monkeypatch):
+    monkeypatch.setenv('METRICS_PORT', '0')
+    assert serve_metrics('sensor', registry=MetricsRegistry()) is None
@@ -0,0 +1,127 @@
+import asyncio
+import os
+import pstats
+import threading
+import tracemalloc
+
+import pytest
+
+from DataCommunicator.source.BaseDataClient import BaseDataClient
+from DataCommunicator.source.Profiling import CPROFILE, SAMPLE, TRACEMALLOC, Profiler
+
+
+class FakeConnection:
+    def __init__(self):
+        self.sent = []
+
+    def set_client(self, client):
+        pass
+
+    async def send(self, to, payload):
+        self.sent.append((to, payload))
+
+
+class Client(BaseDataClient):
+    async def run(self):
+        pass
+
+    async def on_message(self, frm, payload):
+        pass
+
+
+def busy(seconds):
+    end = asyncio.get_event_loop().time() + seconds
+    while asyncio.get_event_loop().time() < end:
+        sum(range(1000))
+
+
+@pytest.mark.asyncio
+async def test_cprofile_writes_pstats_and_summary(tmp_path):
+    profiler = Profiler('predictor', str(tmp_path))
+    profiler.start(CPROFILE)
+    busy(0.02)
+    summary = profiler.stop(top=5)
+
+    assert not profiler.active
+    assert summary['service'] == 'predictor' and summary['mode'] == CPROFILE
+    assert summary['file'].endswith('.pstats') and os.path.exists(summary['file'])
+    assert pstats.Stats(summary['file']).total_calls > 0
+    assert len(summary['top']) == 5
+    assert any('busy' in entry['function'] for entry in summary['top'])
+
+
+def test_sample_covers_other_threads(tmp_path):
+    stop = threading.Event()
+    worker = threading.Thread(target=lambda: stop.wait(), name='sensor-bus_0')
+    worker.start()
+    profiler = Profiler('sensor', str(tmp_path))
+    profiler.start(SAMPLE)
+    stop.wait(0.1)
+    summary = profiler.stop()
+    stop.set()
+    worker.join()
+
+    with open(summary['file']) as f:
+        lines = f.read().splitlines()
+    assert any(line.startswith('sensor-bus_0;') for line in lines)
+    assert all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+    assert summary['top'][0]['share'] <= 1
+
+
+def test_tracemalloc_reports_growth_and_restores_state(tmp_path):
+    assert not tracemalloc.is_tracing()
+    profiler = Profiler('collector', str(tmp_path))
+    profiler.start(TRACEMALLOC)
+    kept = [bytearray(1024) for _ in range(100)]
+    summary = profiler.stop()
+
+    assert not tracemalloc.is_tracing()
+    assert tracemalloc.Snapshot.load(summary['file']).traces
+    assert summary['top'][0]['size_diff'] >= 100 * 1024
+    assert len(kept) == 100
+
+
+def test_profiler_rejects_unknown_mode_and_second_session(tmp_path):
+    profiler = Profiler('io', str(tmp_path))
+    with pytest.raises(ValueError):
+        profiler.start('perf')
+    profiler.start(SAMPLE)
+    with pytest.raises(RuntimeError):
+        profiler.start(CPROFILE)
+    profiler.stop()
+    with pytest.raises(RuntimeError):
+        profiler.stop()
+
+
+@pytest.mark.asyncio
+async def test_control_profile_sends_summary_back(tmp_path):
+    client = Client('predictor', FakeConnection())
+    client.profiler = Profiler('predictor', str(tmp_path))
+
+    await client.on_control('profiler', {'command': 'profile', 'target': 'sensor', 'mode': CPROFILE})
+    assert client._profiling is None
+
+    await client.on_control('profiler', {'command': 'profile', 'target': '*', 'mode': CPROFILE, 'duration': 5})
+    await client.on_control('profiler', {'command': 'profile', 'target': 'predictor', 'mode': SAMPLE})
+    assert client.connection.sent == [
+        ('profiler', {'profile': {'service': 'predictor', 'error': 'already profiling'}})
+    ]
+
+    await asyncio.sleep(0.01)
+    await client.on_control('profiler', {'command': 'profile_stop', 'target': 'predictor'})
+    await asyncio.wait_for(client._profiling, 1)
+    to, payload = client.connection.sent[-1]
+    assert to == 'profiler'
+    assert payload['profile']['mode'] == CPROFILE and payload['profile']['duration'] < 5
+    assert os.path.exists(payload['profile']['file'])
+
+
+@pytest.mark.asyncio
+async def test_control_profile_reports_bad_mode(tmp_path):
+    client = Client('io', FakeConnection())
+    client.profiler = Profiler('io', str(tmp_path))
+
+    await client.on_control('profiler', {'command': 'profile', 'mode': 'perf'})
+    await client._profiling
+
+    assert client.connection.sent == [('profiler', {'profile': {'service': 'io', 'error': 'Unknown profiling mode: perf'}})]
@@ -0,0 +1,84 @@
+import asyncio
+import json
+import threading
+import pytest
+
+import DataCommunicator.source.Serializer as ser_module
+from DataCommunicator.source.Serializer import (
+    JsonSerializer, OrjsonSerializer, default_serializer
+)
+from DataCommunicator.source.WebSocketConnection import WebSocketConnection
+
+PACKET = {'type': 'publish', 'topic': 'sensor_readings', 'from': 'sensor',
+          'payload': {'SGP30Sensor': {'CO2': 400, 'TVOC': 12}}}
+
+
+def test_json_serializer_round_trip():
+    s = JsonSerializer()
+    assert json.loads(s.dumps(PACKET)) == PACKET
+    assert s.loads(s.dumps(PACKET)) == PACKET
+
+
+@pytest.mark.skipif(ser_module.orjson is None, reason="orjson not installed")
+def test_orjson_serializer_matches_stdlib():
+    s = OrjsonSerializer()
+    out = s.dumps(PACKET)
+    assert isinstance(out, str)
+    assert json.loads(out) == PACKET
+    assert s.loads(out) == PACKET
+
+
+def test_default_serializer_falls_back_to_json(monkeypatch):
+    monkeypatch.setattr(ser_module, 'orjson', None)
+    assert isinstance(default_serializer(), JsonSerializer)
+    with pytest.raises(ImportError):
+        OrjsonSerializer()
+
+
+def test_should_offload_uses_item_count():
+    s = JsonSerializer(offload_threshold=3)
+    assert not s.should_offload([1, 2, 3])
+    assert s.should_offload([1, 2, 3, 4])
+    assert not s.should_offload({'a': 1})
+    assert not s.should_offload("a long string payload")
+
+
+def test_should_offload_counts_nested_items():
+    s = JsonSerializer(offload_threshold=10)
+    # one key holding a large list of records
+    assert s.should_offload({'offset': 0, 'records': [{'value': i} for i in range(5)]})
+    assert not s.should_offload({'offset': 0, 'records': [{'value': 1}]})
+
+
+class RecordingSerializer(JsonSerializer):
+    def __init__(self, offload_threshold):
+        super().__init__(offload_threshold)
+        self.threads = []
+
+    def dumps(self, obj):
+        self.threads.append(threading.current_thread())
+        return super().dumps(obj)
+
+
+class FakeWS:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, msg):
+        self.sent.append(json.loads(msg))
+
+
+@pytest.mark.asyncio
+async def test_large_payload_encoded_off_loop():
+    s = RecordingSerializer(offload_threshold=2)
+    conn = WebSocketConnection('ws://test', serializer=s)
+    conn.name = 'collector'
+    conn.ws = FakeWS()
+
+    await conn.send('topic:complete_data', [{'a': 1}])
+    await conn.send('topic:complete_data', [{'a': 1}, {'a': 2}, {'a': 3}])
+
+    main = threading.current_thread()
+    assert s.threads[0] is main
+    assert s.threads[1] is not main
+    assert conn.ws.sent[1]['payload'] == [{'a': 1}, {'a': 2}, {'a': 3}]
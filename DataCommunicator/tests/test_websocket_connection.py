@@ -47,7 +47,7 @@ async def test_set_client_and_send(monkeypatch):
         })
     )
 
-    conn = WebSocketConnection('ws://test')
+    conn = WebSocketConnection('ws://test', tracing=False)
 
     class DummyClient:
         def __init__(self):
@@ -102,4 +102,135 @@ async def test_listener_delegates_to_client(monkeypatch):
     fake_ws.push('alice', {'ping': True})
     await asyncio.sleep(0.01)
 
-    assert client.received == [('alice', {'ping': True})]
\ No newline at end of file
+    assert client.received == [('alice', {'ping': True})]
+
+class SlowFakeWS(FakeWS):
+    """FakeWS whose listener stays open so the writer keeps running."""
+    async def __anext__(self):
+        await asyncio.Event().wait()
+
+
+@pytest.mark.asyncio
+async def test_send_nowait_from_other_thread_is_delivered_in_order(monkeypatch):
+    fake_ws = SlowFakeWS()
+    monkeypatch.setattr(
+        ws_module,
+        'websockets',
+        type('FakeWSMod', (), {
+            'connect': lambda uri: asyncio.sleep(0, result=fake_ws)
+        })
+    )
+
+    conn = WebSocketConnection('ws://dummy')
+
+    class DummyClient:
+        name = 'io'
+        async def on_message(self, frm, payload): pass
+
+    conn.set_client(DummyClient())
+    # queued before connect: buffered until the writer starts
+    conn.send_nowait('topic:state', {'state': 'IdleState'})
+    await conn.connect()
+
+    import threading
+    def producer():
+        for i in range(50):
+            conn.send_nowait('topic:display', {'i': i})
+    t = threading.Thread(target=producer)
+    t.start()
+    t.join()
+
+    for _ in range(100):
+        if len(fake_ws.sent) == 52:
+            break
+        await asyncio.sleep(0.01)
+
+    assert fake_ws.sent[0] == {'type': 'register', 'name': 'io'}
+    assert fake_ws.sent[1]['topic'] == 'state'
+    assert [m['payload']['i'] for m in fake_ws.sent[2:]] == list(range(50))
+    await conn.close()
+
+
+def test_send_nowait_drops_oldest_when_full():
+    conn = WebSocketConnection('ws://dummy', max_pending=2)
+    conn.send_nowait('topic:a', {'n': 1})
+    conn.send_nowait('topic:a', {'n': 2})
+    conn.send_nowait('topic:a', {'n': 3})
+    assert [p['n'] for _, p in conn._outbox] == [2, 3]
+
+
+
+def test_send_nowait_forgets_acks_of_dropped_and_replaced_messages():
+    conn = WebSocketConnection('ws://dummy', max_pending=2)
+    conn.send_nowait('topic:a', {'n': 1}, on_ack=lambda: None)
+    conn.send_nowait('topic:a', {'n': 2}, on_ack=lambda: None, ack_key=('storage', 0))
+    # a resend with the same key replaces the first copy's callback
+    conn.send_nowait('topic:a', {'n': 2}, on_ack=lambda: None, ack_key=('storage', 0))
+
+    # {'n': 1} was dropped from the full outbox, {'n': 2} was replaced
+    assert [msg['ack'] for msg, _ in conn._outbox] == [2, 3]
+    assert list(conn._pending_acks) == [3]
+    assert conn.pending_sends == 2 and conn.pending_acks == 1
+    assert conn._ack_keys == {('storage', 0): 3}
+
+
+@pytest.mark.asyncio
+async def test_disconnect_forgets_acks_of_messages_already_sent(monkeypatch):
+    fake_ws = FakeWS()
+    monkeypatch.setattr(
+        ws_module,
+        'websockets',
+        type('FakeWSMod', (), {
+            'connect': lambda uri: asyncio.sleep(0, result=fake_ws)
+        })
+    )
+
+    conn = WebSocketConnection('ws://dummy')
+
+    class DummyClient:
+        name = 'storage'
+
+    conn.set_client(DummyClient())
+    on_wire = conn._request_ack({'to': 'x'}, lambda: None, ack_key=('storage', 0))['ack']
+    conn.send_nowait('topic:complete_data', {'offset': 5}, on_ack=lambda: None)
+
+    # the fake socket closes right away
+    await conn.connect()
+    await asyncio.sleep(0.01)
+
+    assert on_wire not in conn._pending_acks and conn._ack_keys == {}
+    assert list(conn._pending_acks) == [conn._outbox[0][0]['ack']]
+    await conn.close()
+
+@pytest.mark.asyncio
+async def test_send_nowait_on_ack_called_when_broker_acks(monkeypatch):
+    fake_ws = FakeWS()
+    monkeypatch.setattr(
+        ws_module,
+        'websockets',
+        type('FakeWSMod', (), {
+            'connect': lambda uri: asyncio.sleep(0, result=fake_ws)
+        })
+    )
+
+    conn = WebSocketConnection('ws://dummy')
+
+    class DummyClient:
+        name = 'storage'
+        received = []
+        async def on_message(self, frm, payload):
+            self.received.append(payload)
+
+    conn.set_client(DummyClient())
+    acked = []
+    conn.send_nowait('topic:complete_data', {'offset': 0, 'records': []}, on_ack=lambda: acked.append(True))
+    msg, _ = conn._outbox[0]
+
+    # the ack is consumed by the connection, not delivered to the client
+    fake_ws._incoming.put_nowait(json.dumps({'type': 'ack', 'id': msg['ack']}))
+    await conn.connect()
+    await asyncio.sleep(0.01)
+
+    assert acked == [True]
+    assert DummyClient.received == []
+    assert conn._pending_acks == {}
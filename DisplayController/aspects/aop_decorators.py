@@ -3,6 +3,8 @@ import logging
 import time
 import inspect
 
+from DataCommunicator.source.Instrumentation import TRACE, instrument, instrumentation
+
 # Configure a logger for AOP
 logger = logging.getLogger("aop")
 handler = logging.StreamHandler()
@@ -15,29 +17,27 @@ logger.addHandler(handler)
 logger.setLevel(logging.INFO)
 
 
+def _enter(func):
+    def enter(args, kwargs):
+        # drop self from args when printing
+        params = [repr(a) for a in args[1:]] + [f"{k}={v!r}" for k,v in kwargs.items()]
+        logger.info(f"ENTER {func.__qualname__}({', '.join(params)})")
+    return enter
+
+
+def _exit(func):
+    def leave(args, result, error):
+        if error is None:
+            logger.info(f"EXIT  {func.__qualname__} -> {result!r}")
+    return leave
+
+
 def log_call(func):
     """
-    Logs entry & exit of sync or async functions.
+    Counts calls and latency of sync or async functions in the shared
+    Instrumentation; logs entry & exit with their arguments only at TRACE level.
     """
-    if inspect.iscoroutinefunction(func):
-        @functools.wraps(func)
-        async def async_wrapper(*args, **kwargs):
-            # drop self from args when printing
-            params = [repr(a) for a in args[1:]] + [f"{k}={v!r}" for k,v in kwargs.items()]
-            logger.info(f"ENTER {func.__qualname__}({', '.join(params)})")
-            result = await func(*args, **kwargs)
-            logger.info(f"EXIT  {func.__qualname__} -> {result!r}")
-            return result
-        return async_wrapper
-    else:
-        @functools.wraps(func)
-        def sync_wrapper(*args, **kwargs):
-            params = [repr(a) for a in args[1:]] + [f"{k}={v!r}" for k,v in kwargs.items()]
-            logger.info(f"ENTER {func.__qualname__}({', '.join(params)})")
-            result = func(*args, **kwargs)
-            logger.info(f"EXIT  {func.__qualname__} -> {result!r}")
-            return result
-        return sync_wrapper
+    return instrument(on_enter=_enter(func), on_exit=_exit(func))(func)
 
 
 def catch_errors(func):
@@ -64,21 +64,28 @@ def catch_errors(func):
 
 def measure_time(func):
     """
-    Measures execution time of sync or async functions.
+    Measures execution time of sync or async functions into the shared
+    Instrumentation; logs it only at TRACE level.
     """
+    wrapped = instrument()(func)
+
     if inspect.iscoroutinefunction(func):
         @functools.wraps(func)
         async def async_wrapper(*args, **kwargs):
-            start = time.time()
-            result = await func(*args, **kwargs)
-            logger.info(f"TIMING {func.__qualname__}: {time.time() - start:.3f}s")
-            return result
+            start = time.perf_counter()
+            try:
+                return await wrapped(*args, **kwargs)
+            finally:
+                if instrumentation.level >= TRACE:
+                    logger.info(f"TIMING {func.__qualname__}: {time.perf_counter() - start:.3f}s")
         return async_wrapper
     else:
         @functools.wraps(func)
         def sync_wrapper(*args, **kwargs):
-            start = time.time()
-            result = func(*args, **kwargs)
-            logger.info(f"TIMING {func.__qualname__}: {time.time() - start:.3f}s")
-            return result
-        return sync_wrapper
\ No newline at end of file
+            start = time.perf_counter()
+            try:
+                return wrapped(*args, **kwargs)
+            finally:
+                if instrumentation.level >= TRACE:
+                    logger.info(f"TIMING {func.__qualname__}: {time.perf_counter() - start:.3f}s")
+        return sync_wrapper
@@ -11,9 +11,13 @@ from DisplayController.aspects.aop_decorators import log_call, catch_errors
 
 from DataCommunicator.source.WebSocketConnection import WebSocketConnection
 from DataCommunicator.source.BaseDataClient import BaseDataClient
+from DataCommunicator.source.Metrics import registry
 
 from DisplayController.display.display_impl import PiTFTDisplay, HDMIDisplay, HDMIStatusChecker
 
+RENDER_SECONDS = registry.histogram('display_render_seconds', 'Duration of one draw()')
+DISPLAY_RESETS = registry.counter('display_resets_total', 'Displays (re)created after a change or failure')
+
 
 class DisplayController(BaseDataClient):
     """
@@ -157,7 +161,10 @@ class DisplayController(BaseDataClient):
                     self.display.stop()
                 self.display = Desired()
                 self.display.start()
+                DISPLAY_RESETS.inc()
 
             # render
+            started = time.perf_counter()
             self.draw()
+            RENDER_SECONDS.observe(time.perf_counter() - started)
             await asyncio.sleep(self.draw_interval)
\ No newline at end of file
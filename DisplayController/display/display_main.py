@@ -6,6 +6,7 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(__file__, '..', '..', '..')))
 
 from DataCommunicator.source.WebSocketConnection import WebSocketConnection
+from DataCommunicator.source.Metrics import serve_metrics
 from DisplayController.display.display_controller import DisplayController
 
 USE_HDMI = False
@@ -14,6 +15,7 @@ WS_URI   = "ws://localhost:8765"
 async def main():
     conn = WebSocketConnection(WS_URI)
     controller = DisplayController("display", conn, use_hdmi=USE_HDMI)
+    serve_metrics("display", conn)
     await controller.start()   # calls BaseDataClient.start(), which in turn runs run()
 
 if __name__ == "__main__":
@@ -10,6 +10,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(__file__, '..', '..', '..')))
 from DisplayController.aspects.aop_decorators import log_call, catch_errors
 from DataCommunicator.source.WebSocketConnection import WebSocketConnection
 from DataCommunicator.source.BaseDataClient   import BaseDataClient
+from DataCommunicator.source.Metrics          import registry
 from DisplayController.io.io_input_handler import IButtonInput
 from DisplayController.io.io_interfaces import IIOHandler
 from DisplayController.io.state_machine  import (
@@ -17,6 +18,10 @@ from DisplayController.io.state_machine  import (
     VentilatingState, CancelledState
 )
 
+TICK_SECONDS = registry.histogram('io_tick_seconds', 'Duration of one state machine tick')
+STATE_CHANGES = registry.counter('io_state_changes_total', 'State machine transitions by new state', ('state',))
+BUTTONS = registry.counter('io_buttons_total', 'Button presses by button', ('button',))
+
 
 class IOHandler(BaseDataClient, IIOHandler):
     """
@@ -41,9 +46,6 @@ class IOHandler(BaseDataClient, IIOHandler):
         self.ventilation_duration = ventilation_duration
         self.keepalive            = keepalive
 
-        # for scheduling sends from any thread
-        self._event_loop: asyncio.AbstractEventLoop | None = None
-
         # FSM
         self._state = IdleState()
         self._lock  = threading.Lock()
@@ -63,8 +65,6 @@ class IOHandler(BaseDataClient, IIOHandler):
 
     @log_call
     async def start(self):
-        # capture the running loop so we can schedule from sync context
-        self._event_loop = asyncio.get_running_loop()
         return await super().start()
 
     @log_call
@@ -104,17 +104,8 @@ class IOHandler(BaseDataClient, IIOHandler):
 
     @catch_errors
     def _send_payload(self, payload: dict):
-        # thread‐safe scheduling of the send coroutine
-        if not self._event_loop:
-            try:
-                self._event_loop = asyncio.get_event_loop()
-            except RuntimeError:
-                return
-        # **always** publish on topic:display
-        self._event_loop.call_soon_threadsafe(
-            self._event_loop.create_task,
-            self.connection.send('topic:display', payload)
-        )
+        # thread‐safe, never blocks: **always** publish on topic:display
+        self.connection.send_nowait('topic:display', payload)
 
     def send_message(self, title: str, lines: list[dict] | list[str]):
         formatted = []
@@ -199,11 +190,9 @@ class IOHandler(BaseDataClient, IIOHandler):
 
         # 3) broadcast the state‐name: **always** on topic:state
         state_name = new_state.__class__.__name__
+        STATE_CHANGES.labels(state_name).inc()
         payload = {"state": state_name}
-        self._event_loop.call_soon_threadsafe(
-            self._event_loop.create_task,
-            self.connection.send("topic:state", payload)
-        )
+        self.connection.send_nowait("topic:state", payload)
 
         # 4) fire its on_entry (sends the UI payload)
         self._state.on_entry(self)
@@ -229,6 +218,7 @@ class IOHandler(BaseDataClient, IIOHandler):
     def _on_button(self, name: str):
         # hardware button callback
         print(f"[IOHandler DEBUG] raw button → '{name}'")
+        BUTTONS.labels(name).inc()
         with self._lock:
             self._state.on_button(self, name)
 
@@ -239,8 +229,10 @@ class IOHandler(BaseDataClient, IIOHandler):
     @log_call
     async def _loop(self):
         while True:
+            started = time.perf_counter()
             with self._lock:
                 self._state.on_tick(self)
+            TICK_SECONDS.observe(time.perf_counter() - started)
 
             await asyncio.sleep(0.1)
 
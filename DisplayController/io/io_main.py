@@ -3,6 +3,7 @@ import sys, os
 # insert project root (one level up from DisplayController/source) onto PYTHONPATH
 sys.path.insert(0, os.path.abspath(os.path.join(__file__, '..', '..', '..')))
 
+from DataCommunicator.source.Metrics import serve_metrics
 from DataCommunicator.source.WebSocketConnection import WebSocketConnection
 from DisplayController.io.io_handler import IOHandler
 from DisplayController.io.io_input_handler import ButtonHandler
@@ -26,6 +27,7 @@ async def main():
         ventilation_duration=300,
         keepalive=5
     )
+    serve_metrics("io", conn)
     await io.start()
 
 if __name__ == "__main__":
@@ -14,6 +14,7 @@ class DummyConn:
         self.client = client
     async def subscribe(self, topic): self.subs.append(topic)
     async def send(self, topic, payload): self.sent.append((topic, payload))
+    def send_nowait(self, topic, payload): self.sent.append((topic, payload))
     async def connect(self): pass
 
 class DummyButtonInput:
@@ -42,7 +43,6 @@ async def test_run_and_button_and_prediction(io_handler, monkeypatch):
         await asyncio.sleep(0)
         return
     monkeypatch.setattr(io_handler, "_loop", fake_loop)
-    io_handler._event_loop = asyncio.get_running_loop()
     io_handler._send_payload = lambda payload: io_handler.connection.sent.append(("topic:display", payload))
     # start run → subscribes and enters IdleState
     task = asyncio.create_task(io_handler.run())
@@ -59,23 +59,23 @@ async def test_run_and_button_and_prediction(io_handler, monkeypatch):
     task.cancel()
 
 def test_send_message_formats(io_handler):
-    io_handler._event_loop = asyncio.get_event_loop()
-    io_handler.connection.send = MagicMock()
+    io_handler.connection.send_nowait = MagicMock()
     io_handler.send_message("T", ["a","b"])
     # last sent payload:
-    args = io_handler.connection.send.call_args[0][1]
+    assert io_handler.connection.send_nowait.call_args[0][0] == "topic:display"
+    args = io_handler.connection.send_nowait.call_args[0][1]
     assert args["title"] == "T"
     assert isinstance(args["lines"][0]["text"], str)
 
 @pytest.mark.asyncio
 async def test_change_state_and_heartbeat(io_handler):
-    io_handler._event_loop = asyncio.get_event_loop()
-    io_handler.connection.send = MagicMock()
+    io_handler.connection.send_nowait = MagicMock()
     # move to VentilatingState
     from DisplayController.io.state_machine import VentilatingState
     io_handler.change_state(VentilatingState())
-    # should schedule a send state
-    assert any("topic:state" in call[0][0] for call in io_handler.connection.send.call_args_list)
+    # should queue a send state
+    assert any("topic:state" in call[0][0] for call in io_handler.connection.send_nowait.call_args_list)
+    assert {"state": "VentilatingState"} in [call[0][1] for call in io_handler.connection.send_nowait.call_args_list]
 
 
 @pytest.mark.asyncio
@@ -88,6 +88,7 @@ async def test_connect_and_stop(monkeypatch):
         async def connect(self): sent.append("connected")
         async def subscribe(self,t): sent.append(f"sub:{t}")
         async def send(self, t,p): sent.append(f"send:{t}")
+        def send_nowait(self, t,p): sent.append(f"send:{t}")
     handler = IOHandler("n", C(), MagicMock(), use_hdmi=False, loading_duration=1, ventilation_duration=1, keepalive=0.1)
     async def fake_loop():
         # simulates the background loop
@@ -100,16 +101,13 @@ async def test_connect_and_stop(monkeypatch):
 
 @pytest.mark.asyncio
 async def test_send_payload_error(monkeypatch):
-    # simulate event_loop closed
+    # simulate the connection refusing the message
     class C:
         def set_client(self,c): pass
         async def connect(self): pass
         async def subscribe(self,t): pass
         async def send(self,t,p): pass
+        def send_nowait(self,t,p): raise RuntimeError("closed")
     h = IOHandler("x", C(), MagicMock(), use_hdmi=False, loading_duration=1, ventilation_duration=1, keepalive=0.1)
-    # simulate call_soon_threadsafe failing
-    h._event_loop = types.SimpleNamespace(
-        call_soon_threadsafe=lambda *a, **k: (_ for _ in ()).throw(RuntimeError("closed"))
-    )
     # should catch & swallow
     h._send_payload({"a":1})
\ No newline at end of file
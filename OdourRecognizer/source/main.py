@@ -3,8 +3,10 @@ import os
 import sys
 import asyncio
 import numpy as np
+from numpy.lib.recfunctions import structured_to_unstructured
 from datetime import datetime
 import threading
+import time
 
 import concurrent.futures
 from functools import partial   
@@ -16,6 +18,18 @@ from OdourRecognizer.source.recognizers.RecognizerManager import RecognizerManag
 
 from DataCommunicator.source.WebSocketConnection import WebSocketConnection
 from DataCommunicator.source.BaseDataClient import BaseDataClient
+from DataCommunicator.source.FrameSchema import FrameDecoder, is_packed
+from DataCommunicator.source.Metrics import registry, serve_metrics
+
+# frame keys added by the SensorReader that are not sensor readings
+FRAME_METADATA = {"timestamp", "meta", "raw"}
+
+STREAM_TTL = 600  # s; full-rate frames from the reader end at the latest after this
+
+INFERENCE_SECONDS = registry.histogram('inference_seconds', 'Duration of one prediction (features and models)')
+PREDICTIONS = registry.counter('predictions_total', 'Predictions by outcome', ('outcome',))
+BUFFERED = registry.gauge('predictor_buffered_frames', 'Frames collected for the next prediction')
+STATE_QUEUE = registry.gauge('predictor_state_queue', 'State changes waiting for the prediction loop')
 
 class Predictor(BaseDataClient):
     def __init__(self, uri: str):
@@ -25,6 +39,29 @@ class Predictor(BaseDataClient):
         self.prediction_active = False
         self.data = []
         self.current_state = None  # Add current state tracking
+        self.decoder = FrameDecoder()
+        self._feature_fields = {}  # packed frame dtype -> fields used as features
+        BUFFERED.set_function(lambda: len(self.data))
+        STATE_QUEUE.set_function(self._state_q.qsize)
+
+    def featureFields(self, dtype) -> list[str]:
+        # the same channels prepareData picks from a dict frame, by "Sensor.Channel" field name
+        fields = self._feature_fields.get(dtype)
+        if fields is None:
+            fields = []
+            positions = {}
+            for name in dtype.names:
+                sensor = name.partition('.')[0]
+                i = positions[sensor] = positions.get(sensor, -1) + 1
+                if sensor == "SGP30Sensor":
+                    continue
+                if sensor == "BME680Sensor" and i in [0, 1, 2]:
+                    continue
+                if sensor == "GroveGasSensor" and i in [4, 5]:
+                    continue
+                fields.append(name)
+            self._feature_fields[dtype] = fields
+        return fields
 
     def prepareData(self, data: list) -> list[float]:
         # Modified to accept dict instead of file path
@@ -43,9 +80,14 @@ class Predictor(BaseDataClient):
         data = data[-REQUIRED_SAMPLES:]  # Take the most recent samples
 
         for data_point in data:
+            if isinstance(data_point, np.ndarray):
+                # packed frame: a structured view straight over the received bytes
+                fields = self.featureFields(data_point.dtype)
+                timepoint_vectors.append(structured_to_unstructured(data_point[fields], dtype=float).ravel().tolist())
+                continue
             data_point_attr = []
             for sensor, readings in data_point.items():
-                if sensor == "timestamp" or sensor == "SGP30Sensor":
+                if sensor in FRAME_METADATA or sensor == "SGP30Sensor":
                     continue
                 elif sensor == "BME680Sensor":
                     for i, reading in enumerate(readings.values()):
@@ -90,6 +132,7 @@ class Predictor(BaseDataClient):
     async def run(self):
         await self.connection.subscribe("state")
         await self.connection.subscribe("sensor_readings")
+        await self.connection.subscribe("sensor_schemas")
         print("[predictor] subscribed to state and sensor_readings")
 
         # Only create prediction loop task
@@ -112,12 +155,30 @@ class Predictor(BaseDataClient):
                     print("[predictor] clearing data for LoadingState")
                     self.data = []
                     self.prediction_active = False
+
+                # every frame while loading, change-driven frames otherwise
+                await self.connection.send('sensor', {
+                    'command': 'stream', 'enabled': state == "LoadingState", 'ttl': STREAM_TTL,
+                })
                     
         elif frm == 'sensor':
-            payload['timestamp'] = datetime.now().isoformat()
+            if self.decoder.accept(payload):
+                return
+            if is_packed(payload):
+                frame = self.decoder.view(payload)
+                if frame is None:
+                    # schema announced before we subscribed: ask the reader for it
+                    request = self.decoder.schema_request(payload)
+                    if request is not None:
+                        await self.connection.send(frm, request)
+                    return
+            else:
+                # the reader stamps frames at acquisition; receipt time only for older senders
+                payload.setdefault('timestamp', datetime.now().isoformat())
+                frame = payload
             # Only collect data during LoadingState
             if self.current_state == "LoadingState":
-                self.data.append(payload)
+                self.data.append(frame)
                 print(f"[Collector] Received from {frm}: {payload}")
                 print(f"[Collector] Data length: {len(self.data)}")
 
@@ -130,7 +191,10 @@ class Predictor(BaseDataClient):
 
             print("[predictor] entering prediction phase")
             
+            started = time.perf_counter()
             prediction = self.predict(self.data, os.path.join(os.path.dirname(os.path.abspath(__file__)), "models"))
+            INFERENCE_SECONDS.observe(time.perf_counter() - started)
+            PREDICTIONS.labels('ok' if prediction else 'failed').inc()
             if prediction:
                 for x in range(0, 5):
                     await self.connection.send(
@@ -162,6 +226,7 @@ if __name__ == "__main__":
         uri = "ws://localhost:8765"
         print(f"[predictor] starting → {uri}")
         p = Predictor(uri)
+        serve_metrics('predictor', p.connection)
         await p.start()
 
     asyncio.run(main())
\ No newline at end of file
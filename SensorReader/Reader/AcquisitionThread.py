@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import time
+from datetime import datetime
+
+from DataCommunicator.source.Metrics import registry
+
+READ_SECONDS = registry.histogram('sensor_read_seconds', 'Duration of one read cycle over all sensors (without a scheduler)')
+DEVICE_READ_SECONDS = registry.histogram('sensor_device_read_seconds', 'Time one sensor read kept its worker busy', ('sensor',))
+FRAMES = registry.counter('sensor_frames_total', 'Frames acquired')
+DROPPED = registry.counter('sensor_frames_dropped_total', 'Frames dropped because the event loop fell behind')
+OVERRUNS = registry.counter('sensor_read_overruns_total', 'Frame deadlines missed because a read took too long')
+
+
+class AcquisitionThread(threading.Thread):
+    """
+    Runs the blocking sensor reads (I2C transfers, sensor settle sleeps) on
+    its own thread and hands each frame to an asyncio loop through a queue,
+    so the loop only serializes, sends and answers control messages.
+
+    The queue is bounded; if the loop falls behind, the oldest frame is
+    dropped so consumers always get the newest data.
+
+    Without a scheduler, reads start on absolute monotonic deadlines
+    (start + k * sleep_interval), so read time does not add to the period.
+    Every frame gets "timestamp" (ISO wall time of the acquisition) and
+    "meta" with the monotonic and wall-clock start/end of the read and a
+    sequence number (and the reader's sampling profile, if any). Scheduler
+    frames are stamped with their grid time. Sensors whose circuit breaker
+    left them without values or with held values are listed under "missing"
+    and "stale".
+
+    Read durations come from the sensors' workers, not from how long
+    read_once() blocked: each read lands in sensor_device_read_seconds, and
+    without a scheduler the whole cycle in sensor_read_seconds (a scheduler
+    frame only waits for the grid, so it has no cycle to time).
+    """
+    def __init__(self, reader, loop: asyncio.AbstractEventLoop, queue: asyncio.Queue):
+        super().__init__(daemon=True, name='sensor-acquisition')
+        self.reader = reader
+        self.loop = loop
+        self.queue = queue
+        self.frames = 0
+        self.dropped = 0
+        self.overruns = 0  # deadlines missed because a read took longer than the interval
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def _acquire(self) -> dict:
+        mono_start, wall_start = time.monotonic(), time.time()
+        frame = self.reader.read_once()
+        mono_end, wall_end = time.monotonic(), time.time()
+        scheduler = self.reader.scheduler
+        self._observe_reads(scheduler)
+        if scheduler is not None and scheduler.last_frame_mono is not None:
+            # values are aligned to the grid time, not to when next_frame() returned
+            mono_start = mono_end = scheduler.last_frame_mono
+            wall_start = wall_end = scheduler.last_frame_time
+        frame["timestamp"] = datetime.fromtimestamp(wall_start).isoformat()
+        frame["meta"] = {
+            "seq": self.frames,
+            "mono_start": mono_start,
+            "mono_end": mono_end,
+            "wall_start": wall_start,
+            "wall_end": wall_end,
+        }
+        profile = getattr(self.reader, 'profile', None)
+        if profile is not None:
+            frame["meta"]["profile"] = profile
+        source = scheduler if scheduler is not None else getattr(self.reader, 'manager', None)
+        for mark in ("missing", "stale"):
+            sensors = getattr(source, f"last_{mark}", None)
+            if sensors:
+                frame["meta"][mark] = list(sensors)
+        return frame
+
+    def _observe_reads(self, scheduler) -> None:
+        if scheduler is not None:
+            for name, seconds in scheduler.take_timings():
+                DEVICE_READ_SECONDS.labels(name).observe(seconds)
+            return
+        manager = getattr(self.reader, 'manager', None)
+        if manager is None or manager.last_cycle is None:
+            return
+        READ_SECONDS.observe(manager.last_cycle)
+        for name, seconds in manager.last_timings.items():
+            if seconds is not None:  # skipped while its breaker is open
+                DEVICE_READ_SECONDS.labels(name).observe(seconds)
+
+    def run(self) -> None:
+        interval = self.reader.sleep_interval
+        deadline = time.monotonic()
+        while not self._stop_event.is_set():
+            if self.reader.sleep_interval != interval:
+                # new sampling profile: restart the deadline grid from now
+                interval = self.reader.sleep_interval
+                deadline = time.monotonic()
+            try:
+                frame = self._acquire()
+            except Exception as e:
+                print(f"[AcquisitionThread] Read failed: {e}")
+            else:
+                self.frames += 1
+                FRAMES.inc()
+                try:
+                    self.loop.call_soon_threadsafe(self._put, frame)
+                except RuntimeError:
+                    return  # loop closed
+            # the scheduler paces itself
+            if self.reader.scheduler is not None or interval <= 0:
+                continue
+            deadline += interval
+            now = time.monotonic()
+            if deadline <= now:
+                # the read overran: skip the missed deadlines instead of bursting to catch up
+                missed = int((now - deadline) // interval) + 1
+                self.overruns += missed
+                OVERRUNS.inc(missed)
+                deadline += missed * interval
+            self._stop_event.wait(deadline - now)
+
+    def _put(self, frame: dict) -> None:
+        # runs on the event loop
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            DROPPED.inc()
+        self.queue.put_nowait(frame)
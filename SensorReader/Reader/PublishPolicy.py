@@ -0,0 +1,101 @@
+import time
+
+# frame keys that describe the frame rather than hold readings
+FRAME_METADATA = {"timestamp", "meta", "raw"}
+# meta fields whose change is published like a reading
+STATUS_FIELDS = ("missing", "stale")
+
+
+class PublishPolicy:
+    """
+    Decides which frames the reader sends. A frame goes out when any channel
+    moved more than its deadband since the last sent frame, when a sensor
+    starts or stops delivering (its values become None or come back) or
+    meta.missing/meta.stale change, when `heartbeat` seconds passed without
+    a send, or always while a consumer has asked for full-rate streaming.
+
+    deadbands maps "Sensor.Channel" or "Sensor" to an absolute threshold;
+    other channels use default_deadband. Streaming requests expire after
+    their ttl so a consumer that goes away does not keep streaming on.
+    """
+    def __init__(self, deadbands: dict | None = None, default_deadband: float = 0.0, heartbeat: float = 30.0,
+                 clock=time.monotonic):
+        self.deadbands = deadbands or {}
+        self.default_deadband = default_deadband
+        self.heartbeat = heartbeat
+        self.clock = clock
+        self.streams: dict[str, float] = {}  # requester -> expiry (clock)
+        self.sent = 0
+        self.suppressed = 0
+        self._last = None
+        self._last_status = None
+        self._last_time = None
+
+    def request_stream(self, requester: str, enabled: bool = True, ttl: float | None = 60.0) -> None:
+        if enabled:
+            self.streams[requester] = self.clock() + ttl if ttl is not None else float('inf')
+        else:
+            self.streams.pop(requester, None)
+
+    def streaming(self, now: float | None = None) -> bool:
+        now = self.clock() if now is None else now
+        for requester, expiry in list(self.streams.items()):
+            if expiry <= now:
+                del self.streams[requester]
+        return bool(self.streams)
+
+    def _deadband(self, sensor: str, channel: str) -> float:
+        deadband = self.deadbands.get(f"{sensor}.{channel}")
+        if deadband is None:
+            deadband = self.deadbands.get(sensor, self.default_deadband)
+        return deadband
+
+    @staticmethod
+    def _status(frame: dict) -> tuple:
+        meta = frame.get("meta")
+        if not isinstance(meta, dict):
+            return ()
+        return tuple(tuple(meta.get(field) or ()) for field in STATUS_FIELDS)
+
+    def _changed(self, frame: dict) -> bool:
+        if self._status(frame) != self._last_status:
+            return True
+        for sensor, values in frame.items():
+            if sensor in FRAME_METADATA or not (values is None or isinstance(values, dict)):
+                continue
+            if sensor not in self._last:
+                return True
+            last = self._last[sensor]
+            if (values is None) != (last is None):
+                return True  # the sensor went missing or came back
+            if values is None:
+                continue
+            for channel, value in values.items():
+                previous = last.get(channel)
+                if isinstance(value, (int, float)) and isinstance(previous, (int, float)):
+                    if abs(value - previous) > self._deadband(sensor, channel):
+                        return True
+                elif value != previous:
+                    return True
+        return False
+
+    def should_publish(self, frame: dict) -> bool:
+        now = self.clock()
+        publish = (
+            self._last is None
+            or self.streaming(now)
+            or now - self._last_time >= self.heartbeat
+            or self._changed(frame)
+        )
+        if publish:
+            # compare against what consumers last saw, so slow drifts still get through
+            self._last = {
+                sensor: None if values is None else dict(values) for sensor, values in frame.items()
+                if sensor not in FRAME_METADATA and (values is None or isinstance(values, dict))
+            }
+            self._last_status = self._status(frame)
+            self._last_time = now
+            self.sent += 1
+        else:
+            self.suppressed += 1
+        return publish
@@ -0,0 +1,60 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+
+class SnapshotWriter(threading.Thread):
+    """
+    Keeps a JSON file with the latest frame up to date on a background thread.
+
+    write() only swaps in the newest frame and returns; frames that arrive
+    faster than `interval` seconds replace each other and only the newest
+    one is written. The file is written to a temp file next to it and moved
+    into place with os.replace, so readers never see a partial file.
+    """
+    def __init__(self, path, interval: float = 0.0, indent: int | None = 4):
+        super().__init__(daemon=True, name='snapshot-writer')
+        self.path = Path(path)
+        self.interval = interval
+        self.indent = indent
+        self.written = 0
+        self._latest = None
+        self._cond = threading.Condition()
+        self._stopped = False
+
+    def write(self, frame: dict) -> None:
+        with self._cond:
+            self._latest = frame
+            self._cond.notify()
+
+    def stop(self) -> None:
+        """Write the pending frame, if any, and end the thread."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def run(self) -> None:
+        while True:
+            with self._cond:
+                while self._latest is None and not self._stopped:
+                    self._cond.wait()
+                frame, self._latest = self._latest, None
+                stopped = self._stopped
+            if frame is not None:
+                try:
+                    self._write_file(frame)
+                except Exception as e:
+                    print(f"[SnapshotWriter] Error writing {self.path}: {e}")
+            if stopped:
+                return
+            if self.interval:
+                time.sleep(self.interval)
+
+    def _write_file(self, frame: dict) -> None:
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(frame, f, indent=self.indent)
+        os.replace(tmp, self.path)
+        self.written += 1
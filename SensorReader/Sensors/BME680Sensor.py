@@ -1,17 +1,113 @@
+import struct
+import time
+
 from SensorReader.Sensors.SensorInterface import Sensor 
 import adafruit_bme680
 
 BME680Address = 0x76
+HEATER_TIME_MS = 150  # the driver's set_gas_heater(320, 150) default
+
+NEW_DATA = 0x80  # MEAS_STATUS bit set once a forced measurement is done
+READ_TIMEOUT = 3.0  # s, as in the driver's _perform_reading()
 
 
 class BME680Sensor(Sensor):
-    def __init__(self, i2c):
-        self.sensor = adafruit_bme680.Adafruit_BME680_I2C(i2c, BME680Address)
+    """
+    read_data() goes through two phases: begin_read() writes the forced-mode
+    trigger and returns, finish_read() sleeps until the measurement (TPH
+    conversion + gas heater) should be done and fetches all four values with
+    one 17-byte block read. SensorScheduler runs the two phases as separate
+    steps on the bus worker and submits finish_read() once the measurement
+    time has passed, so the worker is free for other reads during the heater
+    wait. SensorManager.read_all() triggers it before the other sensors on
+    the same worker and collects it last.
+    """
+    def __init__(self, i2c, heater_time=HEATER_TIME_MS, address=BME680Address):
+        self.bus_key = i2c
+        self.address = address
+        self.sensor = adafruit_bme680.Adafruit_BME680_I2C(i2c, address)
+        self.heater_time = heater_time
+        self._ready_at = None
+        # register access needs the real driver; stand-ins use the property reads
+        self.two_phase = isinstance(self.sensor, adafruit_bme680.Adafruit_BME680)
 
     def read_data(self):
+        if self.two_phase:
+            self.begin_read()
+            return self.finish_read()
+        return self._values()
+
+    def _values(self):
         return {
             "Temperature": round(self.sensor.temperature, 2),
             "Humidity": round(self.sensor.humidity, 2),
             "Pressure": round(self.sensor.pressure, 2),
             "GasResistance": self.sensor.gas
         }
+
+    def measurement_time(self):
+        """Forced-mode duration in s (Bosch bme68x_get_meas_dur) plus the heater time."""
+        s = self.sensor
+        cycles = sum(adafruit_bme680._BME680_SAMPLERATES[os]
+                     for os in (s._temp_oversample, s._pressure_oversample, s._humidity_oversample))
+        tph_us = cycles * 1963 + 477 * 4 + 477 * 5 + 1000
+        return tph_us / 1e6 + self.heater_time / 1000
+
+    def begin_read(self):
+        """Start one forced-mode measurement and return at once; returns the measurement time in s."""
+        if not self.two_phase:
+            return None
+        s = self.sensor
+        s._write(adafruit_bme680._BME680_REG_CONFIG, [s._filter << 2])
+        s._write(adafruit_bme680._BME680_REG_CTRL_MEAS, [(s._temp_oversample << 5) | (s._pressure_oversample << 2)])
+        s._write(adafruit_bme680._BME680_REG_CTRL_HUM, [s._humidity_oversample])
+        run_gas = s._run_gas & adafruit_bme680._BME680_RUNGAS
+        s._write(adafruit_bme680._BME680_REG_CTRL_GAS, [run_gas << 1 if s._chip_variant == 0x01 else run_gas])
+        ctrl = s._read_byte(adafruit_bme680._BME680_REG_CTRL_MEAS)
+        s._write(adafruit_bme680._BME680_REG_CTRL_MEAS, [(ctrl & 0xFC) | 0x01])  # single shot
+        duration = self.measurement_time()
+        self._ready_at = time.monotonic() + duration
+        return duration
+
+    def finish_read(self):
+        """Collect the measurement started by begin_read()."""
+        if not self.two_phase:
+            return self._values()
+        if self._ready_at is None:
+            self.begin_read()
+        s = self.sensor
+        wait = self._ready_at - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        deadline = time.monotonic() + READ_TIMEOUT
+        while True:
+            data = s._read(adafruit_bme680._BME680_REG_MEAS_STATUS, 17)
+            if data[0] & NEW_DATA:
+                break
+            if time.monotonic() >= deadline:
+                raise RuntimeError("Timeout while reading sensor data")
+            time.sleep(0.005)
+        self._ready_at = None
+        self._decode(data)
+        return self._values()
+
+    def _decode(self, data):
+        """Same decoding as the driver's _perform_reading(), from one block read."""
+        s = self.sensor
+        s._adc_pres = adafruit_bme680._read24(data[2:5]) / 16
+        s._adc_temp = adafruit_bme680._read24(data[5:8]) / 16
+        s._adc_hum = struct.unpack(">H", bytes(data[8:10]))[0]
+        if s._chip_variant == 0x01:
+            s._adc_gas = int(struct.unpack(">H", bytes(data[15:17]))[0] / 64)
+            s._gas_range = data[16] & 0x0F
+        else:
+            s._adc_gas = int(struct.unpack(">H", bytes(data[13:15]))[0] / 64)
+            s._gas_range = data[14] & 0x0F
+
+        var1 = (s._adc_temp / 8) - (s._temp_calibration[0] * 2)
+        var2 = (var1 * s._temp_calibration[1]) / 2048
+        var3 = ((var1 / 2) * (var1 / 2)) / 4096
+        var3 = (var3 * s._temp_calibration[2] * 16) / 16384
+        s._t_fine = int(var2 + var3)
+        # the properties read in _values() now use this reading instead of measuring again
+        s._last_reading = time.monotonic()
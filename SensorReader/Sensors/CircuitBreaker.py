@@ -0,0 +1,58 @@
+import time
+
+# What a failing sensor read raises: bus errors (OSError), driver timeouts and
+# checks (RuntimeError, ValueError) and read deadlines (TimeoutError).
+# Anything else is a programming error and is not hidden behind a breaker.
+SENSOR_ERRORS = (OSError, RuntimeError, ValueError, TimeoutError)
+
+BACKOFF_BASE = 2.0  # seconds the breaker stays open after the first failure
+BACKOFF_MAX = 60.0
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """
+    Per-sensor circuit breaker. Every failure opens it for an exponentially
+    growing backoff (base, 2 * base, 4 * base, ... up to max_backoff); once
+    the backoff has passed one trial read is allowed (half-open). A success
+    closes it again.
+    """
+    __slots__ = ('base', 'max_backoff', 'failures', 'open_until', 'last_error', 'clock')
+
+    def __init__(self, base=BACKOFF_BASE, max_backoff=BACKOFF_MAX, clock=time.monotonic):
+        self.base = base
+        self.max_backoff = max_backoff
+        self.failures = 0  # consecutive failures
+        self.open_until = 0.0
+        self.last_error = None
+        self.clock = clock
+
+    def allow(self, now=None):
+        """True if the sensor may be read now."""
+        return (self.clock() if now is None else now) >= self.open_until
+
+    def success(self):
+        self.failures = 0
+        self.open_until = 0.0
+        self.last_error = None
+
+    def failure(self, error, now=None):
+        now = self.clock() if now is None else now
+        self.failures += 1
+        self.open_until = now + min(self.base * 2 ** (self.failures - 1), self.max_backoff)
+        self.last_error = repr(error)
+
+    def state(self, now=None):
+        if not self.failures:
+            return CLOSED
+        return HALF_OPEN if self.allow(now) else OPEN
+
+    def snapshot(self, now=None):
+        return {
+            'state': self.state(now),
+            'failures': self.failures,
+            'last_error': self.last_error,
+        }
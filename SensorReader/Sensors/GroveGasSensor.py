@@ -15,50 +15,91 @@ CHANGE_I2C_ADDR = 0x55
 WARMING_UP = 0xFE
 WARMING_DOWN = 0xFF
 
+# Channel name -> command, in read_data() order
+CHANNELS = {
+    "NO2": GM_102B,
+    "Ethanol": GM_302B,
+    "VOC": GM_502B,
+    "CO": GM_702B,
+    "0x04": GM_4,
+    "0x08": GM_8,
+}
+
+# Heater states
+COLD = "cold"
+HEATING = "heating"
+WARM = "warm"
+
+COMMAND_DELAY = 0.002  # s between selecting a channel and reading it back
+PREHEAT_DELAY = 0.1  # s after switching the heater on or off
+
+
 class GroveGasSensor(Sensor):
-    def __init__(self, i2c_bus, address=DEFAULT_I2C_ADDRESS):
+    channels = CHANNELS
+
+    def __init__(self, i2c_bus, address=DEFAULT_I2C_ADDRESS, warmup_time=0.0, command_delay=COMMAND_DELAY):
         self.bus = i2c_bus
+        self.bus_key = i2c_bus
         self.address = address
-        self.is_preheated = False
+        # heater is switched on once and tracked here instead of before every channel
+        self.heater_state = COLD
+        self.heated_since = None
+        self.warmup_time = warmup_time  # s until readings count as warm
+        self.command_delay = command_delay
+
+    @property
+    def is_preheated(self):
+        return self.heater_state != COLD
+
+    @property
+    def is_warm(self):
+        if self.heater_state == HEATING and time.monotonic() - self.heated_since >= self.warmup_time:
+            self.heater_state = WARM
+        return self.heater_state == WARM
 
     def read_data(self):
-        return {
-            "NO2": self.measure_no2(),
-            "Ethanol": self.measure_ethanol(),
-            "VOC": self.measure_voc(),
-            "CO": self.measure_co(),
-            "0x04": self.measure_4(),
-            "0x08": self.measure_8(),
-        }
-    
+        return self.read_channels(self.channels)
+
+    def read_channels(self, channels):
+        """ Read several channels in one pass: heater checked once, one command and one block read per channel. """
+        if not self.is_preheated:
+            self.preheat()
+        values = {}
+        for name, command in channels.items():
+            values[name] = self._read_channel(command)
+        return values
+
     def _write_byte(self, command):
         """ Send a single command byte over I2C. """
         #print(f"Writing command {hex(command)} to I2C address {hex(self.address)}")
         self.bus.write_byte(self.address, command)
-        time.sleep(0.01)
-    
-    def _read_4_bytes(self, command):
-        #if not self.is_preheated:
-        #    self.preheat()
-        self._write_byte(WARMING_UP)
+        time.sleep(self.command_delay)  # Allow time for sensor to respond
+
+    def _read_channel(self, command):
         self._write_byte(command)
-        time.sleep(0.05)  # Allow time for sensor to respond
         data = self.bus.read_i2c_block_data(self.address, command, 2) #library adviced 4, but when you run it with 2 it is the same actually
-        value = int.from_bytes(data, byteorder='little')
+        return int.from_bytes(data, byteorder='little')
+
+    def _read_4_bytes(self, command):
+        if not self.is_preheated:
+            self.preheat()
+        value = self._read_channel(command)
         #print(f"Read {value} from command {hex(command)}")
         return value
     
     def preheat(self):
         """ Warm up the sensor (equivalent to C++ preheated). """
         self._write_byte(WARMING_UP)
-        self.is_preheated = True
-        time.sleep(0.1)
+        self.heater_state = HEATING
+        self.heated_since = time.monotonic()
+        time.sleep(PREHEAT_DELAY)
 
     def stop_preheat(self):
         """ Stop sensor warm-up (equivalent to C++ unPreheated). """
         self._write_byte(WARMING_DOWN)
-        self.is_preheated = False
-        time.sleep(0.1)
+        self.heater_state = COLD
+        self.heated_since = None
+        time.sleep(PREHEAT_DELAY)
 
     def measure_no2(self):
         """ Measure NO2 gas concentration. """
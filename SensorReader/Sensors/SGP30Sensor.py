@@ -1,8 +1,12 @@
 from SensorReader.Sensors.SensorInterface import Sensor 
 import adafruit_sgp30
 
+SGP30Address = 0x58
+
 class SGP30Sensor(Sensor):
     def __init__(self, i2c):
+        self.bus_key = i2c
+        self.address = SGP30Address
         self.sensor = adafruit_sgp30.Adafruit_SGP30(i2c)
         self.sensor.iaq_init()
         self.sensor.set_iaq_baseline(0x84D0, 0x86C4)
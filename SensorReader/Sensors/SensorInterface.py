@@ -5,14 +5,56 @@ from SensorReader.aspects.LoggingAspect import LoggingAspect
 class Sensor(ABC):
     logger = LoggingAspect()
 
+    # Bus the sensor talks to and its address there; sensors on different buses can be read concurrently
+    bus_key = None
+    address = None
+    # Name in frames and configuration; None means the class name (see sensor_key)
+    key = None
+    # True to read every device on bus_key on one worker, for buses that cannot
+    # take transfers to two devices at once (see SensorInventory "serial")
+    serial_bus = False
+    # True for sensors that can start a measurement (begin_read) and collect it later (finish_read)
+    two_phase = False
+
     @abstractmethod
     def read_data(self) -> dict:
         pass
 
+    def begin_read(self) -> float | None:
+        """
+        Start a measurement without waiting for it; two-phase sensors override
+        this. Returns the seconds until finish_read() can collect it without
+        waiting, or None.
+        """
+
+    def finish_read(self) -> dict:
+        """Collect the measurement started by begin_read()."""
+        return self.read_data()
+
+    @property
+    def device_key(self):
+        """(bus, address) of the device, or None if the sensor must be read on the caller thread."""
+        if self.bus_key is None:
+            return None
+        return (self.bus_key, self.address)
+
+    @property
+    def worker_key(self):
+        """SensorManager worker the sensor is read on: one per device, or one per bus if serial_bus."""
+        if self.bus_key is None:
+            return None
+        return (self.bus_key, None) if self.serial_bus else self.device_key
+
     # Applies Logging aspect to every read_data method implemented by all subclasses of Sensor interface
     def __init_subclass__(cls):
         super().__init_subclass__()
         if 'read_data' in cls.__dict__:
             original_method = cls.__dict__['read_data']
             wrapped_method = Sensor.logger.log_method(original_method)
-            setattr(cls, 'read_data', wrapped_method)
\ No newline at end of file
+            setattr(cls, 'read_data', wrapped_method)
+
+
+def sensor_key(sensor):
+    """Name of the sensor in frames and configuration: its inventory key, else its class name."""
+    key = sensor.key if isinstance(sensor, Sensor) else None
+    return key or sensor.__class__.__name__
@@ -0,0 +1,114 @@
+from SensorReader.Sensors.BME680Sensor import BME680Sensor, BME680Address
+from SensorReader.Sensors.GroveGasSensor import GroveGasSensor, DEFAULT_I2C_ADDRESS
+from SensorReader.Sensors.SGP30Sensor import SGP30Sensor, SGP30Address
+
+# Inventory type -> sensor class, the bus handle its driver takes and the addresses
+# it can be set to (the first one is the default)
+SENSOR_TYPES = {
+    # Adafruit CircuitPython drivers take a busio-style I2C object
+    "BME680": {"cls": BME680Sensor, "handle": "i2c", "addresses": (BME680Address, 0x77)},
+    "SGP30": {"cls": SGP30Sensor, "handle": "i2c", "addresses": (SGP30Address,)},
+    # Grove multichannel boards are moved off 0x08 once with GroveGasSensor.change_address()
+    "Grove": {"cls": GroveGasSensor, "handle": "smbus", "addresses": (DEFAULT_I2C_ADDRESS, *range(0x09, 0x80))},
+}
+
+
+class SensorInventory:
+    """
+    Builds the sensors of one reader from a declarative description:
+
+        {
+            "buses": {"main": 1, "array": {"number": 3, "serial": True}},  # name -> Linux I2C bus number
+            "sensors": [
+                {"type": "BME680", "bus": "main"},
+                {"type": "Grove", "bus": "main"},
+                {"type": "Grove", "bus": "array", "address": 0x09, "key": "GroveArray"},
+                {"type": "Grove", "bus": "array", "address": 0x0A, "options": {"warmup_time": 60}},
+            ],
+        }
+
+    Every sensor gets a unique key, used for it in frames and in rate, filter
+    and deadband configuration: "key" if given, the class name for the only
+    sensor of a type, otherwise "<Class>_<bus>_<address>". Sensors on the
+    same bus share its bus_key. SensorManager reads every device on its own
+    worker; on a bus declared "serial" (hardware that cannot take transfers
+    to two devices at once) all devices share one worker.
+
+    Buses are opened on first use with open_i2c(number) for the Adafruit
+    drivers and open_smbus(number) for the SMBus ones.
+    """
+    def __init__(self, spec, open_i2c, open_smbus):
+        self.buses = {}  # name -> bus number
+        self.serial_buses = set()
+        for name, bus in spec.get("buses", {}).items():
+            if isinstance(bus, dict):
+                if bus.get("serial"):
+                    self.serial_buses.add(name)
+                bus = bus["number"]
+            self.buses[name] = bus
+        self.entries = list(spec.get("sensors", []))
+        self.open_i2c = open_i2c
+        self.open_smbus = open_smbus
+        self._handles = {}  # (bus name, handle kind) -> opened bus
+        self._validate()
+
+    def _validate(self):
+        types = {}
+        for entry in self.entries:
+            kind = SENSOR_TYPES.get(entry.get("type"))
+            if kind is None:
+                raise ValueError(f"Unknown sensor type: {entry.get('type')}")
+            if entry.get("bus") not in self.buses:
+                raise ValueError(f"Unknown bus for {entry['type']}: {entry.get('bus')}")
+            if entry.get("address", kind["addresses"][0]) not in kind["addresses"]:
+                raise ValueError(f"Invalid address for {entry['type']}: {entry['address']:#04x}")
+            types[entry["type"]] = types.get(entry["type"], 0) + 1
+
+        keys = set()
+        devices = set()
+        self.keys = []
+        for entry in self.entries:
+            kind = SENSOR_TYPES[entry["type"]]
+            address = entry.get("address", kind["addresses"][0])
+            key = entry.get("key")
+            if key is None:
+                key = kind["cls"].__name__
+                if types[entry["type"]] > 1:
+                    key = f"{key}_{entry['bus']}_{address:#04x}"
+            if key in keys:
+                raise ValueError(f"Duplicate sensor key: {key}")
+            if (entry["bus"], address) in devices:
+                raise ValueError(f"Two sensors at {address:#04x} on bus {entry['bus']}")
+            keys.add(key)
+            devices.add((entry["bus"], address))
+            self.keys.append(key)
+
+    def _handle(self, bus, kind):
+        handle = self._handles.get((bus, kind))
+        if handle is None:
+            opener = self.open_i2c if kind == "i2c" else self.open_smbus
+            handle = self._handles[(bus, kind)] = opener(self.buses[bus])
+        return handle
+
+    def build(self):
+        """The configured sensors, in inventory order."""
+        sensors = []
+        for entry, key in zip(self.entries, self.keys):
+            kind = SENSOR_TYPES[entry["type"]]
+            options = dict(entry.get("options", {}))
+            address = entry.get("address", kind["addresses"][0])
+            if address != kind["addresses"][0]:
+                options["address"] = address
+            sensor = kind["cls"](self._handle(entry["bus"], kind["handle"]), **options)
+            sensor.key = key
+            sensor.bus_key = entry["bus"]
+            sensor.serial_bus = entry["bus"] in self.serial_buses
+            sensors.append(sensor)
+        return sensors
+
+    def close(self):
+        """Close the SMBus handles opened by build()."""
+        for (bus, kind), handle in self._handles.items():
+            if kind == "smbus" and hasattr(handle, "close"):
+                handle.close()
+        self._handles.clear()
@@ -1,14 +1,209 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError  # not the builtin TimeoutError before 3.11
 from SensorReader.aspects.LoggingAspect import LoggingAspect
+from SensorReader.Sensors.CircuitBreaker import BACKOFF_BASE, BACKOFF_MAX, SENSOR_ERRORS, CircuitBreaker
+from SensorReader.Sensors.SensorInterface import Sensor, sensor_key
+
+READ_DEADLINE = 1.0  # seconds a cycle waits for a worker
 
 
 class SensorManager:
-    def __init__(self, sensors):
+    """
+    Reads all sensors into one frame, keyed by sensor_key(). Sensors that
+    report a device_key are grouped by worker_key, one worker thread per
+    device (the kernel serialises the single transfers on a bus) or per bus
+    for serial buses, so a cycle takes about as long as the slowest device
+    instead of the sum. Sensors without a device_key are read in order on
+    the caller thread.
+
+    Every worker's read has a deadline (seconds from the start of the cycle,
+    per sensor name in deadlines, else deadline); read_all() never waits
+    longer. A read that fails or times out opens the sensor's CircuitBreaker
+    and the sensor is skipped with exponential backoff. Its entry in the
+    frame holds the last good values (listed in last_stale) or None if there
+    were none (last_missing). Only the sensor whose read was running at the
+    deadline counts a timeout; sensors queued behind it on the same worker
+    are skipped for that frame (held or missing as well) without a breaker
+    failure. Deadlines cannot interrupt sensors read on the caller thread.
+    """
+    def __init__(self, sensors, deadline=READ_DEADLINE, deadlines=None, backoff=BACKOFF_BASE,
+                 max_backoff=BACKOFF_MAX, clock=time.monotonic):
         self.sensors = sensors
+        self.deadline = deadline
+        self.deadlines = deadlines or {}
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self.breakers = {}  # sensor -> CircuitBreaker
+        self._workers = {}  # worker_key -> single-thread executor
+        self._running = {}  # worker_key -> future of the last read submitted to it
+        self._last_good = {}  # sensor -> last values read without error
+        self.last_missing = []  # sensors without values in the last frame
+        self.last_stale = []  # sensors whose values in the last frame are held from an earlier read
+        self.last_timestamp = None  # time.time() at the start of the last cycle
+        self.last_timings = {}  # sensor name -> seconds spent in read_data()
+        self.last_cycle = None  # seconds for the whole last cycle
+
+    @staticmethod
+    def _worker_of(sensor):
+        return sensor.worker_key if isinstance(sensor, Sensor) else None
+
+    def _groups(self):
+        groups = {}
+        local = []
+        for sensor in self.sensors:
+            key = self._worker_of(sensor)
+            if key is None:
+                local.append(sensor)
+            else:
+                groups.setdefault(key, []).append(sensor)
+        return groups, local
+
+    def _worker(self, key):
+        worker = self._workers.get(key)
+        if worker is None:
+            worker = self._workers[key] = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sensor-bus')
+        return worker
+
+    def submit(self, sensor, fn, *args):
+        """Run fn on the sensor's worker; inline for sensors without a device_key."""
+        key = self._worker_of(sensor)
+        if key is not None:
+            return self._worker(key).submit(fn, *args)
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    @staticmethod
+    def _timed(fn, start=None):
+        # a failed read comes back as its exception instead of a value
+        start = time.perf_counter() if start is None else start
+        try:
+            data = fn()
+        except SENSOR_ERRORS as e:
+            data = e
+        return data, time.perf_counter() - start
+
+    @staticmethod
+    def _read_group(sensors, progress=None):
+        # two-phase sensors (BME680) are triggered first and collected last, so their
+        # measurement time overlaps with the other reads on the same worker.
+        # progress["current"] is the sensor being read, progress["done"] the readings so far
+        progress = {} if progress is None else progress
+        readings = progress.setdefault("done", {})
+
+        def run(sensor, fn, start=None):
+            progress["current"] = sensor
+            return SensorManager._timed(fn, start)
+
+        started = {}
+        for sensor in sensors:
+            if getattr(sensor, 'two_phase', False) is True:
+                start = time.perf_counter()
+                error, elapsed = run(sensor, sensor.begin_read, start)
+                if isinstance(error, BaseException):
+                    readings[sensor] = (error, elapsed)
+                else:
+                    started[sensor] = start
+        for sensor in sensors:
+            if sensor not in started and sensor not in readings:
+                readings[sensor] = run(sensor, sensor.read_data)
+        for sensor, start in started.items():
+            readings[sensor] = run(sensor, sensor.finish_read, start)
+        progress["current"] = None
+        return [(sensor, *readings[sensor]) for sensor in sensors]
+
+    def breaker(self, sensor):
+        breaker = self.breakers.get(sensor)
+        if breaker is None:
+            breaker = self.breakers[sensor] = CircuitBreaker(self.backoff, self.max_backoff, self.clock)
+        return breaker
+
+    def deadline_for(self, sensor):
+        return self.deadlines.get(sensor_key(sensor), self.deadline)
+
+    def _allowed(self, sensors, now, skipped):
+        allowed = []
+        for sensor in sensors:
+            (allowed if self.breaker(sensor).allow(now) else skipped).append(sensor)
+        return allowed
 
     @LoggingAspect.log_method
     def read_all(self):
+        self.last_timestamp = time.time()
+        cycle_start = time.perf_counter()
+        now = self.clock()
+        groups, local = self._groups()
+
+        skipped = []
+        futures = []
+        for key, sensors in groups.items():
+            running = self._running.get(key)
+            if running is not None and not running.done():
+                # the worker is still stuck in an earlier read: don't queue behind it
+                skipped.extend(sensors)
+                continue
+            sensors = self._allowed(sensors, now, skipped)
+            if sensors:
+                progress = {}
+                future = self._running[key] = self._worker(key).submit(self._read_group, sensors, progress)
+                futures.append((sensors, future, progress))
+
+        results = {}
+        for sensor, data, elapsed in self._read_group(self._allowed(local, now, skipped)):
+            results[sensor] = (data, elapsed)
+        for sensors, future, progress in futures:
+            deadline = max(self.deadline_for(sensor) for sensor in sensors)
+            try:
+                readings = future.result(timeout=max(deadline - (time.perf_counter() - cycle_start), 0.0))
+            except (TimeoutError, FutureTimeoutError):
+                # the worker keeps running; its late result is dropped. The sensor it is stuck
+                # in times out, the ones queued behind it are skipped like an open breaker
+                done = dict(progress.get("done", {}))
+                readings = [(sensor, *done[sensor]) for sensor in sensors if sensor in done]
+                current = progress.get("current")
+                if current is not None and current not in done:
+                    readings.append((current, TimeoutError(f"read exceeded its {deadline}s deadline"), deadline))
+            for sensor, data, elapsed in readings:
+                results[sensor] = (data, elapsed)
+
+        # frame keeps the configured sensor order
+        now = self.clock()
         data = {}
+        timings = {}
+        missing = []
+        stale = []
         for sensor in self.sensors:
-            sensor_name = sensor.__class__.__name__
-            data[sensor_name] = sensor.read_data()
+            sensor_name = sensor_key(sensor)
+            value, timings[sensor_name] = results.get(sensor, (None, None))
+            if sensor in results and not isinstance(value, BaseException):
+                self.breaker(sensor).success()
+                self._last_good[sensor] = value
+            else:
+                if isinstance(value, BaseException):
+                    self.breaker(sensor).failure(value, now)
+                    print(f"[SensorManager] {sensor_name} read failed: {value!r}")
+                # failed or skipped while its breaker is open: hold the last good values
+                value = self._last_good.get(sensor)
+                (missing if value is None else stale).append(sensor_name)
+            data[sensor_name] = value
+        self.last_timings = timings
+        self.last_missing = missing
+        self.last_stale = stale
+        self.last_cycle = time.perf_counter() - cycle_start
         return data
+
+    def health(self):
+        """sensor name -> breaker state, consecutive failures and the last error."""
+        now = self.clock()
+        return {sensor_key(sensor): self.breaker(sensor).snapshot(now) for sensor in self.sensors}
+
+    def close(self):
+        """Stop the bus worker threads."""
+        for worker in self._workers.values():
+            worker.shutdown(wait=False)
+        self._workers.clear()
@@ -0,0 +1,414 @@
+import bisect
+import time
+from collections import deque
+
+import numpy as np
+
+from SensorReader.Sensors.CircuitBreaker import SENSOR_ERRORS
+from SensorReader.Sensors.SensorInterface import sensor_key
+from SensorReader.Sensors.StreamFilters import make_filter
+
+# How a frame fills in a channel that was not sampled exactly at the frame time
+HOLD = "hold"  # last sample at or before the frame time
+LINEAR = "linear"  # interpolate between the samples around the frame time
+
+
+class SampleTask:
+    """One sensor, or a subset of its channels, sampled at a fixed period."""
+    __slots__ = ('sensor', 'name', 'channels', 'period', 'next_due', 'pending', 'started', 'running_since',
+                 'timed_out', 'waiting', 'sampled', 'overruns', 'two_phase', 'collect_at', 'sample_time', 'busy')
+
+    def __init__(self, sensor, channels, period, start):
+        self.sensor = sensor
+        self.name = sensor_key(sensor)
+        self.channels = channels  # {channel: command} for read_channels(), None for read_data()
+        self.period = period
+        self.next_due = start
+        self.pending = None
+        self.started = None  # clock time the pending read was submitted
+        self.running_since = None  # clock time the worker started it (None while queued)
+        self.timed_out = False  # the pending read has passed its deadline
+        self.waiting = False  # still queued behind another read on the worker at the deadline
+        self.sampled = False  # a read has completed, failed or timed out
+        self.overruns = 0  # periods skipped because the previous read was still running
+        # begin_read() and finish_read() run as separate steps, collect_at apart
+        self.two_phase = channels is None and getattr(sensor, 'two_phase', False) is True
+        self.collect_at = None  # clock time to submit finish_read(), while a measurement runs
+        self.sample_time = None  # middle of the running measurement
+        self.busy = 0.0  # s the worker spent on the current read (both steps of a two-phase one)
+
+
+class SensorScheduler:
+    """
+    Samples every sensor (or channel) at its own rate and emits frames on a
+    common time grid of frame_period seconds.
+
+    rates maps "SensorName" or "SensorName.Channel" to a rate in Hz; channel
+    rates need a sensor with channels/read_channels() (GroveGasSensor).
+    Sensors without a rate are sampled once per frame. Reads run on the
+    SensorManager's bus workers, so a slow bus never delays a fast one.
+
+    A frame for grid time t is built once t + align_delay has passed. With
+    LINEAR the delay defaults to the slowest sample period, so the sample
+    after t is usually there to interpolate against; otherwise the value is held.
+
+    filters maps "SensorName" to a StreamFilters spec, e.g.
+    {"kind": "median", "window": 5}. Every sample of that sensor goes
+    through the filter (all channels at once) and frames are built from the
+    filtered series; oversample with a rate above 1 / frame_period. With
+    raw_every=n, every n-th frame also carries the unfiltered values under "raw".
+
+    sensors (names) and channels ({"SensorName": [channel, ...]}) restrict
+    what is read; by default every channel of every sensor. Two-phase
+    sensors (BME680) are triggered with begin_read() on their bus worker and
+    collected with finish_read() in a second step once their measurement
+    time has passed, so the worker serves other reads meanwhile.
+    reconfigure()
+    changes them, the rates and the frame period between frames.
+
+    Reads use the manager's deadlines and circuit breakers: a read that
+    fails or passes its deadline opens the sensor's breaker, and while it is
+    open the sensor is not sampled. Frames keep going on time with the held
+    values of that sensor (listed in last_stale) or None for it if it never
+    delivered (last_missing). last_timings holds the seconds each sensor's
+    latest read kept its worker busy (without a two-phase sensor's wait);
+    take_timings() drains every read's duration since the last call.
+    The deadline runs from when the worker starts
+    the read: a sensor queued behind a hung read on the same worker is held
+    or missing as well, but without a breaker failure.
+    """
+    def __init__(self, manager, rates=None, frame_period=2.0, mode=HOLD, align_delay=None, history=16,
+                 filters=None, raw_every=None, sensors=None, channels=None,
+                 clock=time.monotonic, sleep=time.sleep):
+        if mode not in (HOLD, LINEAR):
+            raise ValueError(f"Unknown fill mode: {mode}")
+        self.manager = manager
+        self.frame_period = frame_period
+        self.mode = mode
+        self.clock = clock
+        self.sleep = sleep
+
+        self.origin = clock()
+        self.tasks = self._build_tasks(rates or {}, sensors, channels or {}, self.origin)
+        self._retired = []  # tasks dropped by reconfigure() whose read is still running
+        self._auto_align = align_delay is None
+        self._set_align_delay(align_delay)
+
+        # sensor name -> channel -> recent (time, value) samples
+        self.samples = {}
+        self.history = history
+        self._track_samples()
+        self.filter_specs = filters or {}
+        self._filters = {}  # (sensor name, channels) -> StreamFilter, created on the first sample
+        self.raw_every = raw_every
+        self.raw = {}  # sensor name -> latest unfiltered values
+        self.frame_index = 0
+        self.emitted = 0
+        self.last_frame_mono = None  # grid time (clock) of the last emitted frame
+        self.last_frame_time = None  # the same instant as time.time()
+        self.last_missing = []
+        self.last_stale = []
+        self.last_timings = {}  # sensor name -> worker seconds of its latest read
+        self._timings = deque(maxlen=1024)  # (sensor name, seconds) of the reads since take_timings()
+
+    @staticmethod
+    def _channels_of(sensor):
+        """{channel: command} for sensors that can read a subset of channels, else {}."""
+        channels = getattr(sensor, 'channels', None)
+        if isinstance(channels, dict) and hasattr(sensor, 'read_channels'):
+            return channels
+        return {}
+
+    def _set_align_delay(self, align_delay=None):
+        if self._auto_align:
+            slowest = max((task.period for task in self.tasks), default=0.0)
+            align_delay = slowest if self.mode == LINEAR else 0.0
+        self.align_delay = align_delay
+
+    def _track_samples(self):
+        # keep the histories of the channels still read, drop the others
+        kept = {}
+        for task in self.tasks:
+            old = self.samples.get(task.name, {})
+            channels = kept.setdefault(task.name, {})
+            if task.channels is None:
+                channels.update(old)  # every channel, including ones only seen in samples
+            for channel in task.channels or self._channels_of(task.sensor):
+                channels.setdefault(channel, old.get(channel) or deque(maxlen=self.history))
+        self.samples = kept
+
+    def reconfigure(self, rates=None, sensors=None, channels=None, frame_period=None, filters=None):
+        """
+        Switch to other rates, sensors, channels, frame period or filters
+        between two frames. Tasks that stay keep their running read and are
+        rescheduled to the new period; sample histories and filter state of
+        the channels still read are kept, and the grid continues one new
+        frame_period after the last frame, so the next frame is not delayed.
+        """
+        now = self.clock()
+        old_period = self.frame_period
+        if frame_period is not None:
+            self.frame_period = frame_period
+        previous = {(task.name, None if task.channels is None else tuple(task.channels)): task
+                    for task in self.tasks}
+        tasks = []
+        for task in self._build_tasks(rates or {}, sensors, channels or {}, now):
+            key = (task.name, None if task.channels is None else tuple(task.channels))
+            kept = previous.pop(key, None)
+            if kept is not None:
+                kept.period = task.period
+                kept.next_due = min(kept.next_due, now + task.period)
+                task = kept
+            tasks.append(task)
+        self._retired.extend(task for task in previous.values() if task.pending is not None)
+        self.tasks = tasks
+        self._set_align_delay(self.align_delay)
+        self._track_samples()
+        self.raw = {name: values for name, values in self.raw.items() if name in self.samples}
+
+        if filters is not None:
+            changed = {name for name in set(filters) | set(self.filter_specs)
+                       if filters.get(name) != self.filter_specs.get(name)}
+            self._filters = {key: stream for key, stream in self._filters.items() if key[0] not in changed}
+            self.filter_specs = filters
+
+        # the next frame: one new period after the last one, or the latest grid point already past
+        if self.last_frame_mono is None:
+            start = self.origin + self.frame_index * old_period
+        else:
+            start = self.last_frame_mono + self.frame_period
+            if start < now:
+                start += (now - start) // self.frame_period * self.frame_period
+        self.origin = start
+        self.frame_index = 0
+
+    def _build_tasks(self, rates, sensors, selected, start):
+        tasks = []
+        for sensor in self.manager.sensors:
+            name = sensor_key(sensor)
+            if sensors is not None and name not in sensors:
+                continue
+            sensor_period = 1 / rates[name] if name in rates else self.frame_period
+            channels = self._channels_of(sensor)
+            if name in selected:
+                channels = {channel: command for channel, command in channels.items() if channel in selected[name]}
+                if not channels:
+                    continue
+            by_period = {}
+            for channel, command in channels.items():
+                rate = rates.get(f"{name}.{channel}")
+                period = 1 / rate if rate else sensor_period
+                by_period.setdefault(period, {})[channel] = command
+            if len(by_period) > 1 or (by_period and len(channels) < len(self._channels_of(sensor))):
+                for period, subset in by_period.items():
+                    tasks.append(SampleTask(sensor, subset, period, start))
+            else:
+                tasks.append(SampleTask(sensor, None, sensor_period, start))
+        return tasks
+
+    def _begin(self, task):
+        start = task.running_since = self.clock()
+        started = time.perf_counter()
+        try:
+            return start, task.sensor.begin_read() or 0.0
+        finally:
+            task.busy = time.perf_counter() - started
+
+    def _finish(self, task):
+        task.running_since = self.clock()
+        started = time.perf_counter()
+        try:
+            return task.sample_time, task.sensor.finish_read()
+        finally:
+            task.busy += time.perf_counter() - started
+
+    def _sample(self, task):
+        start = task.running_since = self.clock()
+        started = time.perf_counter()
+        try:
+            if task.channels is None:
+                values = task.sensor.read_data()
+            else:
+                values = task.sensor.read_channels(task.channels)
+        finally:
+            task.busy = time.perf_counter() - started
+        return (start + self.clock()) / 2, values
+
+    def take_timings(self):
+        """(sensor name, seconds) of every read completed since the last call."""
+        timings = list(self._timings)
+        self._timings.clear()
+        return timings
+
+    def _filtered(self, task, values):
+        spec = self.filter_specs.get(task.name)
+        if spec is None:
+            return values
+        self.raw.setdefault(task.name, {}).update(values)
+        names = list(values)
+        try:
+            row = np.array([values[name] for name in names], dtype=float)
+        except (TypeError, ValueError):
+            return values  # a channel without a numeric value: pass the sample through
+        key = (task.name, tuple(names))
+        stream = self._filters.get(key)
+        if stream is None:
+            stream = self._filters[key] = make_filter(spec, len(names))
+        return dict(zip(names, stream.update(row).tolist()))
+
+    def _store(self, task, t, values):
+        task.sampled = True
+        if not isinstance(values, dict):
+            return
+        channels = self.samples.get(task.name)
+        if channels is None:
+            return  # a read started before reconfigure() dropped the sensor
+        if task in self._retired:
+            values = {channel: value for channel, value in values.items() if channel in channels}
+        values = self._filtered(task, values)
+        for channel, value in values.items():
+            history = channels.get(channel)
+            if history is None:
+                history = channels[channel] = deque(maxlen=self.history)
+            history.append((t, value))
+
+    def _collect(self, task, now):
+        future, task.pending = task.pending, None
+        breaker = self.manager.breaker(task.sensor)
+        try:
+            t, values = future.result()
+        except SENSOR_ERRORS as e:
+            task.sampled = True
+            self._timed(task)
+            if not task.timed_out:
+                breaker.failure(e, now)
+                print(f"[SensorScheduler] {task.name} read failed: {e!r}")
+        else:
+            if task.two_phase and task.sample_time is None:
+                # measurement started: collect it once it is done, on a free worker
+                task.collect_at = t + values
+                task.sample_time = t + values / 2
+            else:
+                # a late read still counts: its sample carries the time it was taken
+                breaker.success()
+                self._store(task, t, values)
+                self._timed(task)
+                task.sample_time = None
+        if task.collect_at is None:
+            task.sample_time = None  # a failed step starts over with begin_read()
+        task.timed_out = task.waiting = False
+        task.running_since = None
+
+    def _timed(self, task):
+        self.last_timings[task.name] = task.busy
+        self._timings.append((task.name, task.busy))
+
+    def poll(self, now):
+        """Collect finished reads and start the ones that are due."""
+        for task in [task for task in self._retired if task.pending.done()]:
+            self._collect(task, now)
+            self._retired.remove(task)
+        for task in self.tasks:
+            if task.pending is not None:
+                if not task.pending.done():
+                    deadline = self.manager.deadline_for(task.sensor)
+                    running_since = task.running_since
+                    if running_since is not None:
+                        if not task.timed_out and now - running_since > deadline:
+                            task.timed_out = task.sampled = True
+                            self.manager.breaker(task.sensor).failure(TimeoutError("read exceeded its deadline"), now)
+                    elif not task.waiting and now - task.started > deadline:
+                        # queued behind a read that hangs on the same worker: not this sensor's fault
+                        task.waiting = task.sampled = True
+                    continue
+                self._collect(task, now)
+            if task.collect_at is not None:
+                if now >= task.collect_at:
+                    task.collect_at = None
+                    self._submit(task, now, self._finish)
+                continue
+            if now >= task.next_due:
+                if not self.manager.breaker(task.sensor).allow(now):
+                    # backing off: skip this period
+                    task.next_due += task.period * (int((now - task.next_due) // task.period) + 1)
+                    continue
+                self._submit(task, now, self._begin if task.two_phase else self._sample)
+                task.next_due += task.period
+                if task.next_due <= now:
+                    # fell behind: stay on this task's grid, skipping missed periods
+                    skipped = int((now - task.next_due) // task.period) + 1
+                    task.overruns += skipped
+                    task.next_due += skipped * task.period
+
+    def _submit(self, task, now, step):
+        task.started = now
+        task.pending = self.manager.submit(task.sensor, step, task)
+        if task.pending.done():
+            self._collect(task, now)
+
+    def _value_at(self, history, t):
+        times = [sample[0] for sample in history]
+        i = bisect.bisect_right(times, t)
+        if i == 0:
+            return None
+        t0, v0 = history[i - 1]
+        if self.mode == LINEAR and i < len(history):
+            t1, v1 = history[i]
+            if isinstance(v0, (int, float)) and isinstance(v1, (int, float)) and t1 > t0:
+                return v0 + (v1 - v0) * (t - t0) / (t1 - t0)
+        return v0
+
+    def _failing(self, name):
+        return any(task.waiting or self.manager.breaker(task.sensor).failures
+                   for task in self.tasks if task.name == name)
+
+    def _frame_at(self, t):
+        frame = {}
+        missing = []
+        stale = []
+        for name, channels in self.samples.items():
+            failing = self._failing(name)
+            values = {}
+            for channel, history in channels.items():
+                value = self._value_at(history, t)
+                if value is None:
+                    if failing and not history:
+                        continue
+                    if not self.emitted or not history:
+                        return None
+                    value = history[0][1]  # older samples already dropped: use the oldest kept
+                values[channel] = value
+            if failing:
+                (stale if values else missing).append(name)
+            frame[name] = values if values or not failing else None
+        self.last_missing = missing
+        self.last_stale = stale
+        return frame
+
+    def next_frame(self):
+        """Block until the next grid frame is ready and return it."""
+        while True:
+            now = self.clock()
+            self.poll(now)
+            frame_time = self.origin + self.frame_index * self.frame_period
+            ready_at = frame_time + self.align_delay
+            if now >= ready_at and all(task.sampled for task in self.tasks):
+                self.frame_index += 1
+                frame = self._frame_at(frame_time)
+                if frame is None:
+                    # some channel has no sample yet this early: start the grid at a later frame
+                    continue
+                self.emitted += 1
+                if self.raw_every and self.raw and self.emitted % self.raw_every == 0:
+                    frame["raw"] = {name: dict(values) for name, values in self.raw.items()}
+                self.last_frame_mono = frame_time
+                self.last_frame_time = time.time() - (now - frame_time)
+                return frame
+            wake = [ready_at] if ready_at > now else []
+            for task in self.tasks:
+                # a running read is polled for, an idle task wakes us when due
+                if task.pending is None:
+                    wake.append(task.next_due if task.collect_at is None else task.collect_at)
+                elif not task.timed_out:
+                    wake.append(now + 0.001)
+            self.sleep(max(min(wake, default=now + 0.001) - now, 0.0))
@@ -0,0 +1,106 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Last `size` samples of n channels in a preallocated array. Every row is
+    stored twice (at i and i + size), so the window is always one contiguous
+    view and push() never allocates.
+    """
+    def __init__(self, size: int, n_channels: int):
+        self.size = size
+        self._data = np.zeros((2 * size, n_channels))
+        self._next = 0
+        self.count = 0
+
+    def push(self, row) -> None:
+        i = self._next
+        self._data[i] = row
+        self._data[i + self.size] = row
+        self._next = (i + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+
+    def window(self) -> np.ndarray:
+        """Oldest-to-newest samples, shape (count, n_channels); a view, not a copy."""
+        end = self._next + self.size
+        return self._data[end - self.count:end]
+
+
+class StreamFilter(ABC):
+    """Causal filter over all channels of one sensor; update() takes and returns one row."""
+
+    def __init__(self, n_channels: int):
+        self.n_channels = n_channels
+
+    @abstractmethod
+    def update(self, row: np.ndarray) -> np.ndarray:
+        ...
+
+
+class MedianFilter(StreamFilter):
+    def __init__(self, n_channels: int, window: int = 5):
+        super().__init__(n_channels)
+        self.buffer = RingBuffer(window, n_channels)
+
+    def update(self, row: np.ndarray) -> np.ndarray:
+        self.buffer.push(row)
+        return np.median(self.buffer.window(), axis=0)
+
+
+class EmaFilter(StreamFilter):
+    def __init__(self, n_channels: int, alpha: float = 0.3):
+        super().__init__(n_channels)
+        self.alpha = alpha
+        self.state = None
+
+    def update(self, row: np.ndarray) -> np.ndarray:
+        if self.state is None:
+            self.state = np.array(row, dtype=float)
+        else:
+            self.state += self.alpha * (row - self.state)
+        return self.state.copy()
+
+
+class SavitzkyGolayFilter(StreamFilter):
+    """
+    Least-squares polynomial fit over the window, evaluated at the newest
+    sample. The fit reduces to one dot product with precomputed weights;
+    while the window fills up, weights for the shorter window are used.
+    """
+    def __init__(self, n_channels: int, window: int = 9, order: int = 2):
+        super().__init__(n_channels)
+        self.buffer = RingBuffer(window, n_channels)
+        self.order = order
+        self._weights = {}  # filled samples -> weights
+
+    def weights(self, count: int) -> np.ndarray:
+        weights = self._weights.get(count)
+        if weights is None:
+            x = np.arange(1 - count, 1, dtype=float)
+            vander = np.vander(x, min(self.order, count - 1) + 1, increasing=True)
+            # row 0 of the pseudo-inverse gives the fitted constant term, i.e. the value at x = 0
+            weights = self._weights[count] = np.linalg.pinv(vander)[0]
+        return weights
+
+    def update(self, row: np.ndarray) -> np.ndarray:
+        self.buffer.push(row)
+        return self.weights(self.buffer.count) @ self.buffer.window()
+
+
+FILTERS = {
+    "median": MedianFilter,
+    "ema": EmaFilter,
+    "savgol": SavitzkyGolayFilter,
+}
+
+
+def make_filter(spec: dict, n_channels: int) -> StreamFilter:
+    """spec: {"kind": "median" | "ema" | "savgol", **filter options}"""
+    options = dict(spec)
+    kind = options.pop("kind")
+    if kind not in FILTERS:
+        raise ValueError(f"Unknown filter: {kind}")
+    return FILTERS[kind](n_channels, **options)
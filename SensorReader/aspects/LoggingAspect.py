@@ -1,13 +1,23 @@
+from DataCommunicator.source.Instrumentation import instrumentation
+
+
+def _class_name(args):
+    return args[0].__class__.__name__ if (args and args[0]) else 'UnknownClass'
+
+
 class LoggingAspect:
     @staticmethod
     def log_method(func):
-        def wrapper(*args, **kwargs):
+        """
+        Counts calls and latency of func in the shared Instrumentation; at
+        TRACE level it also prints the before/after lines.
+        """
+        def before(args, kwargs):
             # [LOG] Before calling {className}.{methodName}()
-            print(f"[LOG] Before calling {(args[0].__class__.__name__ if (args and args[0]) else 'UnknownClass')}.{func.__name__}()")
-            try:
-                result = func(*args, **kwargs)
-            finally:
-                # [LOG] After calling {className}.{methodName}()
-                print(f"[LOG] After calling {(args[0].__class__.__name__ if (args and args[0]) else 'UnknownClass')}.{func.__name__}()")
-            return result
-        return wrapper
+            print(f"[LOG] Before calling {_class_name(args)}.{func.__name__}()")
+
+        def after(args, result, error):
+            # [LOG] After calling {className}.{methodName}()
+            print(f"[LOG] After calling {_class_name(args)}.{func.__name__}()")
+
+        return instrumentation.instrument(on_enter=before, on_exit=after)(func)
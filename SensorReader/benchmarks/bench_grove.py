@@ -0,0 +1,82 @@
+"""
+GroveGasSensor read path benchmark against a timing-accurate fake SMBus.
+
+Every I2C transaction costs its wire time at 100 kHz (9 bits per byte plus
+start/stop) and blocks like the real bus does. Compares the old per-channel
+path (heater command, channel command and a 50 ms wait for every channel)
+with the preheat-once batched read_data().
+
+Run from the project root:
+    python -m SensorReader.benchmarks.bench_grove
+"""
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, '..', '..', '..')))
+
+from SensorReader.Sensors.GroveGasSensor import CHANNELS, GroveGasSensor, WARMING_UP
+
+BUS_HZ = 100_000
+FRAMES = 5
+
+
+class TimedSMBus:
+    """SMBus stand-in that sleeps for the wire time of each transaction and counts them."""
+
+    def __init__(self, hz: int = BUS_HZ):
+        self.bit_time = 1 / hz
+        self.transactions = 0
+
+    def _transfer(self, nbytes: int) -> None:
+        self.transactions += 1
+        time.sleep((2 + 9 * nbytes) * self.bit_time)
+
+    def write_byte(self, address, value):
+        self._transfer(2)  # address + command
+
+    def read_i2c_block_data(self, address, register, length):
+        self._transfer(3 + length)  # address/register write, repeated start, address, data
+        return [0x34, 0x12][:length] + [0] * max(0, length - 2)
+
+    def close(self):
+        pass
+
+
+def legacy_read_data(sensor: GroveGasSensor, bus: TimedSMBus) -> dict:
+    """The read path before the preheat state machine, one channel at a time."""
+    values = {}
+    for name, command in CHANNELS.items():
+        bus.write_byte(sensor.address, WARMING_UP)
+        time.sleep(0.01)
+        bus.write_byte(sensor.address, command)
+        time.sleep(0.01)
+        time.sleep(0.05)
+        data = bus.read_i2c_block_data(sensor.address, command, 2)
+        values[name] = int.from_bytes(data, byteorder='little')
+    return values
+
+
+def bench(read) -> tuple[float, float]:
+    bus = TimedSMBus()
+    sensor = GroveGasSensor(bus)
+    sensor.preheat()  # heater is on before the first frame in both cases
+    bus.transactions = 0
+    t0 = time.perf_counter()
+    for _ in range(FRAMES):
+        read(sensor, bus)
+    return bus.transactions / FRAMES, (time.perf_counter() - t0) / FRAMES
+
+
+def main():
+    print(f"{'path':>8} {'i2c transactions':>17} {'ms per frame':>13}")
+    for name, read in [
+        ('legacy', legacy_read_data),
+        ('batched', lambda sensor, bus: sensor.read_data()),
+    ]:
+        transactions, wall = bench(read)
+        print(f"{name:>8} {transactions:>17.0f} {wall * 1e3:>13.1f}")
+
+
+if __name__ == '__main__':
+    main()
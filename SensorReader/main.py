@@ -6,81 +6,265 @@ import time
 import json
 from pathlib import Path
 from SensorReader.Sensors.SensorManager import SensorManager
+from SensorReader.Sensors.SensorScheduler import SensorScheduler
 from SensorReader.aspects.LoggingAspect import LoggingAspect
+from SensorReader.Reader.AcquisitionThread import AcquisitionThread
+from SensorReader.Reader.PublishPolicy import PublishPolicy
+from SensorReader.Reader.SnapshotWriter import SnapshotWriter
 try:
     import board
 except (NotImplementedError, ImportError):
     from fakerpi import board
 from smbus2 import SMBus
-from SensorReader.Sensors.BME680Sensor import BME680Sensor
-from SensorReader.Sensors.SGP30Sensor import SGP30Sensor
-from SensorReader.Sensors.GroveGasSensor import GroveGasSensor
+from SensorReader.Sensors.SensorInventory import SensorInventory
 
+# Sensors served by this reader (see Sensors/SensorInventory.py). Keys default to the
+# class name, so the rate, filter and deadband tables below apply unchanged.
+SENSOR_INVENTORY = {
+    "buses": {"main": 1},
+    "sensors": [
+        {"type": "BME680", "bus": "main"},
+        {"type": "SGP30", "bus": "main"},
+        {"type": "Grove", "bus": "main"},
+    ],
+}
+
+# Hz per sensor ("Sensor") or channel ("Sensor.Channel"); others are read once per frame.
+# The SGP30 baseline algorithm expects 1 Hz iaq_measure() calls.
+SENSOR_RATES = {
+    "SGP30Sensor": 1.0,
+    "GroveGasSensor": 5.0,
+}
+
+# Streaming filters over the oversampled readings (see Sensors/StreamFilters.py)
+SENSOR_FILTERS = {
+    "GroveGasSensor": {"kind": "median", "window": 9},
+}
+RAW_EVERY = 15  # frames between unfiltered "raw" values in the output
+
+# Change needed before an idle frame is published ("Sensor" or "Sensor.Channel")
+PUBLISH_DEADBANDS = {
+    "BME680Sensor.Temperature": 0.1,
+    "BME680Sensor.Humidity": 0.5,
+    "BME680Sensor.Pressure": 0.5,
+    "BME680Sensor.GasResistance": 2000,
+    "SGP30Sensor": 10,
+    "GroveGasSensor": 5,
+}
+PUBLISH_HEARTBEAT = 30.0  # s between frames when nothing changes
+
+# Units announced with the packed frame schema (DataCommunicator/source/FrameSchema.py)
+CHANNEL_UNITS = {
+    "BME680Sensor.Temperature": "degC",
+    "BME680Sensor.Humidity": "%RH",
+    "BME680Sensor.Pressure": "hPa",
+    "BME680Sensor.GasResistance": "ohm",
+    "SGP30Sensor.CO2": "ppm",
+    "SGP30Sensor.TVOC": "ppb",
+    "GroveGasSensor": "raw",
+}
+
+# Sampling profiles: frame_period, rates, and optionally filters, sensors and
+# channels ({"Sensor": [channel, ...]}) as understood by SensorScheduler.
+# The SGP30 stays at 1 Hz in every profile to keep its baseline valid.
+SAMPLING_PROFILES = {
+    "full": {"frame_period": 2.0, "rates": SENSOR_RATES},
+    # same frame grid the model was trained on, but denser oversampling behind the filters
+    "loading": {"frame_period": 2.0, "rates": {"SGP30Sensor": 1.0, "GroveGasSensor": 10.0}},
+    "idle": {
+        "frame_period": 10.0,
+        "rates": {"SGP30Sensor": 1.0},
+        "channels": {"GroveGasSensor": ["NO2", "Ethanol", "VOC", "CO"]},
+    },
+}
+DEFAULT_PROFILE = "full"
+
+# IO state -> sampling profile; states not listed use DEFAULT_PROFILE
+STATE_PROFILES = {
+    "IdleState": "idle",
+    "LoadingState": "loading",
+    "VentilatingState": "idle",
+}
 
 class BaseSensorReader:
-    def __init__(self, sensors, output_path, sleep_interval=2):
+    scheduler = None
+    profiles = None
+    profile = None
+    _pending_profile = None
+
+    def __init__(self, sensors, output_path, sleep_interval=2, rates=None, filters=None, raw_every=None,
+                 profiles=None, profile=None):
         self.sensors = sensors
         self.manager = SensorManager(self.sensors)
         self.output_path = output_path
         self.sleep_interval = sleep_interval
+        self.filters = filters
+        self.raw_every = raw_every
+        self.profiles = profiles
+        if profiles:
+            self._use_profile(profile or next(iter(profiles)))
+        # with rates, frames come from the scheduler on a sleep_interval grid
+        elif rates:
+            self.scheduler = SensorScheduler(self.manager, rates, frame_period=sleep_interval,
+                                             filters=filters, raw_every=raw_every)
+
+    def set_profile(self, name):
+        """Switch sampling profile; the reading thread applies it before its next frame."""
+        if not self.profiles or name not in self.profiles:
+            raise ValueError(f"Unknown sampling profile: {name}")
+        self._pending_profile = name
+
+    def _use_profile(self, name):
+        profile = self.profiles[name]
+        self.sleep_interval = profile.get("frame_period", self.sleep_interval)
+        if not any(profile.get(key) for key in ("rates", "sensors", "channels")):
+            self.scheduler = None
+        elif self.scheduler is not None:
+            # in place: histories, filters and the frame grid carry over
+            self.scheduler.reconfigure(
+                profile.get("rates"), sensors=profile.get("sensors"), channels=profile.get("channels"),
+                frame_period=self.sleep_interval, filters=profile.get("filters", self.filters),
+            )
+        else:
+            self.scheduler = SensorScheduler(
+                self.manager, profile.get("rates"), frame_period=self.sleep_interval,
+                filters=profile.get("filters", self.filters), raw_every=self.raw_every,
+                sensors=profile.get("sensors"), channels=profile.get("channels"),
+            )
+        self.profile = name
 
     @LoggingAspect.log_method
     def read_and_save(self):
         while True:
             self.read_and_save_once()
-            time.sleep(self.sleep_interval)
+            if self.scheduler is None:
+                time.sleep(self.sleep_interval)
+
+    def read_once(self):
+        """One frame, from the scheduler if rates are configured."""
+        # switch between frames only, so no frame mixes two profiles
+        pending = self._pending_profile
+        if pending is not None and pending != self.profile:
+            self._use_profile(pending)
+        if self.scheduler is not None:
+            return self.scheduler.next_frame()
+        return self.manager.read_all()
 
     def read_and_save_once(self):
-        data = self.manager.read_all()
+        data = self.read_once()
         sensor_json = json.dumps(data, indent=4)
         with open(self.output_path, "w") as f:
             f.write(sensor_json)
 
 
+def open_i2c(number):
+    """busio-style I2C object for the Adafruit drivers on Linux bus number."""
+    if number == 1:
+        return board.I2C()
+    # the other buses (i2c-gpio overlays, muxes) need adafruit-extended-bus
+    from adafruit_extended_bus import ExtendedI2C
+    return ExtendedI2C(number)
+
+
 class ElectronicNoseSensorReader(BaseSensorReader):
-    def __init__(self, output_path, sleep_interval=2):
-        i2c = board.I2C()
-        bus = SMBus(1)
-        sensors = [
-            BME680Sensor(i2c),
-            SGP30Sensor(i2c),
-            GroveGasSensor(bus)
-        ]
-        super().__init__(sensors, output_path, sleep_interval)
+    def __init__(self, output_path, sleep_interval=2, inventory=SENSOR_INVENTORY, **scheduling):
+        self.inventory = SensorInventory(inventory, open_i2c, SMBus)
+        super().__init__(self.inventory.build(), output_path, sleep_interval, **scheduling)
 
 import asyncio
 from DataCommunicator.source.WebSocketConnection import WebSocketConnection
 from DataCommunicator.source.BaseDataClient import BaseDataClient
+from DataCommunicator.source.FrameSchema import FrameEncoder, announcement
+from DataCommunicator.source.Metrics import Gauge, registry, serve_metrics
+
+PUBLISHED = registry.counter('sensor_frames_published_total', 'Frames sent to sensor_readings')
+QUEUED = registry.gauge('sensor_frame_queue', 'Acquired frames waiting for the event loop')
+
+
+def health_metrics(manager: SensorManager) -> list:
+    """Circuit breaker state of every sensor, for the metrics endpoint."""
+    up = Gauge('sensor_up', 'Sensor breaker closed (1) or open/half-open (0)', ('sensor',))
+    failures = Gauge('sensor_consecutive_failures', 'Failed reads since the last good one', ('sensor',))
+    for sensor, health in manager.health().items():
+        up.labels(sensor).set(1 if health['state'] == 'closed' else 0)
+        failures.labels(sensor).set(health['failures'])
+    return [up, failures]
+
 
 class SensorReaderClient(BaseDataClient):
     """
-    Wraps the ElectronicNoseSensorReader in a BaseDataClient to:
-      1) write JSON to file (as before)
-      2) send the same payload to 'collector' over WebSocket
+    Wraps the ElectronicNoseSensorReader in a BaseDataClient. Sensors are read
+    on an AcquisitionThread; the event loop only receives the frames to:
+      1) send each frame to the 'sensor_readings' topic over WebSocket
+      2) optionally keep reader.output_path updated with the latest frame,
+         written in the background every snapshot_interval seconds (None = off)
+    With a PublishPolicy only changed frames (and heartbeats) are sent, unless
+    a consumer asks for full-rate streaming with
+    {"command": "stream", "enabled": bool, "ttl": seconds}.
+    With a FrameEncoder frames are sent packed (schema id + binary values);
+    each new schema is published on 'sensor_schemas' first and sent again
+    to a consumer that asks with {"command": "schema", "id": ...}.
     """
-    def __init__(self, name: str, uri: str, reader: ElectronicNoseSensorReader):
+    def __init__(self, name: str, uri: str, reader: ElectronicNoseSensorReader,
+                 snapshot_interval: float | None = 0.0, max_queued_frames: int = 8,
+                 policy: PublishPolicy | None = None, encoder: FrameEncoder | None = None):
         conn = WebSocketConnection(uri)
         super().__init__(name, conn)
         self.reader = reader
+        self.policy = policy
+        self.encoder = encoder
+        self.max_queued_frames = max_queued_frames
+        self.acquisition = None
+        self.snapshots = None
+        if snapshot_interval is not None:
+            self.snapshots = SnapshotWriter(reader.output_path, interval=snapshot_interval)
 
     @LoggingAspect.log_method
     async def run(self):
-        while True:
-            # 1) read & save to JSON file
-            self.reader.read_and_save_once()
+        if self.reader.profiles:
+            await self.connection.subscribe('state')
+        if self.snapshots is not None and not self.snapshots.is_alive():
+            self.snapshots.start()
+        frames = asyncio.Queue(maxsize=self.max_queued_frames)
+        QUEUED.set_function(frames.qsize)
+        self.acquisition = AcquisitionThread(self.reader, asyncio.get_running_loop(), frames)
+        self.acquisition.start()
+        try:
+            while True:
+                data = await frames.get()
 
-            # 2) load the data back for sending
-            with open(self.reader.output_path, "r") as f:
-                data = json.load(f)
+                # 1) send the in-memory frame to the topic of "sensor_readings"
+                if self.policy is None or self.policy.should_publish(data):
+                    await self.publish(data)
+                    PUBLISHED.inc()
 
-            # 3) send to the topic of "sensor_readings"
-            await self.connection.send('topic:sensor_readings', data)
+                # 2) hand the same frame to the background file writer
+                if self.snapshots is not None:
+                    self.snapshots.write(data)
+        finally:
+            self.acquisition.stop()
 
-            await asyncio.sleep(self.reader.sleep_interval)
+    async def publish(self, frame: dict):
+        if self.encoder is None:
+            await self.connection.send('topic:sensor_readings', frame)
+            return
+        packed, schema = self.encoder.pack(frame)
+        if schema is not None:
+            await self.connection.send('topic:sensor_schemas', schema)
+        await self.connection.send('topic:sensor_readings', packed)
 
     async def on_message(self, frm: str, payload: dict):
-        # handle incoming messages if needed
         print(f'[{self.name}] Received control from {frm}: {payload}')
+        if isinstance(payload, dict) and 'state' in payload and self.reader.profiles:
+            profile = STATE_PROFILES.get(payload['state'], DEFAULT_PROFILE)
+            if profile in self.reader.profiles:
+                self.reader.set_profile(profile)
+        if isinstance(payload, dict) and payload.get('command') == 'stream' and self.policy is not None:
+            self.policy.request_stream(frm, payload.get('enabled', True), payload.get('ttl', 60.0))
+        if isinstance(payload, dict) and payload.get('command') == 'schema' and self.encoder is not None:
+            schema = self.encoder.schemas.get(payload.get('id'))
+            if schema is not None:
+                await self.connection.send(frm, announcement(schema))
 
 
 async def main():
@@ -89,10 +273,15 @@ async def main():
     output_path = project_dir / "sensor_data.json"
 
     # existing reader that writes to sensor_data.json
-    reader = ElectronicNoseSensorReader(output_path, sleep_interval=2)
+    reader = ElectronicNoseSensorReader(output_path, sleep_interval=2, filters=SENSOR_FILTERS, raw_every=RAW_EVERY,
+                                        profiles=SAMPLING_PROFILES, profile=DEFAULT_PROFILE)
 
     # new client that also forwards readings over WebSocket
-    client = SensorReaderClient('sensor', uri, reader)
+    client = SensorReaderClient('sensor', uri, reader,
+                                policy=PublishPolicy(PUBLISH_DEADBANDS, heartbeat=PUBLISH_HEARTBEAT),
+                                encoder=FrameEncoder(units=CHANNEL_UNITS))
+    registry.add_collector(lambda: health_metrics(reader.manager))
+    serve_metrics('sensor', client.connection)
 
     await client.start()
 
@@ -7,6 +7,7 @@ sys.modules['DataCommunicator.source.WebSocketConnection'] = MagicMock()
 sys.modules['DataCommunicator.source.BaseDataClient']    = MagicMock()
 sys.modules['smbus2'] = MagicMock()
 from SensorReader.main import ElectronicNoseSensorReader
+from SensorReader.Sensors.SensorInventory import SENSOR_TYPES
 
 
 class TestElectronicNoseSensorReader:
@@ -14,9 +15,10 @@ class TestElectronicNoseSensorReader:
     def mock_hardware(self, mocker):
         mocker.patch("SensorReader.main.board", return_value="mocked_i2c")
         mocker.patch("SensorReader.main.SMBus", return_value="mocked_bus")
-        mocker.patch("SensorReader.main.BME680Sensor", return_value=MagicMock())
-        mocker.patch("SensorReader.main.SGP30Sensor", return_value=MagicMock())
-        mocker.patch("SensorReader.main.GroveGasSensor", return_value=MagicMock())
+        mocker.patch.dict("SensorReader.Sensors.SensorInventory.SENSOR_TYPES", {
+            name: dict(kind, cls=MagicMock(return_value=MagicMock(), __name__=kind["cls"].__name__))
+            for name, kind in SENSOR_TYPES.items()
+        })
 
     def test_electronic_nose_sensor_reader_read_and_save_once(self, mocker):
         output_path = "fake_output.json"
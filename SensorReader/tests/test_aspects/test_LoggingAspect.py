@@ -1,4 +1,7 @@
+import pytest
+
 from .FakeSensor import FakeSensor
+from DataCommunicator.source.Instrumentation import TRACE, instrumentation
 from SensorReader.Sensors.SensorManager import SensorManager
 
 # mock hardware to use ElectronicNoseSensorReader
@@ -12,6 +15,14 @@ from SensorReader.main import ElectronicNoseSensorReader
 class TestLoggingAspect:
     # test naming == test + {module/package} + {class/fileName} + {function/method} + {case}
 
+    @pytest.fixture(autouse=True)
+    def trace_level(self):
+        # the log lines are only printed at TRACE level
+        level = instrumentation.level
+        instrumentation.configure(TRACE)
+        yield
+        instrumentation.configure(level)
+
     # capfd is a pytest fixture for capturing output
     def test_logging_aspect_sensor_interface_subclasses_read_data(self, capfd):
         sensor = FakeSensor()
@@ -0,0 +1,96 @@
+import asyncio
+import time
+
+import pytest
+
+from SensorReader.Reader.AcquisitionThread import AcquisitionThread, DEVICE_READ_SECONDS, READ_SECONDS
+
+
+class BlockingReader:
+    scheduler = None
+    sleep_interval = 0.0
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.count = 0
+
+    def read_once(self):
+        time.sleep(self.delay)  # blocking I2C transfer
+        self.count += 1
+        return {"n": self.count}
+
+
+class TestAcquisitionThread:
+    @pytest.mark.asyncio
+    async def test_acquisition_thread_keeps_loop_responsive(self):
+        queue = asyncio.Queue(maxsize=8)
+        thread = AcquisitionThread(BlockingReader(0.05), asyncio.get_running_loop(), queue)
+        thread.start()
+
+        # the loop keeps ticking every few ms while frames are being read
+        stall = 0.0
+        last = time.perf_counter()
+        frames = []
+        while len(frames) < 3:
+            try:
+                frames.append(await asyncio.wait_for(queue.get(), 0.005))
+            except asyncio.TimeoutError:
+                pass
+            now = time.perf_counter()
+            stall = max(stall, now - last)
+            last = now
+        thread.stop()
+        thread.join(timeout=1)
+
+        assert [f["n"] for f in frames] == [1, 2, 3]
+        assert stall < 0.04
+
+    @pytest.mark.asyncio
+    async def test_acquisition_thread_drops_oldest_when_queue_full(self):
+        queue = asyncio.Queue(maxsize=2)
+        thread = AcquisitionThread(BlockingReader(0), asyncio.get_running_loop(), queue)
+
+        for n in range(5):
+            thread._put({"n": n})
+
+        assert thread.dropped == 3
+        assert [queue.get_nowait()["n"] for _ in range(2)] == [3, 4]
+
+    @pytest.mark.asyncio
+    async def test_acquisition_thread_deadlines_do_not_drift(self):
+        reader = BlockingReader(0.03)
+        reader.sleep_interval = 0.1
+        queue = asyncio.Queue(maxsize=8)
+        thread = AcquisitionThread(reader, asyncio.get_running_loop(), queue)
+        thread.start()
+
+        frames = [await asyncio.wait_for(queue.get(), 1) for _ in range(4)]
+        thread.stop()
+        thread.join(timeout=1)
+
+        starts = [f["meta"]["mono_start"] for f in frames]
+        # period is the interval, not interval + read time
+        assert starts[-1] - starts[0] == pytest.approx(0.3, abs=0.03)
+        assert [f["meta"]["seq"] for f in frames] == [0, 1, 2, 3]
+        meta = frames[0]["meta"]
+        assert meta["mono_end"] - meta["mono_start"] >= 0.03
+        assert meta["wall_end"] >= meta["wall_start"]
+        assert frames[0]["timestamp"].startswith(time.strftime("%Y-"))
+
+    def test_acquisition_thread_exports_scheduler_read_timings(self):
+        class Scheduler:
+            last_frame_mono = last_frame_time = None
+
+            def take_timings(self):
+                return [("FastSensor", 0.004), ("FastSensor", 0.006)]
+
+        reader = BlockingReader(0)
+        reader.scheduler = Scheduler()
+        thread = AcquisitionThread(reader, None, None)
+        before = READ_SECONDS._unlabelled().histogram.count
+
+        thread._acquire()
+
+        assert DEVICE_READ_SECONDS.labels("FastSensor").histogram.count >= 2
+        # waiting for the grid is not a read
+        assert READ_SECONDS._unlabelled().histogram.count == before
@@ -0,0 +1,76 @@
+from SensorReader.Reader.PublishPolicy import PublishPolicy
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def frame(no2, temperature=21.0, seq=0):
+    return {
+        "GroveGasSensor": {"NO2": no2},
+        "BME680Sensor": {"Temperature": temperature},
+        "timestamp": f"t{seq}",
+        "meta": {"seq": seq},
+    }
+
+
+class TestPublishPolicy:
+    def test_publish_policy_deadband(self):
+        clock = FakeClock()
+        policy = PublishPolicy({"GroveGasSensor": 5, "BME680Sensor.Temperature": 0.1}, clock=clock)
+
+        assert policy.should_publish(frame(100, seq=0))
+        # metadata always changes but does not count
+        assert not policy.should_publish(frame(104, seq=1))
+        assert not policy.should_publish(frame(96, 21.05, seq=2))
+        assert policy.should_publish(frame(106, seq=3))
+        # compared to the last sent frame, so a slow drift is still published
+        assert not policy.should_publish(frame(110, seq=4))
+        assert policy.should_publish(frame(112, seq=5))
+        assert (policy.sent, policy.suppressed) == (3, 3)
+
+    def test_publish_policy_heartbeat(self):
+        clock = FakeClock()
+        policy = PublishPolicy(default_deadband=10, heartbeat=30, clock=clock)
+
+        assert policy.should_publish(frame(100))
+        clock.now = 29
+        assert not policy.should_publish(frame(100))
+        clock.now = 30
+        assert policy.should_publish(frame(100))
+
+    def test_publish_policy_streaming_request_and_expiry(self):
+        clock = FakeClock()
+        policy = PublishPolicy(default_deadband=10, heartbeat=1000, clock=clock)
+        policy.should_publish(frame(100))
+
+        policy.request_stream("predictor", ttl=60)
+        assert policy.should_publish(frame(100))
+        clock.now = 61
+        assert not policy.should_publish(frame(100))
+
+        policy.request_stream("collector", ttl=None)
+        policy.request_stream("collector", enabled=False)
+        assert not policy.should_publish(frame(100))
+
+    def test_publish_policy_sensor_status_changes(self):
+        clock = FakeClock()
+        policy = PublishPolicy(default_deadband=10, heartbeat=1000, clock=clock)
+        assert policy.should_publish(frame(100))
+
+        missing = frame(100)
+        missing["BME680Sensor"] = None
+        missing["meta"]["missing"] = ["BME680Sensor"]
+        assert policy.should_publish(missing)
+        assert not policy.should_publish(missing)
+
+        # the same values, but now held from before the sensor's breaker opened
+        stale = frame(100)
+        stale["meta"]["stale"] = ["GroveGasSensor"]
+        assert policy.should_publish(stale)
+        assert not policy.should_publish(stale)
+        assert policy.should_publish(frame(100))
@@ -0,0 +1,59 @@
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.modules['smbus2'] = MagicMock()
+from SensorReader.main import BaseSensorReader
+from SensorReader.Sensors.SensorInterface import Sensor
+
+
+class ChannelSensor(Sensor):
+    channels = {"A": 0x01, "B": 0x02, "C": 0x03}
+
+    def __init__(self):
+        self.calls = []
+
+    def read_data(self):
+        return self.read_channels(self.channels)
+
+    def read_channels(self, channels):
+        self.calls.append(tuple(channels))
+        return {name: 1 for name in channels}
+
+
+PROFILES = {
+    "full": {"frame_period": 0.01},
+    "idle": {"frame_period": 0.05, "channels": {"ChannelSensor": ["A"]}},
+}
+
+
+class TestSamplingProfiles:
+    def test_reader_starts_with_given_profile(self):
+        reader = BaseSensorReader([ChannelSensor()], "unused.json", profiles=PROFILES, profile="full")
+
+        assert reader.profile == "full"
+        assert reader.scheduler is None
+        assert reader.sleep_interval == 0.01
+        assert reader.read_once() == {"ChannelSensor": {"A": 1, "B": 1, "C": 1}}
+
+    def test_reader_switches_profile_between_frames(self):
+        sensor = ChannelSensor()
+        reader = BaseSensorReader([sensor], "unused.json", profiles=PROFILES, profile="full")
+
+        reader.set_profile("idle")
+        # nothing changes until the reading thread asks for the next frame
+        assert reader.profile == "full"
+
+        frame = reader.read_once()
+
+        assert reader.profile == "idle"
+        assert reader.sleep_interval == 0.05
+        assert frame == {"ChannelSensor": {"A": 1}}
+        assert sensor.calls[-1] == ("A",)
+
+    def test_reader_unknown_profile(self):
+        reader = BaseSensorReader([ChannelSensor()], "unused.json", profiles=PROFILES)
+
+        with pytest.raises(ValueError):
+            reader.set_profile("turbo")
@@ -0,0 +1,53 @@
+import json
+import time
+
+from SensorReader.Reader.SnapshotWriter import SnapshotWriter
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+class TestSnapshotWriter:
+    def test_snapshot_writer_writes_latest_frame(self, tmp_path):
+        path = tmp_path / "sensor_data.json"
+        writer = SnapshotWriter(path)
+        writer.start()
+
+        writer.write({"SGP30Sensor": {"CO2": 400}})
+
+        assert wait_for(lambda: writer.written == 1)
+        assert json.loads(path.read_text()) == {"SGP30Sensor": {"CO2": 400}}
+        # the temp file has been renamed into place
+        assert [p.name for p in tmp_path.iterdir()] == ["sensor_data.json"]
+        writer.stop()
+        writer.join(timeout=1)
+
+    def test_snapshot_writer_coalesces_frames_within_interval(self, tmp_path):
+        path = tmp_path / "sensor_data.json"
+        writer = SnapshotWriter(path, interval=0.2)
+        writer.start()
+
+        writer.write({"n": 0})
+        assert wait_for(lambda: writer.written == 1)
+        for n in range(1, 20):
+            writer.write({"n": n})
+        writer.stop()
+        writer.join(timeout=1)
+
+        assert writer.written == 2
+        assert json.loads(path.read_text()) == {"n": 19}
+
+    def test_snapshot_writer_write_does_not_block(self, tmp_path):
+        writer = SnapshotWriter(tmp_path / "sensor_data.json")
+
+        start = time.perf_counter()
+        for n in range(1000):
+            writer.write({"n": n})
+
+        # not started: frames replace each other in memory only
+        assert time.perf_counter() - start < 0.1
+        assert writer.written == 0
@@ -1,3 +1,7 @@
+import time
+
+import adafruit_bme680
+
 from .BME_mock import FakeBME680Sensor
 from SensorReader.Sensors.BME680Sensor import BME680Sensor
 
@@ -18,3 +22,77 @@ class TestBME680Sensor:
             "GasResistance": 120000
         }
 
+
+
+class RegisterBME680(adafruit_bme680.Adafruit_BME680):
+    """Driver with a scripted register file instead of a bus; skips the chip probe."""
+    def __init__(self, i2c=None, address=None):
+        self._pressure_oversample = 0b011
+        self._temp_oversample = 0b100
+        self._humidity_oversample = 0b010
+        self._filter = 0b010
+        self._run_gas = 0xFF
+        self._chip_variant = 0x00
+        self._temp_calibration = [0, 0, 0]
+        self._last_reading = 0
+        self._min_refresh_time = 0.1
+        self.writes = []
+        self.block_reads = 0
+        self.measurements = 0
+        # MEAS_STATUS block: new data, pressure, temperature, humidity, gas
+        self.block = bytearray(17)
+        self.block[0] = 0x80
+        self.block[2:5] = (1600 << 4).to_bytes(3, 'big')
+        self.block[5:8] = (2400 << 4).to_bytes(3, 'big')
+        self.block[8:10] = (500).to_bytes(2, 'big')
+        self.block[13:15] = (64 * 300).to_bytes(2, 'big')
+
+    def _write(self, register, values):
+        self.writes.append((register, list(values)))
+
+    def _read_byte(self, register):
+        return 0
+
+    def _read(self, register, length):
+        self.block_reads += 1
+        return self.block
+
+    def _perform_reading(self):
+        self.measurements += 1
+        super()._perform_reading()
+
+    # raw ADC values stand in for the compensation formulas
+    temperature = property(lambda self: (self._perform_reading(), self._adc_temp)[1])
+    humidity = property(lambda self: (self._perform_reading(), self._adc_hum)[1])
+    pressure = property(lambda self: (self._perform_reading(), self._adc_pres)[1])
+    gas = property(lambda self: (self._perform_reading(), self._adc_gas)[1])
+
+
+class TestBME680SensorTwoPhase:
+    def test_bme680_sensor_begin_read_returns_at_once(self, mocker):
+        mocker.patch('adafruit_bme680.Adafruit_BME680_I2C', RegisterBME680)
+        sensor = BME680Sensor(mocker.Mock())
+
+        start = time.perf_counter()
+        sensor.begin_read()
+
+        assert time.perf_counter() - start < 0.01
+        assert sensor.two_phase
+        # last write triggers a single-shot measurement
+        assert sensor.sensor.writes[-1] == (adafruit_bme680._BME680_REG_CTRL_MEAS, [0x01])
+        assert sensor.sensor.block_reads == 0
+
+    def test_bme680_sensor_finish_read_collects_in_one_block_read(self, mocker):
+        mocker.patch('adafruit_bme680.Adafruit_BME680_I2C', RegisterBME680)
+        sensor = BME680Sensor(mocker.Mock(), heater_time=20)
+
+        sensor.begin_read()
+        start = time.perf_counter()
+        data = sensor.finish_read()
+
+        # waits for conversion + heater instead of polling
+        assert time.perf_counter() - start >= 0.02
+        assert sensor.sensor.block_reads == 1
+        assert data == {"Temperature": 2400, "Humidity": 500, "Pressure": 1600, "GasResistance": 300}
+        # properties used the collected reading; no extra forced measurement was triggered
+        assert sensor.sensor.writes[-1][0] == adafruit_bme680._BME680_REG_CTRL_MEAS
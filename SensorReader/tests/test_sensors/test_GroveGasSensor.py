@@ -73,13 +73,11 @@ class TestGroveGasSensor:
 
 
     def test_read_data(self, mocker):
-        sensor = GroveGasSensor(mocker.Mock())
-        mocker.patch.object(sensor, 'measure_no2', return_value=10)
-        mocker.patch.object(sensor, 'measure_ethanol', return_value=20)
-        mocker.patch.object(sensor, 'measure_voc', return_value=30)
-        mocker.patch.object(sensor, 'measure_co', return_value=40)
-        mocker.patch.object(sensor, 'measure_4', return_value=50)
-        mocker.patch.object(sensor, 'measure_8', return_value=60)
+        mocker.patch('SensorReader.Sensors.GroveGasSensor.time.sleep')
+        mock_bus = mocker.Mock()
+        values = {0x01: 10, 0x03: 20, 0x05: 30, 0x07: 40, 0x04: 50, 0x08: 60}
+        mock_bus.read_i2c_block_data.side_effect = lambda address, command, length: list(values[command].to_bytes(2, 'little'))
+        sensor = GroveGasSensor(mock_bus)
 
         result = sensor.read_data()
 
@@ -93,3 +91,31 @@ class TestGroveGasSensor:
         }
 
 
+    def test_read_data_preheats_once(self, mocker):
+        mocker.patch('SensorReader.Sensors.GroveGasSensor.time.sleep')
+        mock_bus = mocker.Mock()
+        mock_bus.read_i2c_block_data.return_value = [0, 0]
+        sensor = GroveGasSensor(mock_bus)
+
+        sensor.read_data()
+        sensor.read_data()
+
+        commands = [c.args[1] for c in mock_bus.write_byte.call_args_list]
+        assert commands.count(0xFE) == 1
+        # one heater command, then one select per channel and frame
+        assert len(commands) == 1 + 2 * 6
+        assert sensor.heater_state == "heating"
+
+
+    def test_warm_after_warmup_time(self, mocker):
+        mocker.patch('SensorReader.Sensors.GroveGasSensor.time.sleep')
+        monotonic = mocker.patch('SensorReader.Sensors.GroveGasSensor.time.monotonic', return_value=100.0)
+        sensor = GroveGasSensor(mocker.Mock(), warmup_time=30)
+
+        assert not sensor.is_warm
+        sensor.preheat()
+        assert not sensor.is_warm
+        monotonic.return_value = 130.0
+        assert sensor.is_warm
+        sensor.stop_preheat()
+        assert sensor.heater_state == "cold"
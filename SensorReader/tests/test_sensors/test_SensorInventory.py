@@ -0,0 +1,85 @@
+import pytest
+
+from .BME_mock import FakeBME680Sensor
+from .SGP_mock import FakeSGP30Sensor
+from SensorReader.Sensors.GroveGasSensor import GroveGasSensor
+from SensorReader.Sensors.SensorInventory import SensorInventory
+from SensorReader.Sensors.SensorManager import SensorManager
+
+
+@pytest.fixture
+def fake_drivers(mocker):
+    mocker.patch('adafruit_bme680.Adafruit_BME680_I2C', FakeBME680Sensor)
+    mocker.patch('adafruit_sgp30.Adafruit_SGP30', FakeSGP30Sensor)
+
+
+def make_inventory(mocker, spec):
+    open_i2c = mocker.Mock(side_effect=lambda number: f"i2c-{number}")
+    open_smbus = mocker.Mock(side_effect=lambda number: mocker.Mock(name=f"smbus-{number}"))
+    return SensorInventory(spec, open_i2c, open_smbus), open_i2c, open_smbus
+
+
+class TestSensorInventory:
+    def test_sensor_inventory_builds_sensors_with_unique_keys(self, mocker, fake_drivers):
+        inventory, open_i2c, open_smbus = make_inventory(mocker, {
+            "buses": {"main": 1, "array": {"number": 3, "serial": True}},
+            "sensors": [
+                {"type": "BME680", "bus": "main"},
+                {"type": "SGP30", "bus": "main"},
+                {"type": "Grove", "bus": "main"},
+                {"type": "Grove", "bus": "array", "address": 0x09},
+                {"type": "Grove", "bus": "array", "address": 0x0A, "key": "GroveRight",
+                 "options": {"command_delay": 0}},
+            ],
+        })
+
+        sensors = inventory.build()
+
+        assert [sensor.key for sensor in sensors] == [
+            "BME680Sensor", "SGP30Sensor", "GroveGasSensor_main_0x08", "GroveGasSensor_array_0x09", "GroveRight",
+        ]
+        assert [sensor.bus_key for sensor in sensors] == ["main", "main", "main", "array", "array"]
+        assert [sensor.address for sensor in sensors[2:]] == [0x08, 0x09, 0x0A]
+        assert sensors[4].command_delay == 0
+        # each bus is opened once per driver style
+        assert open_i2c.call_count == 1
+        assert sorted(call.args[0] for call in open_smbus.call_args_list) == [1, 3]
+        assert sensors[3].bus is sensors[4].bus
+        # a worker per device, except on the serial bus
+        assert [sensor.worker_key for sensor in sensors] == [
+            ("main", 0x76), ("main", 0x58), ("main", 0x08), ("array", None), ("array", None),
+        ]
+
+    def test_sensor_inventory_frames_keyed_per_device(self, mocker):
+        inventory, _, _ = make_inventory(mocker, {
+            "buses": {"a": 1, "b": 3},
+            "sensors": [{"type": "Grove", "bus": "a"}, {"type": "Grove", "bus": "b"}],
+        })
+        sensors = inventory.build()
+        mocker.patch.object(GroveGasSensor, 'read_data', side_effect=lambda self: {"bus": self.bus_key},
+                            autospec=True)
+        manager = SensorManager(sensors)
+
+        data = manager.read_all()
+        manager.close()
+
+        assert data == {"GroveGasSensor_a_0x08": {"bus": "a"}, "GroveGasSensor_b_0x08": {"bus": "b"}}
+
+    @pytest.mark.parametrize("sensors", [
+        [{"type": "Thermometer", "bus": "main"}],
+        [{"type": "Grove", "bus": "other"}],
+        [{"type": "SGP30", "bus": "main", "address": 0x59}],
+        [{"type": "Grove", "bus": "main"}, {"type": "Grove", "bus": "main"}],
+        [{"type": "Grove", "bus": "main", "key": "G"}, {"type": "BME680", "bus": "main", "key": "G"}],
+    ])
+    def test_sensor_inventory_rejects_invalid_entries(self, mocker, sensors):
+        with pytest.raises(ValueError):
+            make_inventory(mocker, {"buses": {"main": 1}, "sensors": sensors})
+
+    def test_sensor_inventory_close_closes_smbus(self, mocker):
+        inventory, _, _ = make_inventory(mocker, {"buses": {"main": 1}, "sensors": [{"type": "Grove", "bus": "main"}]})
+        bus = inventory.build()[0].bus
+
+        inventory.close()
+
+        bus.close.assert_called_once()
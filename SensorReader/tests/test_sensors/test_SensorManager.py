@@ -1,3 +1,6 @@
+import threading
+import time
+
 import pytest
 
 from .BME_mock import FakeBME680Sensor
@@ -5,6 +8,7 @@ from SensorReader.Sensors.BME680Sensor import BME680Sensor
 from .SGP_mock import FakeSGP30Sensor
 from SensorReader.Sensors.SGP30Sensor import SGP30Sensor
 from SensorReader.Sensors.SensorManager import SensorManager
+from SensorReader.Sensors.SensorInterface import Sensor
 
 from .SensorWithoutInterface import SensorWithoutInterface
 
@@ -77,3 +81,194 @@ class TestSensorManager:
         assert data["BadSensor"] is None
 
 
+
+
+class SlowSensor(Sensor):
+    def __init__(self, bus, address, delay=0.1):
+        self.bus_key = bus
+        self.address = address
+        self.delay = delay
+
+    def read_data(self):
+        time.sleep(self.delay)
+        return {"address": self.address}
+
+
+class TestSensorManagerConcurrency:
+    def test_sensor_manager_read_all_buses_in_parallel(self):
+        sensors = [SlowSensor("bus1", 0x76), SlowSensor("bus2", 0x58), SlowSensor("bus3", 0x08)]
+        manager = SensorManager(sensors)
+
+        start = time.perf_counter()
+        manager.read_all()
+        elapsed = time.perf_counter() - start
+        manager.close()
+
+        # three buses, each 0.1 s: close to the slowest one, far from the sum
+        assert elapsed < 0.25
+        assert set(manager.last_timings) == {"SlowSensor"}
+        assert manager.last_timings["SlowSensor"] >= 0.1
+        assert manager.last_timestamp is not None
+
+    def test_sensor_manager_read_all_same_device_sequential(self):
+        sensors = [SlowSensor("bus1", 0x08, delay=0.05), SlowSensor("bus1", 0x08, delay=0.05)]
+        manager = SensorManager(sensors)
+
+        manager.read_all()
+        manager.close()
+
+        assert manager.last_cycle >= 0.1
+
+    def test_sensor_manager_read_all_same_bus_worker_per_device(self):
+        threads = []
+
+        class ThreadSensor(SlowSensor):
+            def read_data(self):
+                threads.append(threading.get_ident())
+                return super().read_data()
+
+        sensors = [ThreadSensor("bus1", 0x76, delay=0.05), ThreadSensor("bus1", 0x58, delay=0.05)]
+        manager = SensorManager(sensors)
+
+        manager.read_all()
+        manager.close()
+
+        # different addresses on one bus: read concurrently
+        assert len(set(threads)) == 2
+        assert manager.last_cycle < 0.1
+
+    def test_sensor_manager_read_all_serial_bus_one_worker(self):
+        threads = []
+
+        class ThreadSensor(SlowSensor):
+            serial_bus = True
+
+            def read_data(self):
+                threads.append(threading.get_ident())
+                return super().read_data()
+
+        sensors = [ThreadSensor("bus1", 0x76, delay=0.05), ThreadSensor("bus1", 0x58, delay=0.05)]
+        manager = SensorManager(sensors)
+
+        manager.read_all()
+        manager.close()
+
+        # a serial bus: one worker, one transfer at a time
+        assert len(set(threads)) == 1
+        assert manager.last_cycle >= 0.1
+
+    def test_sensor_manager_read_all_keeps_sensor_order(self, mocker):
+        local = mocker.Mock()
+        local.__class__.__name__ = "LocalSensor"
+        local.read_data.return_value = {"value": 1}
+        manager = SensorManager([SlowSensor("bus1", 0x08, delay=0), local])
+
+        data = manager.read_all()
+        manager.close()
+
+        assert list(data) == ["SlowSensor", "LocalSensor"]
+
+    def test_sensor_manager_two_phase_sensor_overlaps_other_reads(self):
+        events = []
+
+        class TwoPhaseSensor(Sensor):
+            two_phase = True
+            bus_key, address = "bus1", 0x76
+
+            def begin_read(self):
+                events.append("begin")
+
+            def finish_read(self):
+                events.append("finish")
+                return {"T": 1}
+
+            def read_data(self):
+                return self.finish_read()
+
+        class OtherSensor(Sensor):
+            bus_key, address = "bus1", 0x76
+
+            def read_data(self):
+                events.append("other")
+                return {"V": 2}
+
+        manager = SensorManager([TwoPhaseSensor(), OtherSensor()])
+        data = manager.read_all()
+        manager.close()
+
+        assert events == ["begin", "other", "finish"]
+        assert data == {"TwoPhaseSensor": {"T": 1}, "OtherSensor": {"V": 2}}
+
+
+class FlakySensor(Sensor):
+    bus_key, address = "bus1", 0x58
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.reads = 0
+
+    def read_data(self):
+        self.reads += 1
+        if self.reads in self.failures:
+            raise OSError(121, "Remote I/O error")
+        return {"read": self.reads}
+
+
+class TestSensorManagerBreakers:
+    def test_sensor_manager_hanging_device_keeps_cycle_within_deadline(self):
+        stuck = SlowSensor("bus1", 0x76, delay=0.5)
+        healthy = FlakySensor(failures=())
+        healthy.bus_key = "bus2"
+        manager = SensorManager([stuck, healthy], deadline=0.1)
+
+        start = time.perf_counter()
+        data = manager.read_all()
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        manager.read_all()  # the stuck device is skipped, not queued behind
+        second = time.perf_counter() - start
+        manager.close()
+
+        assert first < 0.3 and second < 0.05
+        assert data == {"SlowSensor": None, "FlakySensor": {"read": 1}}
+        assert manager.last_missing == ["SlowSensor"]
+        assert manager.health()["SlowSensor"]["state"] == "open"
+        assert "TimeoutError" in manager.health()["SlowSensor"]["last_error"]
+
+    def test_sensor_manager_timeout_counts_only_against_the_running_read(self):
+        stuck = SlowSensor("bus1", 0x76, delay=0.5)
+        queued = FlakySensor(failures=())
+        queued.bus_key, queued.address = "bus1", 0x76  # same worker, read after the stuck one
+        manager = SensorManager([stuck, queued], deadline=0.1)
+
+        data = manager.read_all()
+        manager.close()
+
+        assert data == {"SlowSensor": None, "FlakySensor": None}
+        assert manager.last_missing == ["SlowSensor", "FlakySensor"]
+        assert manager.health()["SlowSensor"]["state"] == "open"
+        # skipped behind the hung read: no failure of its own
+        assert manager.health()["FlakySensor"]["state"] == "closed"
+        assert manager.health()["FlakySensor"]["failures"] == 0
+
+    def test_sensor_manager_failed_sensor_backs_off_and_holds_values(self):
+        clock = [0.0]
+        sensor = FlakySensor(failures=(2, 3))
+        manager = SensorManager([sensor], backoff=1.0, clock=lambda: clock[0])
+
+        assert manager.read_all() == {"FlakySensor": {"read": 1}}
+        clock[0] = 10.0
+        # read 2 fails: the last good values are held and marked stale
+        assert manager.read_all() == {"FlakySensor": {"read": 1}}
+        assert manager.last_stale == ["FlakySensor"]
+        clock[0] = 10.5
+        manager.read_all()  # still backing off: no read
+        assert sensor.reads == 2
+        clock[0] = 11.0
+        manager.read_all()  # trial read 3 fails: backoff doubles
+        assert manager.breaker(sensor).open_until == 13.0
+        clock[0] = 13.0
+        assert manager.read_all() == {"FlakySensor": {"read": 4}}
+        assert manager.last_stale == [] and manager.last_missing == []
+        assert manager.health()["FlakySensor"]["state"] == "closed"
+        manager.close()
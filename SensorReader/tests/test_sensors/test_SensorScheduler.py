@@ -0,0 +1,254 @@
+import threading
+import time
+
+import pytest
+
+from SensorReader.Sensors.SensorInterface import Sensor
+from SensorReader.Sensors.SensorManager import SensorManager
+from SensorReader.Sensors.SensorScheduler import SensorScheduler, HOLD, LINEAR
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class RampSensor(Sensor):
+    """value == current clock time, so interpolation is exact"""
+    def __init__(self, clock):
+        self.clock = clock
+        self.reads = 0
+
+    def read_data(self):
+        self.reads += 1
+        return {"value": self.clock()}
+
+
+class SlowRampSensor(RampSensor):
+    pass
+
+
+class ChannelSensor(Sensor):
+    channels = {"A": 0x01, "B": 0x02}
+
+    def __init__(self):
+        self.calls = []
+
+    def read_data(self):
+        return self.read_channels(self.channels)
+
+    def read_channels(self, channels):
+        self.calls.append(tuple(channels))
+        return {name: len(self.calls) for name in channels}
+
+
+def make_scheduler(sensors, clock, **kwargs):
+    return SensorScheduler(SensorManager(sensors), clock=clock, sleep=clock.sleep, **kwargs)
+
+
+class TestSensorScheduler:
+    def test_sensor_scheduler_samples_each_sensor_at_its_rate(self):
+        clock = FakeClock()
+        fast, slow = RampSensor(clock), SlowRampSensor(clock)
+        scheduler = make_scheduler([fast, slow], clock, rates={"RampSensor": 4.0, "SlowRampSensor": 0.5},
+                                   frame_period=1.0)
+
+        for _ in range(5):
+            scheduler.next_frame()
+
+        # frames at t=0..4: the fast sensor ran 4x per second, the slow one every 2 s
+        assert fast.reads == 17
+        assert slow.reads == 3
+
+    def test_sensor_scheduler_hold_uses_last_sample(self):
+        clock = FakeClock()
+        scheduler = make_scheduler([RampSensor(clock), SlowRampSensor(clock)], clock,
+                                   rates={"RampSensor": 4.0, "SlowRampSensor": 0.5}, frame_period=1.0, mode=HOLD)
+
+        frames = [scheduler.next_frame() for _ in range(4)]
+
+        assert [f["RampSensor"]["value"] for f in frames] == [0.0, 1.0, 2.0, 3.0]
+        assert [f["SlowRampSensor"]["value"] for f in frames] == [0.0, 0.0, 2.0, 2.0]
+
+    def test_sensor_scheduler_linear_interpolates_slow_sensor(self):
+        clock = FakeClock()
+        scheduler = make_scheduler([RampSensor(clock), SlowRampSensor(clock)], clock,
+                                   rates={"RampSensor": 4.0, "SlowRampSensor": 0.5}, frame_period=1.0, mode=LINEAR)
+
+        frames = [scheduler.next_frame() for _ in range(4)]
+
+        assert scheduler.align_delay == 2.0
+        assert [f["SlowRampSensor"]["value"] for f in frames] == [0.0, 1.0, 2.0, 3.0]
+
+    def test_sensor_scheduler_per_channel_rates(self):
+        clock = FakeClock()
+        sensor = ChannelSensor()
+        scheduler = make_scheduler([sensor], clock, rates={"ChannelSensor.A": 2.0}, frame_period=1.0)
+
+        frame = scheduler.next_frame()
+        scheduler.next_frame()
+
+        assert list(frame["ChannelSensor"]) == ["A", "B"]
+        assert sensor.calls.count(("A",)) == 3
+        assert sensor.calls.count(("B",)) == 2
+
+    def test_sensor_scheduler_unknown_mode(self):
+        with pytest.raises(ValueError):
+            SensorScheduler(SensorManager([]), mode="cubic")
+
+    def test_sensor_scheduler_filters_oversampled_channels(self):
+        clock = FakeClock()
+        sensor = ChannelSensor()
+        scheduler = make_scheduler([sensor], clock, rates={"ChannelSensor": 4.0}, frame_period=1.0,
+                                   filters={"ChannelSensor": {"kind": "median", "window": 3}}, raw_every=2)
+
+        frames = [scheduler.next_frame() for _ in range(3)]
+
+        # samples 1, 2, 3, 4, 5 ... -> median of the last three at each frame time
+        assert frames[1]["ChannelSensor"] == {"A": 4.0, "B": 4.0}
+        assert "raw" not in frames[0]
+        assert frames[1]["raw"] == {"ChannelSensor": {"A": 5, "B": 5}}
+
+    def test_sensor_scheduler_keeps_frames_going_without_a_failing_sensor(self):
+        clock = FakeClock()
+
+        class BrokenSensor(Sensor):
+            reads = 0
+
+            def read_data(self):
+                BrokenSensor.reads += 1
+                raise OSError(121, "Remote I/O error")
+
+        ramp = RampSensor(clock)
+        manager = SensorManager([ramp, BrokenSensor()], backoff=2.0, clock=clock)
+        scheduler = SensorScheduler(manager, frame_period=1.0, clock=clock, sleep=clock.sleep)
+
+        frames = [scheduler.next_frame() for _ in range(4)]
+
+        assert [frame["RampSensor"]["value"] for frame in frames] == [0.0, 1.0, 2.0, 3.0]
+        assert all(frame["BrokenSensor"] is None for frame in frames)
+        assert scheduler.last_missing == ["BrokenSensor"]
+        # reads at t=0 and, after the 2 s backoff, t=2
+        assert BrokenSensor.reads == 2
+
+    def test_sensor_scheduler_reconfigure_keeps_history_filters_and_grid(self):
+        clock = FakeClock()
+        ramp = RampSensor(clock)
+        scheduler = make_scheduler([ramp, ChannelSensor()], clock, rates={"RampSensor": 4.0}, frame_period=1.0,
+                                   filters={"RampSensor": {"kind": "median", "window": 3}})
+        for _ in range(3):
+            scheduler.next_frame()
+        history = scheduler.samples["RampSensor"]["value"]
+        stream = scheduler._filters[("RampSensor", ("value",))]
+
+        scheduler.reconfigure({"RampSensor": 1.0}, channels={"ChannelSensor": ["A"]}, frame_period=5.0,
+                              filters={"RampSensor": {"kind": "median", "window": 3}})
+        frame = scheduler.next_frame()
+
+        # the next frame is one new period after the last one (t=2), not a fresh grid
+        assert scheduler.last_frame_mono == 7.0 and clock.now < 8.0
+        assert list(frame["ChannelSensor"]) == ["A"]
+        assert scheduler.samples["RampSensor"]["value"] is history
+        assert scheduler._filters[("RampSensor", ("value",))] is stream
+        assert [task.period for task in scheduler.tasks if task.name == "RampSensor"] == [1.0]
+
+    def test_sensor_scheduler_timeout_counts_only_against_the_running_read(self):
+        release = threading.Event()
+
+        class HungSensor(Sensor):
+            bus_key, address = "bus1", 0x76
+
+            def read_data(self):
+                release.wait(1.0)
+                return {"value": 1}
+
+        class QueuedSensor(HungSensor):
+            def read_data(self):
+                return {"value": 2}
+
+        manager = SensorManager([HungSensor(), QueuedSensor()], deadline=0.05)
+        scheduler = SensorScheduler(manager, frame_period=0.1)
+        try:
+            frame = scheduler.next_frame()
+        finally:
+            release.set()
+            manager.close()
+
+        assert frame == {"HungSensor": None, "QueuedSensor": None}
+        assert scheduler.last_missing == ["HungSensor", "QueuedSensor"]
+        assert manager.health()["HungSensor"]["state"] == "open"
+        assert manager.health()["QueuedSensor"]["failures"] == 0
+
+    def test_sensor_scheduler_collects_two_phase_sensor_in_a_second_step(self):
+        clock = FakeClock()
+        events = []
+
+        class TwoPhaseSensor(Sensor):
+            two_phase = True
+
+            def begin_read(self):
+                events.append(("begin", clock()))
+                return 0.2
+
+            def finish_read(self):
+                events.append(("finish", clock()))
+                return {"T": 1}
+
+            def read_data(self):
+                raise AssertionError("the scheduler splits the read")
+
+        class OtherSensor(Sensor):
+            def read_data(self):
+                events.append(("other", clock()))
+                return {"V": clock()}
+
+        scheduler = make_scheduler([TwoPhaseSensor(), OtherSensor()], clock, rates={"OtherSensor": 10.0},
+                                   frame_period=1.0)
+        frame = scheduler.next_frame()
+
+        # the worker is free during the measurement: the other sensor is read in between
+        assert [step for step, _ in events[:4]] == ["begin", "other", "other", "finish"]
+        assert events[3][1] == pytest.approx(0.2)
+        # stamped in the middle of the measurement, after the grid's first frame time
+        assert scheduler.samples["TwoPhaseSensor"]["T"][0][0] == pytest.approx(0.1)
+        assert frame == {"TwoPhaseSensor": {"T": 1}, "OtherSensor": {"V": pytest.approx(1.0)}}
+
+    def test_sensor_scheduler_records_worker_time_per_read(self):
+        clock = FakeClock()
+
+        class TwoPhaseSensor(Sensor):
+            two_phase = True
+
+            def begin_read(self):
+                time.sleep(0.01)
+                return 0.5  # the measurement wait keeps no worker busy
+
+            def finish_read(self):
+                time.sleep(0.01)
+                return {"T": 1}
+
+            def read_data(self):
+                raise AssertionError("the scheduler splits the read")
+
+        class SlowSensor(Sensor):
+            def read_data(self):
+                time.sleep(0.02)
+                return {"V": 1}
+
+        scheduler = make_scheduler([TwoPhaseSensor(), SlowSensor()], clock, frame_period=1.0)
+        scheduler.next_frame()
+        scheduler.next_frame()
+
+        # begin + finish for the two-phase read, the whole read_data() otherwise
+        assert 0.02 <= scheduler.last_timings["TwoPhaseSensor"] < 0.1
+        assert 0.02 <= scheduler.last_timings["SlowSensor"] < 0.1
+        timings = scheduler.take_timings()
+        assert {name for name, _ in timings} == {"TwoPhaseSensor", "SlowSensor"}
+        assert all(seconds >= 0.02 for _, seconds in timings)
+        assert scheduler.take_timings() == []
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from SensorReader.Sensors.StreamFilters import (
+    RingBuffer, MedianFilter, EmaFilter, SavitzkyGolayFilter, make_filter,
+)
+
+
+class TestStreamFilters:
+    def test_ring_buffer_window_oldest_to_newest(self):
+        buffer = RingBuffer(3, 2)
+        for i in range(5):
+            buffer.push([i, 10 * i])
+
+        assert buffer.window().tolist() == [[2, 20], [3, 30], [4, 40]]
+        # a view on the preallocated array, not a copy
+        assert buffer.window().base is buffer._data
+
+    def test_median_filter_removes_spike_per_channel(self):
+        stream = MedianFilter(2, window=3)
+        out = [stream.update(np.array(row, dtype=float)) for row in ([1, 5], [100, 5], [1, 5])]
+
+        assert out[-1].tolist() == [1, 5]
+
+    def test_ema_filter(self):
+        stream = EmaFilter(1, alpha=0.5)
+        stream.update(np.array([0.0]))
+
+        assert stream.update(np.array([10.0])).tolist() == [5.0]
+
+    def test_savgol_filter_follows_quadratic_exactly(self):
+        stream = SavitzkyGolayFilter(2, window=7, order=2)
+        for t in range(10):
+            out = stream.update(np.array([t * t, 3 * t + 1], dtype=float))
+
+        assert out == pytest.approx([81, 28])
+
+    def test_make_filter_unknown_kind(self):
+        with pytest.raises(ValueError):
+            make_filter({"kind": "kalman"}, 3)